@@ -0,0 +1,136 @@
+"""
+Fake Generation Backend
+A local stand-in for google.generativeai / vertexai GenerativeModel, so
+bots can be benchmarked (and tested) without an API key or network.
+
+Latency, token rate and failures are configurable:
+
+    model = FakeGenerativeModel(latency=0.2, tokens_per_second=100, failure_rate=0.05)
+    bot.model = model
+"""
+
+import asyncio
+import random
+import time
+from types import SimpleNamespace
+
+
+class FakeAPIError(Exception):
+    """Raised when failure injection triggers"""
+
+
+def _contents_text(contents) -> str:
+    """Flatten a prompt string or list of messages into plain text"""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, dict):
+        return " ".join(str(p) for p in contents.get("parts", [contents.get("content", "")]))
+    return " ".join(_contents_text(item) for item in contents)
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeResponse:
+    """Looks like a GenerateContentResponse: .text, .usage_metadata, iterable chunks"""
+
+    def __init__(self, chunks, prompt_tokens: int):
+        self._chunks = chunks
+        self.text = "".join(chunk.text for chunk in chunks)
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=_count_tokens(self.text),
+            total_token_count=prompt_tokens + _count_tokens(self.text)
+        )
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+
+class _FakeStream:
+    """Streaming response: yields chunks at the configured token rate"""
+
+    def __init__(self, model: "FakeGenerativeModel", chunks, prompt_tokens: int):
+        self._model = model
+        self._chunks = chunks
+        self.usage_metadata = FakeResponse(chunks, prompt_tokens).usage_metadata
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            time.sleep(self._model._chunk_delay(chunk.text))
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(self._model._chunk_delay(chunk.text))
+            yield chunk
+
+
+class FakeGenerativeModel:
+    """Drop-in replacement for GenerativeModel.generate_content(...)"""
+
+    def __init__(
+        self,
+        model_name: str = "fake-model",
+        reply: str = "Thanks for your question! WCC runs workshops, mentorship and meetups.",
+        latency: float = 0.0,
+        tokens_per_second: float = None,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        **kwargs
+    ):
+        """
+        Args:
+            model_name: Ignored, for signature compatibility
+            reply: Text every call responds with
+            latency: Seconds before the first token (time-to-first-token)
+            tokens_per_second: Generation speed (None = instant)
+            failure_rate: Fraction of calls that raise FakeAPIError (0-1)
+            seed: Random seed, so failure injection is repeatable
+            **kwargs: generation_config, system_instruction, ... (ignored)
+        """
+        self.model_name = model_name
+        self.reply = reply
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    def generate_content(self, contents, stream: bool = False, **kwargs):
+        chunks, prompt_tokens = self._prepare(contents)
+        time.sleep(self.latency)
+        if stream:
+            return _FakeStream(self, chunks, prompt_tokens)
+        time.sleep(sum(self._chunk_delay(c.text) for c in chunks))
+        return FakeResponse(chunks, prompt_tokens)
+
+    async def generate_content_async(self, contents, stream: bool = False, **kwargs):
+        chunks, prompt_tokens = self._prepare(contents)
+        await asyncio.sleep(self.latency)
+        if stream:
+            return _FakeStream(self, chunks, prompt_tokens)
+        await asyncio.sleep(sum(self._chunk_delay(c.text) for c in chunks))
+        return FakeResponse(chunks, prompt_tokens)
+
+    def count_tokens(self, contents, **kwargs):
+        return SimpleNamespace(total_tokens=_count_tokens(_contents_text(contents)))
+
+    def _prepare(self, contents):
+        """Count the call, inject failures and split the reply into chunks"""
+        self.calls += 1
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            raise FakeAPIError("Injected failure from FakeGenerativeModel")
+
+        words = self.reply.split(" ")
+        chunks = [
+            SimpleNamespace(text=" ".join(words[i:i + 4]) + (" " if i + 4 < len(words) else ""))
+            for i in range(0, len(words), 4)
+        ]
+        return chunks, _count_tokens(_contents_text(contents))
+
+    def _chunk_delay(self, text: str) -> float:
+        if not self.tokens_per_second:
+            return 0.0
+        return _count_tokens(text) / self.tokens_per_second
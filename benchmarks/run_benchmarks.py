@@ -0,0 +1,490 @@
+"""
+Offline Microbenchmarks
+Measures the overhead our own code adds around model and service calls,
+using FakeGenerativeModel and stubbed services - no API keys or network.
+
+For each benchmark we record per-call latency (mean/p50/p95), throughput
+and peak memory, and write everything to a JSON file so two versions can
+be compared:
+
+    python benchmarks/run_benchmarks.py --output before.json
+    # ... make changes ...
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+from fake_backend import FakeGenerativeModel
+
+ROOT = Path(__file__).resolve().parent.parent
+SESSION_1 = ROOT / "sessions" / "session-01-ai-chatbots"
+PROJECTS = SESSION_1 / "participants" / "sarah-larkin"
+
+# The bots are standalone scripts, so make their folders importable
+for folder in [
+    SESSION_1 / "starter-template",
+    SESSION_1 / "live-demo",
+    PROJECTS / "project_wcc_info_bot",
+    PROJECTS / "project_code_buddy",
+    ROOT / "utilities",
+]:
+    sys.path.insert(0, str(folder))
+
+# The bots check for a key at import time; it is never sent anywhere
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-fake-key")
+
+QUESTIONS = [
+    "What is WCC?",
+    "How can I join the community?",
+    "What upcoming events do you have?",
+    "How can I volunteer?",
+    "What's your code of conduct?",
+]
+
+
+# =============================================================================
+# MEASUREMENT
+# =============================================================================
+
+def measure(name: str, setup, call, iterations: int) -> dict:
+    """
+    Time `call(state, i)` over many iterations, then record peak memory.
+
+    Args:
+        name: Benchmark name
+        setup: Function returning the state passed to call (not timed)
+        call: Function doing one operation
+        iterations: Number of calls
+    """
+    state = setup()
+    call(state, 0)  # Warm-up (imports, first-use caches)
+
+    timings = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        call(state, i)
+        timings.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    # Memory is traced in a separate pass - tracemalloc slows calls down a lot
+    tracemalloc.start()
+    for i in range(min(iterations, 20)):
+        call(state, iterations + i)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "name": name,
+        "iterations": iterations,
+        "mean_us": statistics.mean(timings) * 1e6,
+        "p50_us": timings[len(timings) // 2] * 1e6,
+        "p95_us": timings[int(len(timings) * 0.95)] * 1e6,
+        "throughput_per_s": iterations / elapsed if elapsed else 0.0,
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def skipped(name: str, error: Exception) -> dict:
+    """Result for a benchmark whose dependencies aren't installed"""
+    print(f"  ⏭️  {name}: skipped ({error})")
+    return {"name": name, "skipped": str(error)}
+
+
+# =============================================================================
+# BENCHMARKS
+# =============================================================================
+
+def bench_simple_bot(iterations: int, model_kwargs: dict) -> list:
+    from chatbot import SimpleBot
+
+    def setup(**bot_kwargs):
+        def make():
+            bot = SimpleBot(**bot_kwargs)
+            bot.model = FakeGenerativeModel(**model_kwargs)
+            return bot
+        return make
+
+    def call(bot, i):
+        bot.chat(QUESTIONS[i % len(QUESTIONS)])
+
+    return [
+        measure("SimpleBot.chat", setup(), call, iterations),
+        measure(
+            "SimpleBot.chat (max_context_tokens=2000)",
+            setup(max_context_tokens=2000),
+            call,
+            iterations
+        ),
+    ]
+
+
+def bench_wcc_info_bot(iterations: int, model_kwargs: dict) -> list:
+    from wcc_info_bot_demo import WCCInfoBot
+
+    def setup(**bot_kwargs):
+        def make():
+            bot = WCCInfoBot(**bot_kwargs)
+            bot.model = FakeGenerativeModel(**model_kwargs)
+            return SimpleNamespace(bot=bot, history=[])
+        return make
+
+    def call(state, i):
+        question = QUESTIONS[i % len(QUESTIONS)]
+        result = state.bot.generate_response(question, state.history)
+        state.history.append({"role": "user", "content": question})
+        state.history.append({"role": "assistant", "content": result["response"]})
+
+    return [
+        measure("WCCInfoBot.generate_response", setup(), call, iterations),
+        measure(
+            "WCCInfoBot.generate_response (no fast path)",
+            setup(fast_path_threshold=None),
+            call,
+            iterations
+        ),
+    ]
+
+
+def bench_code_buddy(iterations: int, model_kwargs: dict) -> list:
+    try:
+        import sl_code_buddy
+    except ImportError as e:
+        return [skipped("CodeBuddy.chat", e)]
+
+    def setup():
+        # CodeBuddy builds its own Vertex AI model, so swap the class first
+        sl_code_buddy.GenerativeModel = lambda *a, **kw: FakeGenerativeModel(**model_kwargs)
+        return sl_code_buddy.CodeBuddy()
+
+    def call(buddy, i):
+        buddy.chat(QUESTIONS[i % len(QUESTIONS)])
+
+    return [measure("CodeBuddy.chat", setup, call, iterations)]
+
+
+def make_events_html(count: int) -> bytes:
+    """A large saved events page in the layout scraper.py expects"""
+    events = "\n".join(
+        f'<div class="event"><h3>Workshop {i}</h3>'
+        f'<span class="date">2025-11-{i % 28 + 1:02d}</span>'
+        f'<p>Hands-on session number {i} about AI, cloud and web development.</p></div>'
+        for i in range(count)
+    )
+    filler = "<div class='nav'><a href='#'>link</a></div>" * 200
+    return f"<html><body>{filler}<main>{events}</main>{filler}</body></html>".encode("utf-8")
+
+
+def bench_scraper(iterations: int, events: int = 500) -> list:
+    try:
+        import scraper
+        from http_fetch import FetchResult
+    except ImportError as e:
+        return [skipped("scrape_wcc_events", e)]
+
+    html = make_events_html(events)
+
+    class SavedPageFetcher:
+        """Serves the saved page instead of going to the network"""
+        def __init__(self, changes: bool):
+            self.changes = changes
+            self.calls = 0
+
+        def fetch(self, url):
+            self.calls += 1
+            if self.changes:
+                return FetchResult(url, 200, html, f"v{self.calls}", False)
+            return FetchResult(url, 304, html, "unchanged", True)
+
+    def setup(changes):
+        return lambda: SavedPageFetcher(changes)
+
+    def call(fetcher, i):
+        assert len(scraper.scrape_wcc_events("https://example.test/events", fetcher)) == events
+
+    return [
+        measure(f"scrape_wcc_events ({events} events)", setup(True), call, iterations),
+        measure(f"scrape_wcc_events ({events} events, 304 not modified)", setup(False), call, iterations),
+    ]
+
+
+def make_json_ld_html(count: int) -> bytes:
+    """The same page, also publishing its events as schema.org JSON-LD"""
+    events = [
+        {
+            "@type": "Event",
+            "name": f"Workshop {i}",
+            "startDate": f"2025-11-{i % 28 + 1:02d}",
+            "description": f"Hands-on session number {i} about AI, cloud and web development.",
+        }
+        for i in range(count)
+    ]
+    script = (
+        '<script type="application/ld+json">'
+        + json.dumps({"@context": "https://schema.org", "@graph": events})
+        + "</script>"
+    ).encode("utf-8")
+    return make_events_html(count).replace(b"<body>", b"<body>" + script, 1)
+
+
+def bench_parse_engines(iterations: int, fixture_paths: list = ()) -> list:
+    try:
+        import event_parser
+    except ImportError as e:
+        return [skipped("parse_events", e)]
+
+    # Large saved pages: generated ones plus any real pages passed in
+    fixtures = {
+        "500 events": make_events_html(500),
+        "2000 events": make_events_html(2000),
+    }
+    for path in fixture_paths:
+        with open(path, "rb") as f:
+            fixtures[os.path.basename(path)] = f.read()
+
+    results = []
+    for fixture, html in fixtures.items():
+        expected = None
+        for engine in event_parser.ENGINES:
+            def call(_, i, engine=engine, html=html):
+                return event_parser.parse_events(html, engine=engine, structured=False)
+
+            events = call(None, 0)
+            # Every engine must find the same events
+            assert expected is None or events == expected, f"{engine} disagrees on {fixture}"
+            expected = events
+            results.append(measure(f"parse_events [{engine}] ({fixture})", lambda: None, call, iterations))
+
+    # Pages with structured data skip HTML parsing altogether
+    html = make_json_ld_html(2000)
+    results.append(measure(
+        "parse_events [json-ld] (2000 events)",
+        lambda: None,
+        lambda _, i: event_parser.parse_events(html),
+        iterations
+    ))
+    return results
+
+
+SEARCH_TOPICS = [
+    "AI", "Python", "cloud", "mentorship", "career", "frontend", "data science",
+    "security", "open source", "interview", "leadership", "machine learning",
+]
+
+
+def make_search_documents(count: int) -> list:
+    """Synthetic WCC pages for the search backend"""
+    cities = ["London", "Manchester", "Dublin", "Edinburgh", "virtual"]
+    return [
+        {
+            "title": f"{SEARCH_TOPICS[i % len(SEARCH_TOPICS)]} meetup {i}",
+            "text": (
+                f"Session {i} in {cities[i % len(cities)]} covering "
+                f"{SEARCH_TOPICS[(i * 7) % len(SEARCH_TOPICS)]} and "
+                f"{SEARCH_TOPICS[(i * 11) % len(SEARCH_TOPICS)]} for community members, "
+                f"speaker{i % 997} and mentor{i % 1009}."
+            ),
+            "url": f"https://womencodingcommunity.com/events/{i}",
+        }
+        for i in range(count)
+    ]
+
+
+def bench_search_backend(iterations: int, documents: int) -> list:
+    from search_backend import IndexedSearchBackend
+
+    queries = [
+        "upcoming Python meetup in Manchester",
+        "machine learning mentorship",
+        "speaker42 cloud security",
+        "career interview leadership Dublin",
+        "open source frontend",
+    ]
+
+    # Load from a local file, the way a real document dump would be used
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+        for doc in make_search_documents(documents):
+            f.write(json.dumps(doc) + "\n")
+        path = f.name
+    try:
+        start = time.perf_counter()
+        backend = IndexedSearchBackend.from_file(path)
+        build_ms = (time.perf_counter() - start) * 1000
+    finally:
+        os.remove(path)
+    print(f"  🔎 Indexed {len(backend)} documents in {build_ms:.0f}ms")
+
+    def call(_, i):
+        assert backend.search(queries[i % len(queries)], k=5)
+
+    result = measure(f"IndexedSearchBackend.search ({documents} docs)", lambda: None, call, iterations)
+    result["build_ms"] = build_ms
+    return [result]
+
+
+class _StubDlpClient:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def inspect_content(self, request):
+        time.sleep(self.latency)
+        return SimpleNamespace(result=SimpleNamespace(findings=[]))
+
+    def deidentify_content(self, request):
+        return SimpleNamespace(item=SimpleNamespace(value=request["item"]["value"]))
+
+
+class _StubAnalyzer:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def analyze(self, text, language, **kwargs):
+        time.sleep(self.latency)
+        return []
+
+
+class _StubOpenAI:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.moderations = SimpleNamespace(create=self.create)
+
+    def create(self, input):
+        time.sleep(self.latency)
+        scores = SimpleNamespace(model_dump=lambda: {"harassment": 0.01, "violence": 0.0})
+        result = SimpleNamespace(flagged=False, category_scores=scores)
+        return SimpleNamespace(results=[result])
+
+
+def bench_safety_pipeline(iterations: int, latency: float = 0.0) -> list:
+    name = "ProductionSafetyPipeline.validate_input"
+    try:
+        from safety_pipeline_multilayer import ProductionSafetyPipeline
+        from verdict_cache import VerdictCache
+    except ImportError as e:
+        return [skipped(name, e)]
+
+    def setup(**options):
+        def make():
+            # Services are only created on first use, so stubs can replace them
+            pipeline = ProductionSafetyPipeline(
+                gcp_project_id="benchmark",
+                openai_api_key="benchmark",
+                dlp_client=_StubDlpClient(latency),
+                **options
+            )
+            pipeline.presidio_analyzer = _StubAnalyzer(latency)
+            pipeline.openai_client = _StubOpenAI(latency)
+            return pipeline
+        return make
+
+    def call(pipeline, i):
+        pipeline.validate_input(f"Hi! {QUESTIONS[i % len(QUESTIONS)]}")
+
+    return [
+        measure(name, setup(), call, iterations),
+        measure(f"{name} (pre-filter)", setup(use_prefilter=True), call, iterations),
+        measure(f"{name} (concurrent layers)", setup(concurrent_layers=True), call, iterations),
+        # The questions repeat, so after the first round every layer is a cache hit
+        measure(
+            f"{name} (verdict cache)",
+            lambda: setup(verdict_cache=VerdictCache())(),
+            call,
+            iterations
+        ),
+    ]
+
+
+# =============================================================================
+# REPORTING
+# =============================================================================
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(results: dict, baseline_path: str):
+    """Print the change in mean latency against an earlier results file"""
+    with open(baseline_path) as f:
+        baseline = {b["name"]: b for b in json.load(f)["benchmarks"]}
+
+    print(f"\n📊 Compared with {baseline_path}:")
+    for bench in results["benchmarks"]:
+        before = baseline.get(bench["name"])
+        if "skipped" in bench or not before or "skipped" in before:
+            continue
+        change = (bench["mean_us"] - before["mean_us"]) / before["mean_us"] * 100
+        marker = "🔺" if change > 10 else "✅"
+        print(f"  {marker} {bench['name']}: {before['mean_us']:.1f}us → {bench['mean_us']:.1f}us ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run offline microbenchmarks")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake model/service latency (s)")
+    parser.add_argument("--tokens-per-second", type=float, default=None)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--html-fixture", action="append", default=[], help="Saved events page to add to the parser benchmark (repeatable)")
+    parser.add_argument("--search-docs", type=int, default=20000, help="Documents in the search benchmark")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    model_kwargs = {
+        "latency": args.latency,
+        "tokens_per_second": args.tokens_per_second,
+        "failure_rate": args.failure_rate,
+    }
+
+    print("⏱️  Running offline benchmarks...")
+    benchmarks = []
+    benchmarks += bench_simple_bot(args.iterations, model_kwargs)
+    benchmarks += bench_wcc_info_bot(args.iterations, model_kwargs)
+    benchmarks += bench_code_buddy(args.iterations, model_kwargs)
+    benchmarks += bench_scraper(max(1, args.iterations // 10))
+    benchmarks += bench_parse_engines(max(3, args.iterations // 50), args.html_fixture)
+    benchmarks += bench_search_backend(args.iterations, args.search_docs)
+    benchmarks += bench_safety_pipeline(args.iterations, args.latency)
+
+    for bench in benchmarks:
+        if "skipped" not in bench:
+            print(
+                f"  {bench['name']}: mean {bench['mean_us']:.1f}us, "
+                f"p95 {bench['p95_us']:.1f}us, {bench['throughput_per_s']:.0f}/s, "
+                f"peak {bench['peak_memory_kb']:.0f}KB"
+            )
+
+    results = {
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "settings": vars(args),
+        "benchmarks": benchmarks,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n💾 Results written to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Search Backends for WCCInfoBot.search_web
+Anything with a search(query, k) method returning scored results can be
+plugged into the bot - the mock results below, a local document dump,
+or a real search API.
+
+    backend = IndexedSearchBackend.from_file("wcc_pages.jsonl")
+    bot = WCCInfoBot(search_backend=backend)
+
+The indexed backend uses the BM25 inverted index from text_index.py, so
+a lookup only touches documents sharing a word with the query and stays
+fast with tens of thousands of documents.
+"""
+
+import json
+from typing import Dict, Iterable, List, NamedTuple
+
+from text_index import BM25Index
+
+
+# Mock search results for demo
+MOCK_RESULTS = {
+    "upcoming events": "AI Learning Series - Nov 5th, Mentorship Matching - Nov 12th, Career Workshop - Nov 19th",
+    "latest news": "WCC AI Learning Series launched! 12 sessions covering AI fundamentals to advanced topics.",
+    "recent blog": "Latest blog post: 'Building Your First AI Application' by community members",
+    "meetups": "Monthly meetups in London, Manchester, and virtual sessions every Wednesday",
+}
+
+
+class SearchResult(NamedTuple):
+    title: str
+    text: str
+    score: float
+    url: str = ""
+
+
+class SearchBackend:
+    """Interface: return the k best results for a query, best first"""
+
+    def search(self, query: str, k: int = 3) -> List[SearchResult]:
+        raise NotImplementedError
+
+
+class IndexedSearchBackend(SearchBackend):
+    """Ranks documents with a BM25 inverted index"""
+
+    def __init__(self, documents: Iterable[dict] = ()):
+        """
+        Args:
+            documents: Dicts with "title" and "text" (and optionally "url")
+        """
+        self.documents = []
+        self.index = BM25Index()
+        self.add_documents(documents)
+
+    @classmethod
+    def from_dict(cls, results: Dict[str, str]) -> "IndexedSearchBackend":
+        """Build from {title: text}, like MOCK_RESULTS"""
+        return cls({"title": title, "text": text} for title, text in results.items())
+
+    @classmethod
+    def from_file(cls, path: str) -> "IndexedSearchBackend":
+        """
+        Load documents from a local file.
+
+        Args:
+            path: A .jsonl file (one document per line) or a .json file
+                holding a list of documents
+        """
+        with open(path, encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                documents = [json.loads(line) for line in f if line.strip()]
+            else:
+                documents = json.load(f)
+        return cls(documents)
+
+    def add_documents(self, documents: Iterable[dict]):
+        """Add documents to the index"""
+        start = len(self.documents)
+        self.documents.extend(documents)
+        self.index.add_all(
+            (i, f"{doc['title']} {doc['text']}")
+            for i, doc in enumerate(self.documents[start:], start)
+        )
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def search(self, query: str, k: int = 3) -> List[SearchResult]:
+        results = []
+        for i, score in self.index.search(query, k=k):
+            doc = self.documents[i]
+            results.append(SearchResult(doc["title"], doc["text"], score, doc.get("url", "")))
+        return results
+
+
+def mock_search_backend() -> IndexedSearchBackend:
+    """The demo's built-in mock results"""
+    return IndexedSearchBackend.from_dict(MOCK_RESULTS)
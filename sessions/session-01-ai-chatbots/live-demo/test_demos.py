@@ -0,0 +1,46 @@
+import functools
+import os
+from datetime import date
+
+import pytest
+
+import wcc_demo
+import wcc_info_bot_demo
+from cassette import Cassette
+
+# Recorded Gemini responses for the demo steps - replayed offline, so the
+# demos run in the test suite without an API key. Record again with
+# CASSETTE_MODE=record and a real GEMINI_API_KEY after changing a prompt.
+CASSETTE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "test_demos.json")
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "replay")
+
+
+@pytest.fixture
+def cassette():
+    with Cassette(CASSETTE, mode=CASSETTE_MODE) as cassette:
+        yield cassette
+
+
+def test_step_2_add_personality(cassette, capsys):
+    wcc_demo.step_2_add_personality()
+
+    output = capsys.readouterr().out
+    assert cassette.hits + cassette.recorded == 3
+    assert output.count("\nA: ") == 3
+    assert "Women Coding Community" in output
+
+
+def test_demo_basic_usage(cassette, capsys, monkeypatch):
+    # The system prompt includes the date, so fix it to match the recording
+    monkeypatch.setattr(
+        wcc_info_bot_demo, "WCCInfoBot",
+        functools.partial(wcc_info_bot_demo.WCCInfoBot, today=date(2025, 10, 1))
+    )
+
+    wcc_info_bot_demo.demo_basic_usage()
+
+    output = capsys.readouterr().out
+    assert "having trouble" not in output
+    assert output.count("\nQ: ") == 5
+    # Only the events question needs the model; the rest take the fast path
+    assert cassette.hits + cassette.recorded == 1
@@ -0,0 +1,43 @@
+import json
+
+from search_backend import IndexedSearchBackend, SearchResult, mock_search_backend
+
+
+PAGES = [
+    {"title": "Mentorship Programme", "text": "Get matched with a mentor, and meet your mentor every month",
+     "url": "https://example.org/mentorship"},
+    {"title": "Events", "text": "Workshops and meetups, including a mentor meetup each month"},
+    {"title": "Book Club", "text": "We read one tech book a month and meet online to discuss it"},
+]
+
+
+def test_from_file_ranks_with_bm25(tmp_path):
+    jsonl = tmp_path / "pages.jsonl"
+    jsonl.write_text("\n".join(json.dumps(page) for page in PAGES) + "\n\n", encoding="utf-8")
+    listed = tmp_path / "pages.json"
+    listed.write_text(json.dumps(PAGES), encoding="utf-8")
+
+    for path in (jsonl, listed):
+        backend = IndexedSearchBackend.from_file(str(path))
+        assert len(backend) == 3
+
+        # The page about mentoring beats the one mentioning a mentor once,
+        # and pages without the word aren't returned at all
+        results = backend.search("find a mentor", k=3)
+        assert [r.title for r in results] == ["Mentorship Programme", "Events"]
+        assert results[0].score > results[1].score
+        assert results[0] == SearchResult(
+            "Mentorship Programme", PAGES[0]["text"], results[0].score, "https://example.org/mentorship"
+        )
+        assert results[1].url == ""
+
+        assert [r.title for r in backend.search("book", k=1)] == ["Book Club"]
+        assert backend.search("quantum", k=3) == []
+
+
+def test_mock_backend_and_added_documents():
+    backend = mock_search_backend()
+    assert backend.search("upcoming events", k=1)[0].title == "upcoming events"
+
+    backend.add_documents([{"title": "Hackathon", "text": "Weekend hackathon for all levels"}])
+    assert backend.search("hackathon", k=3)[0].title == "Hackathon"
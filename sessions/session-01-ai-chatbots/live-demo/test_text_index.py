@@ -0,0 +1,56 @@
+from text_index import BM25Index, tokenize
+
+
+def test_bm25_index():
+    index = BM25Index({
+        "events": "Upcoming events: workshops, meetups and talks every month",
+        "volunteer": "Volunteer with WCC: mentors and organisers help run events",
+        "membership": "Membership is free. Join on the website to become a member",
+        "long": "events " + "filler words about nothing much " * 50,
+    })
+
+    # Stopwords are dropped and plurals stemmed, so "Event"/"events" match
+    assert tokenize("What are the Events?") == ["event"]
+
+    # Best match first; only documents sharing a word are returned
+    results = index.search("How do I join as a member?", k=3)
+    assert [doc_id for doc_id, _ in results] == ["membership"]
+
+    # Rare words count more than common ones, and a long document doesn't
+    # win just by mentioning the word
+    ranked = [doc_id for doc_id, _ in index.search("events mentors", k=4)]
+    assert ranked[0] == "volunteer"
+    assert ranked.index("events") < ranked.index("long")
+
+    scores = [score for _, score in index.search("events", k=4)]
+    assert scores == sorted(scores, reverse=True)
+    assert len(index.search("events", k=2)) == 2
+    assert index.search("quantum", k=3) == []
+
+    # Adding documents updates the cached weights
+    index.add_all([("mentoring", "Mentoring programme: find mentors, mentors, mentors")])
+    assert index.search("mentors", k=1)[0][0] == "mentoring"
+
+    print("✅ All tests passed!")
+
+
+def test_knowledge_retrieval_respects_token_cap():
+    from wcc_info_bot_demo import WCCInfoBot
+    from prompt_template import estimate_tokens   # Shared module, found once the demo is imported
+
+    bot = WCCInfoBot()
+    question = "What events and mentorship programs do you run?"
+    sections = bot.retrieve_knowledge(question)
+    assert 0 < len(sections) <= bot.knowledge_top_k
+
+    # A smaller budget keeps only the best sections that fit
+    first_tokens = estimate_tokens(bot.wcc_knowledge[sections[0]])
+    bot.knowledge_token_cap = first_tokens
+    assert bot.retrieve_knowledge(question) == sections[:1]
+    bot.knowledge_token_cap = first_tokens - 1
+    assert bot.retrieve_knowledge(question) == []
+
+
+if __name__ == "__main__":
+    test_bm25_index()
+    test_knowledge_retrieval_respects_token_cap()
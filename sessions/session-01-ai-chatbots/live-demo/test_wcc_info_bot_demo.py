@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+from wcc_info_bot_demo import WCCInfoBot
+from response_cache import ResponseCache
+from semantic_cache import SemanticCache
+
+
+class FakeModel:
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return SimpleNamespace(
+            text=f"Answer {len(self.prompts)}",
+            usage_metadata=SimpleNamespace(prompt_token_count=10)
+        )
+
+
+def make_bot(**options):
+    bot = WCCInfoBot(
+        generation_config={"temperature": 0},
+        semantic_cache=SemanticCache(threshold=0.9),
+        fast_path_threshold=None,
+        **options
+    )
+    bot.model = FakeModel()
+    return bot
+
+
+def test_semantic_cache_only_for_questions_without_history():
+    bot = make_bot()
+    assert bot.generate_response("Tell me about mentoring at WCC")["path"] == "model"
+    assert bot.generate_response("Tell me about mentoring at WCC?")["path"] == "semantic_cache"
+
+    # A follow-up means something else in a conversation - ask the model
+    history = [
+        {"role": "user", "content": "What's the AI workshop?"},
+        {"role": "assistant", "content": "A hands-on intro to machine learning."},
+    ]
+    result = bot.generate_response("Tell me about mentoring at WCC", history)
+    assert result["path"] == "model"
+    assert bot.semantic_cache.stats()["entries"] == 1
+
+
+def test_semantic_cache_stores_only_fresh_answers(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "responses.db"))
+    bot = make_bot(cache=cache)
+    bot.generate_response("Tell me about mentoring at WCC")
+
+    # Same prompt from a new bot: served by the response cache, and not
+    # added to the semantic cache a second time
+    bot = make_bot(cache=cache)
+    assert bot.generate_response("Tell me about mentoring at WCC")["path"] == "response_cache"
+    assert bot.model.prompts == []
+    assert bot.semantic_cache.stats()["entries"] == 0
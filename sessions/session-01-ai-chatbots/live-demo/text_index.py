@@ -0,0 +1,133 @@
+"""
+BM25 Text Index
+A small inverted index for ranking documents against a question.
+
+Built once, then each search only touches the postings of the words in
+the query - it never scans every document. Scores use BM25, the ranking
+formula behind most keyword search engines: words that are rare across
+documents count more, and long documents don't win just by being long.
+
+Each word's BM25 weights are worked out once (as NumPy arrays) the first
+time it is searched for, so a search is just a few vectorized additions
+and a top-k selection, even across tens of thousands of documents.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or", "the",
+    "to", "we", "what", "when", "where", "which", "who", "with", "you", "your",
+}
+
+
+def _stem(word: str) -> str:
+    """Very light stemming so "events"/"event" and "volunteering"/"volunteer" match"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words without stopwords, lightly stemmed"""
+    return [
+        _stem(word)
+        for word in re.findall(r"[a-z0-9]+", text.lower())
+        if word not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """Inverted index with BM25 ranking"""
+
+    def __init__(self, documents: Dict[str, str] = None, k1: float = 1.5, b: float = 0.75):
+        """
+        Args:
+            documents: {doc_id: text} to index straight away
+            k1: How quickly repeated words stop adding to the score
+            b: How much long documents are penalised (0 = not at all)
+        """
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(list)  # term -> [(doc_index, term_frequency)]
+        self.doc_ids = []
+        self.doc_lengths = []
+        self.total_length = 0
+        self._weights = {}  # term -> (doc indexes, BM25 weights), built on first search
+        self._norms = None
+        if documents:
+            self.add_all(documents.items())
+
+    def add_all(self, documents: Iterable[Tuple[str, str]]):
+        """Index many (doc_id, text) pairs"""
+        for doc_id, text in documents:
+            terms = Counter(tokenize(text))
+            doc_index = len(self.doc_ids)
+            self.doc_ids.append(doc_id)
+            length = sum(terms.values())
+            self.doc_lengths.append(length)
+            self.total_length += length
+            for term, frequency in terms.items():
+                self.postings[term].append((doc_index, frequency))
+        # Document counts and lengths changed, so the weights must be redone
+        self._weights = {}
+        self._norms = None
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def search(self, query: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Rank documents for a query.
+
+        Args:
+            query: Free-text question
+            k: Number of results
+
+        Returns:
+            Up to k (doc_id, score) pairs, best first (only documents that
+            share at least one word with the query)
+        """
+        if not self.doc_ids or k <= 0:
+            return []
+
+        scores = np.zeros(len(self.doc_ids))
+        for term in set(tokenize(query)):
+            weights = self._term_weights(term)
+            if weights is not None:
+                doc_indexes, term_scores = weights
+                scores[doc_indexes] += term_scores
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > k:
+            # Only fully sort the k best
+            matched = matched[np.argpartition(-scores[matched], k)[:k]]
+        best = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self.doc_ids[i], float(scores[i])) for i in best]
+
+    def _term_weights(self, term: str):
+        """BM25 weight of a term in each document containing it (cached)"""
+        weights = self._weights.get(term)
+        if weights is None:
+            postings = self.postings.get(term)
+            if not postings:
+                return None
+            if self._norms is None:
+                lengths = np.array(self.doc_lengths, dtype=float)
+                average_length = self.total_length / len(self.doc_ids) or 1.0
+                self._norms = self.k1 * (1 - self.b + self.b * lengths / average_length)
+
+            doc_indexes = np.array([doc_index for doc_index, _ in postings])
+            frequencies = np.array([frequency for _, frequency in postings], dtype=float)
+            n = len(self.doc_ids)
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            term_scores = idf * frequencies * (self.k1 + 1) / (frequencies + self._norms[doc_indexes])
+            weights = self._weights[term] = (doc_indexes, term_scores)
+        return weights
@@ -19,8 +19,18 @@ Demo Flow:
 """
 
 import os
+import sys
 import google.generativeai as genai
 from datetime import datetime
+from pathlib import Path
+
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from model_factory import get_model
 
 
 MODEL_ID = 'gemini-2.5-flash-lite'
@@ -116,16 +126,14 @@ def create_streamlit_app():
         # Generate AI response
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                # Configure model with user settings
-                generation_config = genai.types.GenerationConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                    top_p=top_p
-                )
-                
-                model_ui = genai.GenerativeModel(
+                # Reuse the model built for these settings (shared across reruns)
+                model_ui = get_model(
                     MODEL_ID,
-                    generation_config=generation_config,
+                    generation_config={
+                        "temperature": temperature,
+                        "max_output_tokens": max_tokens,
+                        "top_p": top_p
+                    },
                     system_instruction=wcc_system_prompt
                 )
                 
@@ -136,12 +144,14 @@ def create_streamlit_app():
                 ])
                 
                 full_prompt = f"Conversation context:\\n{context}\\n\\nUser: {prompt}"
-                response = model_ui.generate_content(full_prompt)
-                
-                st.markdown(response.text)
+                # stream=True returns as soon as the first chunk is ready
+                response = model_ui.generate_content(full_prompt, stream=True)
+            
+            # Show the text as it arrives instead of after the whole reply
+            response_text = st.write_stream(chunk.text for chunk in response)
         
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response.text})
+        st.session_state.messages.append({"role": "assistant", "content": response_text})
     
     # Display current settings
     st.sidebar.markdown("---")
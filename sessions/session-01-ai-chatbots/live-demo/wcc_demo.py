@@ -16,8 +16,18 @@ Each step builds on the previous one, showing clear code differences!
 """
 
 import os
+import sys
 import google.generativeai as genai
 from datetime import datetime
+from pathlib import Path
+
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from model_factory import get_model
 
 
 MODEL_ID = 'gemini-2.5-flash-lite'
@@ -168,6 +178,23 @@ def step_3_conversation_memory():
             self.conversation_history.append({"role": "model", "parts": [response.text]})
             
             return response.text
+        
+        def chat_stream(self, user_input):
+            """Same as chat(), but yields the response in chunks as it is generated"""
+            user_message = {"role": "user", "parts": [user_input]}
+            
+            # stream=True gives us chunks as soon as the model produces them
+            response = self.model.generate_content(self.conversation_history + [user_message], stream=True)
+            
+            chunks = []
+            for chunk in response:
+                chunks.append(chunk.text)
+                yield chunk.text
+            
+            # Only add the turn to history once streaming is done, so a
+            # stream that fails halfway doesn't leave a question unanswered
+            self.conversation_history.append(user_message)
+            self.conversation_history.append({"role": "model", "parts": ["".join(chunks)]})
     
     # Create chatbot instance
     chatbot = WCCChatBot()
@@ -187,10 +214,13 @@ def step_3_conversation_memory():
     print(f"Bot: {response2}\n")
     
     # Third message (bot should remember name and context)
+    # Streamed, so the answer starts printing before it is finished
     msg3 = "Do you remember my name?"
     print(f"You: {msg3}")
-    response3 = chatbot.chat(msg3)
-    print(f"Bot: {response3}\n")
+    print("Bot: ", end="", flush=True)
+    for chunk in chatbot.chat_stream(msg3):
+        print(chunk, end="", flush=True)
+    print("\n")
     
     print("🧠 NOTICE: Bot remembers Sarah and the conversation context! 🧠\n")
 
@@ -301,16 +331,14 @@ def step_5_streamlit_interface():
         # Generate AI response
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
-                # Configure model with user settings
-                generation_config = genai.types.GenerationConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                    top_p=top_p
-                )
-                
-                model_ui = genai.GenerativeModel(
+                # Reuse the model built for these settings (shared across reruns)
+                model_ui = get_model(
                     MODEL_ID,
-                    generation_config=generation_config,
+                    generation_config={
+                        "temperature": temperature,
+                        "max_output_tokens": max_tokens,
+                        "top_p": top_p
+                    },
                     system_instruction=WCC_SYSTEM_PROMPT
                 )
                 
@@ -321,12 +349,14 @@ def step_5_streamlit_interface():
                 ])
                 
                 full_prompt = f"Conversation context:\n{context}\n\nUser: {prompt}"
-                response = model_ui.generate_content(full_prompt)
-                
-                st.markdown(response.text)
+                # stream=True returns as soon as the first chunk is ready
+                response = model_ui.generate_content(full_prompt, stream=True)
+            
+            # Show the text as it arrives instead of after the whole reply
+            response_text = st.write_stream(chunk.text for chunk in response)
         
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response.text})
+        st.session_state.messages.append({"role": "assistant", "content": response_text})
     
     # Display current settings
     st.sidebar.markdown("---")
@@ -6,10 +6,26 @@ Uses Gemini API with function calling for web search
 
 import json
 import os
+import sys
 import requests
+from pathlib import Path
 from typing import Dict, Any
 import google.generativeai as genai
-from datetime import datetime
+from datetime import date, datetime
+
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from intent_matcher import IntentMatcher
+from model_factory import get_model
+from prompt_template import PromptTemplate, Slot, estimate_tokens
+from text_index import BM25Index
+from search_backend import SearchBackend, mock_search_backend
+from response_cache import ResponseCache, is_deterministic
+from semantic_cache import SemanticCache
 
 # Load .env if available (dev convenience)
 try:
@@ -23,10 +39,54 @@ _api_key = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
 if _api_key:
     genai.configure(api_key=_api_key)
 
+MODEL_ID = 'gemini-2.5-flash-lite'
+
 class WCCInfoBot:
-    def __init__(self):
-        """Initialize the WCC Info Bot with Gemini API"""
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    def __init__(
+        self,
+        generation_config: dict = None,
+        cache: ResponseCache = None,
+        cache_all: bool = False,
+        semantic_cache: SemanticCache = None,
+        knowledge_top_k: int = 3,
+        knowledge_token_cap: int = 600,
+        search_backend: SearchBackend = None,
+        search_top_k: int = 3,
+        fast_path_threshold: float = 0.8,
+        today: date = None
+    ):
+        """
+        Initialize the WCC Info Bot with Gemini API
+        
+        Args:
+            generation_config: Optional model settings (temperature, etc.)
+            cache: Optional ResponseCache so repeated questions skip the API
+            cache_all: Cache even when temperature isn't 0
+            semantic_cache: Optional SemanticCache to reuse answers to
+                similarly worded questions (only for questions asked without
+                earlier conversation, since the answer may depend on it)
+            knowledge_top_k: Most knowledge sections added to a prompt
+            knowledge_token_cap: Token budget for those sections
+            search_backend: Where search_web looks things up (default: the
+                built-in mock results)
+            search_top_k: Number of search results added to a prompt
+            fast_path_threshold: Confidence needed to answer straight from
+                the knowledge base without the model (None = always use
+                the model)
+            today: Date the bot is told it is (default: today's date). Fix
+                it to get the same prompt on every run, e.g. when replaying
+                recorded responses
+        """
+        self.generation_config = generation_config
+        self.model = get_model(MODEL_ID, generation_config)
+        self.cache = cache
+        self.cache_all = cache_all
+        self.semantic_cache = semantic_cache
+        self.knowledge_top_k = knowledge_top_k
+        self.knowledge_token_cap = knowledge_token_cap
+        self.search_backend = search_backend or mock_search_backend()
+        self.search_top_k = search_top_k
+        self.today = today or date.today()
         
         # WCC Knowledge Base (hardcoded for Session 1)
         self.wcc_knowledge = {
@@ -61,16 +121,27 @@ class WCCInfoBot:
             - Help create a welcoming space for everyone"""
         }
         
+        # Questions each knowledge section answers on its own
+        self.knowledge_examples = {
+            "about": ["What is WCC?", "What is Women Coding Community?", "Tell me about WCC"],
+            "events": ["What events does WCC run?", "What kind of events do you host?"],
+            "membership": ["How do I join WCC?", "How do I join?", "How can I join the community?", "How do I become a member?"],
+            "volunteering": ["How do I volunteer?", "How can I volunteer?", "How can I help WCC?"],
+            "code_of_conduct": ["What's your code of conduct?", "What is the WCC code of conduct?"],
+        }
+        
+        # Zero-LLM fast path: confident matches are answered from the knowledge base
+        self.intents = None
+        if fast_path_threshold is not None:
+            self.intents = IntentMatcher(fast_path_threshold)
+            for name, examples in self.knowledge_examples.items():
+                answer = "\n".join(line.strip() for line in self.wcc_knowledge[name].splitlines())
+                self.intents.add(name, answer, examples)
+        
         self.system_prompt = f"""You are the WCC Info Bot, a helpful assistant for the Women Coding Community.
 
 ABOUT WCC: {self.wcc_knowledge['about']}
 
-KEY INFORMATION:
-- Events: {self.wcc_knowledge['events']}
-- Membership: {self.wcc_knowledge['membership']}
-- Volunteering: {self.wcc_knowledge['volunteering']}
-- Code of Conduct: {self.wcc_knowledge['code_of_conduct']}
-
 PERSONALITY:
 - Friendly, encouraging, and supportive
 - Use inclusive language
@@ -78,32 +149,57 @@ PERSONALITY:
 - Be enthusiastic about WCC's mission
 
 INSTRUCTIONS:
-- Answer questions about WCC using the knowledge above
+- Answer questions about WCC using the knowledge above and the RELEVANT WCC INFORMATION given with each question
 - If you need current information (latest events, blog posts), use the search function
 - If asked about topics outside WCC, gently redirect to WCC-related topics
 - Always encourage participation and engagement
 - End responses with relevant WCC action items when appropriate
 
-Current date: {datetime.now().strftime('%Y-%m-%d')}
+Current date: {self.today.isoformat()}
 """
+        
+        # Index the knowledge base once, so each question only gets the
+        # sections it needs instead of the whole knowledge base
+        self.knowledge_index = BM25Index({
+            name: f"{name.replace('_', ' ')} {text}"
+            for name, text in self.wcc_knowledge.items()
+        })
+        
+        # Static parts are joined and counted once; only the slots change per request
+        self.prompt_template = PromptTemplate([
+            self.system_prompt,
+            Slot("knowledge", prefix="\n\nRELEVANT WCC INFORMATION:\n"),
+            Slot("search_results", prefix="\n\nCURRENT SEARCH RESULTS: "),
+            Slot("history", prefix="\n\nCONVERSATION SO FAR:\n"),
+            "\n\nUser question: ",
+            Slot("question"),
+            "\n\nPlease provide a helpful response about WCC:",
+        ])
+
+    def retrieve_knowledge(self, question: str) -> list:
+        """Names of the most relevant knowledge sections that fit the token cap"""
+        sections = []
+        tokens = 0
+        for name, _ in self.knowledge_index.search(question, k=self.knowledge_top_k):
+            section_tokens = estimate_tokens(self.wcc_knowledge[name])
+            if tokens + section_tokens > self.knowledge_token_cap:
+                break
+            sections.append(name)
+            tokens += section_tokens
+        return sections
 
     def search_web(self, query: str) -> str:
         """
-        Simulate web search function (in real implementation, use actual search API)
-        For demo purposes, returns mock WCC-related results
+        Look up current information with the configured search backend
+        (the built-in backend returns mock WCC-related results for the demo)
         """
-        # Mock search results for demo
-        mock_results = {
-            "upcoming events": "AI Learning Series - Nov 5th, Mentorship Matching - Nov 12th, Career Workshop - Nov 19th",
-            "latest news": "WCC AI Learning Series launched! 12 sessions covering AI fundamentals to advanced topics.",
-            "recent blog": "Latest blog post: 'Building Your First AI Application' by community members",
-            "meetups": "Monthly meetups in London, Manchester, and virtual sessions every Wednesday"
-        }
-        
-        # Simple keyword matching for demo
-        for key, result in mock_results.items():
-            if any(word in query.lower() for word in key.split()):
-                return f"Search results for '{query}': {result}"
+        results = self.search_backend.search(query, k=self.search_top_k)
+        if results:
+            lines = "\n".join(
+                f"- {result.title} (score {result.score:.2f}): {result.text}"
+                for result in results
+            )
+            return f"Search results for '{query}':\n{lines}"
         
         return f"Search results for '{query}': No specific WCC information found. Please check our website or Slack for the latest updates."
 
@@ -114,37 +210,104 @@ Current date: {datetime.now().strftime('%Y-%m-%d')}
             conversation_history = []
         
         # Build conversation context
-        messages = [{"role": "system", "content": self.system_prompt}]
-        
-        # Add conversation history
-        for msg in conversation_history[-5:]:  # Keep last 5 messages for context
-            messages.append(msg)
-        
-        # Add current user input
-        messages.append({"role": "user", "content": user_input})
+        history_text = "\n".join(
+            f"{msg['role']}: {msg['content']}"
+            for msg in conversation_history[-5:]  # Keep last 5 messages for context
+        )
         
         try:
             # First, check if we need to search for current information
             search_keywords = ["latest", "upcoming", "current", "recent", "new", "today", "this week"]
             needs_search = any(keyword in user_input.lower() for keyword in search_keywords)
             
+            # Answer straight from the knowledge base when we're confident
+            if self.intents is not None and not needs_search:
+                intent = self.intents.match(user_input)
+                if intent:
+                    return {
+                        "response": intent.answer,
+                        "path": "fast_path",
+                        "intent": intent.intent,
+                        "confidence": intent.confidence,
+                        "cached": False,
+                        "search_used": False,
+                        "search_query": None,
+                        "search_result": None,
+                        "input_tokens": 0,
+                        "timestamp": datetime.now().isoformat()
+                    }
+            
+            # Reuse the answer to a similar question - not for time-sensitive
+            # ones, nor follow-ups whose meaning depends on the conversation
+            use_semantic_cache = (
+                self.semantic_cache is not None and not needs_search and not conversation_history
+            )
+            if use_semantic_cache:
+                match = self.semantic_cache.lookup(user_input)
+                if match:
+                    return {
+                        "response": match.answer,
+                        "path": "semantic_cache",
+                        "cached": True,
+                        "cache": "semantic",
+                        "similarity": match.similarity,
+                        "matched_question": match.question,
+                        "search_used": False,
+                        "search_query": None,
+                        "search_result": None,
+                        "input_tokens": 0,
+                        "timestamp": datetime.now().isoformat()
+                    }
+            
             search_result = ""
             if needs_search:
                 search_result = self.search_web(user_input)
-                enhanced_prompt = f"{self.system_prompt}\n\nCURRENT SEARCH RESULTS: {search_result}"
-            else:
-                enhanced_prompt = self.system_prompt
             
-            # Generate response with Gemini
-            full_prompt = f"{enhanced_prompt}\n\nUser question: {user_input}\n\nPlease provide a helpful response about WCC:"
+            # Only the knowledge sections relevant to this question
+            knowledge_sections = self.retrieve_knowledge(user_input)
+            knowledge_text = "\n".join(
+                f"- {name.replace('_', ' ').title()}: {self.wcc_knowledge[name]}"
+                for name in knowledge_sections
+            )
+            
+            # Fill the per-request slots of the precompiled prompt
+            prompt = self.prompt_template.render(
+                knowledge=knowledge_text,
+                search_results=search_result,
+                history=history_text,
+                question=user_input
+            )
+            full_prompt = prompt.text
+            
+            # Identical prompts with deterministic settings can reuse an answer
+            cache_key = None
+            if self.cache and (self.cache_all or is_deterministic(self.generation_config)):
+                cache_key = ResponseCache.make_key(MODEL_ID, self.generation_config, None, full_prompt)
             
-            response = self.model.generate_content(full_prompt)
+            response_text = self.cache.get(cache_key) if cache_key else None
+            cached = response_text is not None
+            input_tokens = 0
+            if not cached:
+                response = self.model.generate_content(full_prompt)
+                response_text = response.text
+                # Exact count from the API when available, else our estimate
+                usage = getattr(response, "usage_metadata", None)
+                input_tokens = getattr(usage, "prompt_token_count", 0) or prompt.input_tokens
+                if cache_key:
+                    self.cache.set(cache_key, response_text)
+            
+            if use_semantic_cache and not cached:
+                self.semantic_cache.add(user_input, response_text)
             
             return {
-                "response": response.text,
+                "response": response_text,
+                "path": "response_cache" if cached else "model",
+                "cached": cached,
                 "search_used": needs_search,
                 "search_query": user_input if needs_search else None,
                 "search_result": search_result if needs_search else None,
+                "knowledge_sections": knowledge_sections,
+                "input_tokens": input_tokens,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -178,6 +341,9 @@ Current date: {datetime.now().strftime('%Y-%m-%d')}
             
             print(f"\nWCC Bot: {result['response']}")
             
+            if result.get('path') == "fast_path":
+                print(f"[Answered from the knowledge base: {result['intent']}]")
+            
             if result.get('search_used'):
                 print(f"[Used search for: {result['search_query']}]")
             
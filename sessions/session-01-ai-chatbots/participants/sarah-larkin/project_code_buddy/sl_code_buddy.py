@@ -1,8 +1,18 @@
 from vertexai.generative_models import GenerativeModel
 from google.cloud import aiplatform
 import os
+import sys
+from pathlib import Path
 from dotenv import load_dotenv
 
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from conversation_store import ConversationManager
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -54,40 +64,58 @@ Remember: There are no stupid questions! Learning to code takes practice."""
 class CodeBuddy: # TODO: got up to this point
     """Friendly AI code helper for beginners"""
 
-    def __init__(self):
-        self.model = GenerativeModel("gemini-2.5-flash-lite")
+    def __init__(self, conversations: ConversationManager = None, session_id: str = None):
+        """
+        Args:
+            conversations: Optional ConversationManager to save the history
+                to disk instead of keeping it only in memory
+            session_id: Conversation to load/save (required with conversations)
+        """
+        # The system prompt is set once on the model instead of being
+        # re-sent as a fake user message on every turn
+        self.model = GenerativeModel(
+            "gemini-2.5-flash-lite",
+            system_instruction=CODE_BUDDY_PROMPT
+        )
         self.system_prompt = CODE_BUDDY_PROMPT
-        self.conversation_history = []
+        self.conversations = conversations
+        self.session_id = session_id
+        self._history = []
         self.learning_topics = []
+        self.last_input_tokens = 0  # Prompt tokens used by the last request
+
+    @property
+    def conversation_history(self) -> list:
+        """Messages so far (for a saved session: the recent part loaded in memory)"""
+        if self.conversations:
+            return self.conversations.history(self.session_id)
+        return self._history
+
+    def _add_turn(self, user_message: str, bot_response: str):
+        """Add a finished turn to the history (and save it, if using a store),
+        both messages together so a failed turn leaves nothing behind"""
+        turn = [
+            {"role": "user", "content": user_message},
+            {"role": "assistant", "content": bot_response},
+        ]
+        if self.conversations:
+            self.conversations.extend(self.session_id, turn)
+        else:
+            self._history.extend(turn)
         
     def chat(self, user_message: str) -> str:
         """ Help with code questions"""
         try:
-            # Add user message to history
-            self.conversation_history.append(
-                {"role": "user", "content": user_message}
-            )
-
-            # Build messages with system prompt
-            messages = [
-                {"role": "user", "content": self.system_prompt},
-            ]
-
-            # Add conversation history
-            for msg in self.conversation_history:
-                messages.append(msg)
-
-            # Generate response
+            # Generate response from the conversation history and the new message
             response = self.model.generate_content(
-                [msg["content"] for msg in messages]
+                [msg["content"] for msg in self.conversation_history] + [user_message]
             )
 
             bot_response = response.text
+            self.last_input_tokens = response.usage_metadata.prompt_token_count
 
             # Add to history
-            self.conversation_history.append(
-                {"role": "assistant", "content": bot_response}
-            )
+            self._add_turn(user_message, bot_response)
 
             return bot_response
 
@@ -113,7 +141,9 @@ class CodeBuddy: # TODO: got up to this point
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        if self.conversations:
+            self.conversations.clear(self.session_id)
+        self._history = []
 
 
 def main():
@@ -1,62 +1,227 @@
 import streamlit as st
-import json
+import secrets
+import sys
+import time
+from pathlib import Path
+
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
 from sl_chatbot import SimpleBot
-from scraper import scrape_wcc_events
+from model_factory import get_model
+from conversation_store import ConversationManager, SQLiteConversationStore
+from scraper import fetch_wcc_events
+from prompt_template import PromptTemplate, Slot
+from intent_matcher import IntentMatcher
+from faq_index import FAQIndex, current_version, keyword_search
+from data_loader import BackgroundRefresher, CachedFile
+from event_store import EventStore, RenderedEvents
+
+MODEL_ID = "gemini-2.5-flash-lite"
 
 st.set_page_config(page_title="WCC Info Bot", page_icon="🤖")
 
 st.title("🤖 WCC Info Bot")
 st.markdown("Ask me anything about Women Coding Community!")
 
-# Load FAQs
-with open("wcc_faqs.json") as f:
-    wcc_data = json.load(f)
-
-faq_text = "\n".join([
-    f"Q: {faq['question']}\nA: {faq['answer']}"
-    for faq in wcc_data["faqs"]
-])
 
-#adding in scraper - NOT WORKING YET
-events = scrape_wcc_events()
-events_text = "\n".join([
-    f"- {e['title']} on {e['date']}: {e['description']}"
-    for e in events
-])
-
-system_prompt = f"""You are a friendly WCC (Women Coding Community) assistant.
+@st.cache_resource
+def get_prompt_template() -> PromptTemplate:
+    """Compile the static parts of the system prompt once per server"""
+    return PromptTemplate([
+        """You are a friendly WCC (Women Coding Community) assistant.
     Your role is to help members learn about WCC, answer questions, and encourage participation.
 
-    Here are the FAQs you should reference:
-    {faq_text}
+    The FAQs most relevant to each question are sent along with it - reference them in your answer.
 
     Here are the upcomng events:
-    {events_text}
+    """,
+        Slot("events"),
+        """
 
     Be warm, encouraging, and inclusive. If you don't know something, suggest they contact the WCC team.
+    """,
+    ])
+
+
+@st.cache_resource
+def get_faq_file() -> CachedFile:
+    return CachedFile("wcc_faqs.json")
+
+
+def load_faqs() -> tuple:
+    """The FAQs and their version - only re-read when wcc_faqs.json changes"""
+    faq_file = get_faq_file()
+    return faq_file.get()["faqs"], faq_file.version
+
+
+@st.cache_resource(max_entries=2)
+def get_intents(faq_version: str) -> IntentMatcher:
+    """FAQ questions answered instantly, without calling Gemini"""
+    return IntentMatcher.from_faqs(load_faqs()[0])
+
+
+@st.cache_resource(max_entries=2)
+def get_faq_index(index_version: str) -> FAQIndex:
+    """Memory-mapped FAQ embeddings, built ahead of time with faq_index.py
+    (reopened when a new build swaps in, without embedding anything here)"""
+    return FAQIndex("faq_index")
+
+
+def relevant_faqs(question: str) -> str:
+    """Only the FAQs closest to the question go into the prompt"""
+    index_version = current_version("faq_index")
+    if index_version is None:
+        # Not built yet - key words still find the obvious FAQs
+        matches = keyword_search(load_faqs()[0], question, k=3)
+    else:
+        # Repeat questions reuse their embedding; if the embeddings API
+        # fails, the index falls back to key words on its own
+        matches = get_faq_index(index_version).search(question, k=3)
+    return "Relevant FAQs:\n" + "\n".join(
+        f"Q: {match.question}\nA: {match.answer}" for match in matches
+    )
+
+
+@st.cache_resource
+def get_event_store() -> EventStore:
+    """Scraped events on disk, with a feed of what changed between scrapes"""
+    return EventStore("wcc_events.db")
+
+
+@st.cache_resource
+def get_event_lines() -> RenderedEvents:
+    """Prompt line per event, only re-rendered when that event changes"""
+    return RenderedEvents(
+        get_event_store(),
+        lambda e: f"- {e['title']} on {e['date']}: {e['description']}"
+    )
+
+
+def refresh_events() -> int:
+    """Scrape, store only the differences, and return the change feed position"""
+    store = get_event_store()
+    # A failed scrape raises, so the refresher keeps the stored events and
+    # reports the error instead of syncing an empty list over them
+    store.sync(fetch_wcc_events())
+    store.compact()
+    return store.last_change_id
+
+
+@st.cache_resource
+def get_events_feed() -> BackgroundRefresher:
+    """Events scraped on a background thread every hour - no rerun waits for the scraper"""
+    return BackgroundRefresher(refresh_events, interval=3600, initial=0).start()
+
+
+@st.cache_data(max_entries=4)
+def build_system_prompt(events_version: int, day: str) -> tuple:
+    """
+    Build the system prompt once per version of the events (and once a
+    day, so "New this week" moves on even when no events change), not on
+    every rerun. events_version is the change feed position the event
+    lines were refreshed to - refresh them first, outside this cache.
     """
+    event_lines = get_event_lines()
+    events_text = "\n".join(event_lines.lines())
+
+    # Answer "what's new this week?" from the stored history
+    # (not after the first scrape, when everything is new)
+    new_events = get_event_store().new_since(time.time() - 7 * 24 * 3600)
+    if new_events and len(new_events) < len(event_lines.rendered):
+        events_text += "\n\nNew this week: " + ", ".join(e["title"] for e in new_events)
+
+    prompt = get_prompt_template().render(events=events_text)
+    return prompt.text, prompt.input_tokens
+
+
+faqs, faq_version = load_faqs()
+events_feed = get_events_feed()   # Keeps scraping in the background
+# Apply any new changes to the event lines (cheap when nothing changed),
+# so the prompt is only rebuilt when they moved on
+event_lines = get_event_lines()
+event_lines.refresh()
+system_prompt, system_prompt_tokens = build_system_prompt(
+    event_lines.cursor, time.strftime("%Y-%m-%d")
+)
+
+@st.cache_resource
+def get_conversations() -> ConversationManager:
+    """Chat history for every session, saved to disk; idle sessions leave memory"""
+    return ConversationManager(
+        SQLiteConversationStore("wcc_conversations.db"),
+        idle_timeout=15 * 60
+    )
+
+
+# Keep the session ID in the URL so a reload or server restart resumes the chat.
+# The ID is a random secret, but whoever has the link can read the conversation -
+# so don't share it; "New conversation" gives this tab a fresh, unshared ID.
+new_conversation = st.sidebar.button("New conversation")
+if new_conversation or "session" not in st.query_params:
+    st.query_params["session"] = secrets.token_urlsafe(32)
+    st.session_state.pop("bot", None)
+session_id = st.query_params["session"]
 
 # Initialize bot
 if "bot" not in st.session_state:
-    st.session_state.bot = SimpleBot(system_prompt=system_prompt)
+    st.session_state.bot = SimpleBot(
+        system_prompt=system_prompt,
+        max_context_tokens=4000,
+        model=get_model(MODEL_ID, system_instruction=system_prompt),
+        conversations=get_conversations(),
+        session_id=session_id,
+        intents=get_intents(faq_version),
+        retrieve=relevant_faqs
+    )
 
-if "messages" not in st.session_state:
-    st.session_state.messages = []
+# Pick up edited FAQs and newly scraped events (cheap when nothing changed)
+st.session_state.bot.intents = get_intents(faq_version)
+st.session_state.bot.system_prompt = system_prompt
+st.session_state.bot.model = get_model(MODEL_ID, system_instruction=system_prompt)
 
-# Display chat history
-for message in st.session_state.messages:
-    with st.chat_message(message["role"]):
-        st.markdown(message["content"])
+# Display chat history (loaded from the store, the bot's "model" is our assistant)
+for message in st.session_state.bot.conversation_history:
+    with st.chat_message("assistant" if message["role"] == "model" else "user"):
+        st.markdown(message["parts"][0])
 
 # Chat input
 if user_input := st.chat_input("Ask me about WCC..."):
-    st.session_state.messages.append({"role": "user", "content": user_input})
-    
     with st.chat_message("user"):
         st.markdown(user_input)
     
-    response = st.session_state.bot.chat(user_input)
-    st.session_state.messages.append({"role": "assistant", "content": response})
-    
+    # Stream the reply so the first words show up straight away
+    # (the bot saves both messages to the conversation store)
     with st.chat_message("assistant"):
-        st.markdown(response)
\ No newline at end of file
+        st.write_stream(st.session_state.bot.chat_stream(user_input))
+        # Shown apart from the reply; the failed turn isn't saved
+        if st.session_state.bot.last_error:
+            st.error(f"Sorry, something went wrong: {st.session_state.bot.last_error}")
+
+# Token usage, so prompt growth is easy to spot
+st.sidebar.markdown("**Input tokens**")
+st.sidebar.write(f"System prompt: ~{system_prompt_tokens}")
+st.sidebar.write(f"Last request: {st.session_state.bot.last_input_tokens}")
+if st.session_state.bot.last_path == "fast_path":
+    st.sidebar.caption("⚡ Last answer came straight from the FAQs (no Gemini call)")
+
+# How fresh the data is
+events_status = events_feed.status()
+st.sidebar.markdown("**Data**")
+st.sidebar.write(f"FAQs: {len(faqs)} (loaded {time.strftime('%H:%M:%S', time.localtime(get_faq_file().loaded_at))})")
+faq_index_version = current_version("faq_index")
+if faq_index_version is None:
+    st.sidebar.caption("⚠️ No FAQ index - matching FAQs by key words. Build it with `python faq_index.py`")
+elif not get_faq_index(faq_index_version).is_current(faqs):
+    st.sidebar.caption("⚠️ FAQ index is out of date - rebuild it with `python faq_index.py`")
+if events_status["refreshing"]:
+    st.sidebar.write("Events: refreshing...")
+elif events_status["age_seconds"] is None:
+    st.sidebar.write("Events: not loaded yet")
+else:
+    st.sidebar.write(f"Events: {len(get_event_lines().rendered)}, updated {events_status['age_seconds'] / 60:.0f} min ago")
+if events_status["last_error"]:
+    st.sidebar.caption(f"⚠️ Last events refresh failed: {events_status['last_error']}")
@@ -0,0 +1,216 @@
+"""
+Async Event Crawler
+Crawls a paginated events listing and the event detail pages it links
+to, returning the same event dicts as scrape_wcc_events().
+
+    events = asyncio.run(EventCrawler(max_concurrency=10).crawl(EVENTS_URL))
+
+- Pages are fetched concurrently (at most max_concurrency at a time) with
+  the pooled, cached HTTPFetcher, run in worker threads. Parsing runs in
+  those threads too, so the event loop keeps scheduling fetches, and each
+  page is parsed once for both its events and its links.
+- Requests to the same host are spaced out to at most `rate` per second.
+- Failures (connection errors, timeouts, 429 and 5xx) are retried with
+  exponential backoff; pages that still fail, or that can't be parsed,
+  are listed in crawler.errors and the crawl carries on.
+- New listing pages are discovered from rel="next" links and ?page=N /
+  /page/N links; detail pages from the links inside each event block.
+
+Events found on a detail page replace the listing's shorter version of the
+same event (same title and date).
+"""
+
+import asyncio
+import random
+import re
+from typing import Dict, List, Tuple
+from urllib.parse import urldefrag, urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from event_parser import EVENT_DIVS, HAS_LXML, parse_events, parse_tree
+from http_fetch import HTTPFetcher
+
+_PAGINATION = re.compile(r"[?&]page=\d+|/page/\d+/?$")
+
+
+def extract_links(html: bytes, base_url: str, tree=None) -> Tuple[List[str], List[str]]:
+    """
+    Find the links worth crawling on a listing page.
+
+    Args:
+        html: Page content
+        base_url: URL of the page, for relative links
+        tree: The page already parsed with parse_tree() (lxml only)
+
+    Returns:
+        (listing page links, event detail page links), as absolute URLs
+    """
+    def absolute(href):
+        return urldefrag(urljoin(base_url, href))[0]
+
+    def is_listing(href, rel):
+        return "next" in rel or _PAGINATION.search(href)
+
+    if HAS_LXML:
+        root = tree if tree is not None else parse_tree(html)
+        if root is None:
+            return [], []
+        pages = [
+            absolute(link.get("href"))
+            for link in root.xpath("//a[@href] | //link[@href]")
+            if is_listing(link.get("href"), (link.get("rel") or "").split())
+        ]
+        details = [
+            absolute(links[0].get("href"))
+            for links in (event.xpath(".//a[@href]") for event in root.xpath(EVENT_DIVS))
+            if links
+        ]
+        return pages, details
+
+    soup = BeautifulSoup(html, "html.parser")
+    pages = [
+        absolute(link["href"])
+        for link in soup.find_all(["a", "link"], href=True)
+        if is_listing(link["href"], link.get("rel") or [])
+    ]
+    details = [
+        absolute(link["href"])
+        for event in soup.find_all("div", class_="event")
+        for link in event.find_all("a", href=True)[:1]
+    ]
+    return pages, details
+
+
+def parse_page(html: bytes, url: str, is_listing: bool) -> Tuple[List[dict], List[str], List[str]]:
+    """
+    Events and links of a page, parsing the HTML only once.
+
+    Returns:
+        (events, listing page links, event detail page links) - no links
+        for a detail page
+    """
+    tree = parse_tree(html) if HAS_LXML else None
+    events = parse_events(html, tree=tree)
+    pages, details = extract_links(html, url, tree=tree) if is_listing else ([], [])
+    return events, pages, details
+
+
+def _should_retry(error: Exception) -> bool:
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(error, requests.RequestException)
+
+
+class EventCrawler:
+    """Concurrent, rate-limited crawler for events listings"""
+
+    def __init__(
+        self,
+        fetcher: HTTPFetcher = None,
+        max_concurrency: int = 10,
+        rate: float = 5.0,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        max_pages: int = 500,
+        follow_details: bool = True
+    ):
+        """
+        Args:
+            fetcher: HTTPFetcher to use (default: a cached one sized for max_concurrency)
+            max_concurrency: Most requests in flight at once
+            rate: Most requests per second to any one host
+            max_retries: Retries per page after the first attempt
+            backoff: First retry delay in seconds (doubles each retry)
+            max_pages: Stop discovering new pages after this many
+            follow_details: Also crawl each event's detail page
+        """
+        self.fetcher = fetcher or HTTPFetcher(pool_size=max_concurrency)
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_pages = max_pages
+        self.follow_details = follow_details
+        self.errors: Dict[str, str] = {}   # url -> last error, for pages that failed
+        self.pages_fetched = 0
+        self._next_slot = {}               # host -> earliest time of its next request
+
+    async def crawl(self, start_url: str) -> List[dict]:
+        """Crawl from a listing page; returns events in listing order"""
+        host = urlparse(start_url).netloc
+        queue = asyncio.Queue()
+        seen = {start_url}
+        events = {}   # (title, date) -> event, keeps first-seen order
+
+        def enqueue(url: str, is_listing: bool):
+            if url not in seen and urlparse(url).netloc == host and len(seen) < self.max_pages:
+                seen.add(url)
+                queue.put_nowait((url, is_listing))
+
+        async def worker():
+            while True:
+                url, is_listing = await queue.get()
+                try:
+                    content = await self._fetch(url)
+                    if content is None:
+                        continue
+                    # Parsing is CPU work - keep it off the event loop
+                    found, pages, details = await asyncio.to_thread(
+                        parse_page, content, url, is_listing
+                    )
+                    for event in found:
+                        key = (event["title"], event["date"])
+                        # Detail pages have the full version of an event
+                        if key not in events or not is_listing:
+                            events[key] = event
+                    for page in pages:
+                        enqueue(page, True)
+                    if self.follow_details:
+                        for detail in details:
+                            enqueue(detail, False)
+                except Exception as e:
+                    # A page we can't parse mustn't stop the worker - the
+                    # others would wait on queue.join() forever
+                    self.errors[url] = f"{type(e).__name__}: {e}"
+                finally:
+                    queue.task_done()
+
+        queue.put_nowait((start_url, True))
+        workers = [asyncio.create_task(worker()) for _ in range(self.max_concurrency)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        return list(events.values())
+
+    async def _fetch(self, url: str):
+        """Page content, retrying with backoff; None if it keeps failing"""
+        for attempt in range(self.max_retries + 1):
+            await self._wait_for_host(urlparse(url).netloc)
+            try:
+                page = await asyncio.to_thread(self.fetcher.fetch, url)
+                self.pages_fetched += 1
+                return page.content
+            except Exception as e:
+                if attempt == self.max_retries or not _should_retry(e):
+                    self.errors[url] = str(e)
+                    return None
+                delay = self.backoff * 2 ** attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _wait_for_host(self, host: str):
+        """Space requests to a host at least 1/rate seconds apart"""
+        if not self.rate:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + 1 / self.rate
+        if slot > now:
+            await asyncio.sleep(slot - now)
@@ -0,0 +1,138 @@
+"""
+Data Loaders for the Streamlit App
+Streamlit reruns app.py on every click, so anything slow at the top of
+the script slows down every interaction. These loaders keep the data in
+memory and only do real work when something has changed:
+
+- CachedFile re-reads a file only when its modified time or size changes,
+  and re-parses it only when the content hash changes.
+- BackgroundRefresher runs a slow fetch (like the events scraper) on a
+  background thread on a schedule; get() always returns the latest result
+  straight away, so no user request waits for it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable
+
+
+class CachedFile:
+    """A parsed file that is reloaded only when it changes on disk"""
+
+    def __init__(self, path: str, parse: Callable[[bytes], Any] = json.loads):
+        """
+        Args:
+            path: File to load
+            parse: Turns the file's bytes into data (default: JSON)
+        """
+        self.path = path
+        self.parse = parse
+        self.version = None     # Content hash of the loaded data
+        self.loaded_at = None   # When the content last changed
+        self.reloads = 0        # Times the data was re-parsed
+        self._data = None
+        self._stat = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        """The parsed data (a cheap stat() call when nothing changed)"""
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if signature != self._stat:
+                with open(self.path, "rb") as f:
+                    content = f.read()
+                version = hashlib.sha256(content).hexdigest()[:16]
+                # A touched file with the same content keeps the parsed data
+                if version != self.version:
+                    self._data = self.parse(content)
+                    self.version = version
+                    self.loaded_at = time.time()
+                    self.reloads += 1
+                self._stat = signature
+            return self._data
+
+
+class BackgroundRefresher:
+    """Keeps the result of a slow function fresh on a background thread"""
+
+    def __init__(self, fetch: Callable[[], Any], interval: float = 3600, initial: Any = None):
+        """
+        Args:
+            fetch: Slow function to call (e.g. fetch_wcc_events) - it should
+                raise when it fails, so the last good value is kept
+            interval: Seconds between refreshes
+            initial: Value returned until the first fetch finishes
+        """
+        self.fetch = fetch
+        self.interval = interval
+        self.version = 0            # Goes up whenever the value changes
+        self.refreshing = False
+        self.last_success = None
+        self.last_error = None
+        self._value = initial
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self) -> "BackgroundRefresher":
+        """Start refreshing (the first fetch starts straight away)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="background-refresh", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def refresh_now(self):
+        """Ask for a refresh without waiting for the schedule"""
+        self._wake.set()
+
+    def get(self) -> Any:
+        """The latest value - never blocks on a fetch"""
+        with self._lock:
+            return self._value
+
+    def status(self) -> dict:
+        """How fresh the value is, for display"""
+        with self._lock:
+            return {
+                "age_seconds": time.time() - self.last_success if self.last_success else None,
+                "refreshing": self.refreshing,
+                "last_error": self.last_error,
+                "version": self.version,
+            }
+
+    def refresh(self):
+        """Fetch once and store the result (called by the background thread)"""
+        with self._lock:
+            self.refreshing = True
+        try:
+            value = self.fetch()
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+                self.refreshing = False
+            return
+        with self._lock:
+            if value != self._value:
+                self._value = value
+                self.version += 1
+            self.last_success = time.time()
+            self.last_error = None
+            self.refreshing = False
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._wake.wait(self.interval)
+            self._wake.clear()
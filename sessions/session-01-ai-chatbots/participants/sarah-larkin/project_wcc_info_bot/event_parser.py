@@ -0,0 +1,210 @@
+"""
+Event Parsing Engines
+Turns an events page into [{"title", "date", "description"}, ...].
+
+Structured data is used first when the page has it - schema.org Event
+blocks as JSON-LD (<script type="application/ld+json">) or microdata
+(itemtype=".../Event"). Those are what sites publish for search engines,
+so they're more reliable than the page layout.
+
+Otherwise an HTML engine finds the <div class="event"> blocks:
+
+    "html.parser"           BeautifulSoup, pure Python (the original)
+    "html.parser-targeted"  BeautifulSoup only building the event divs
+    "lxml"                  BeautifulSoup on the lxml C parser
+    "lxml-targeted"         lxml parser, only building the event divs
+    "lxml-xpath"            lxml directly with an XPath query (fastest)
+
+The lxml engines are only available when lxml is installed; the default
+is the fastest one available.
+"""
+
+import json
+import re
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml.etree
+    import lxml.html
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+
+_JSON_LD = re.compile(
+    rb"<script[^>]+type\s*=\s*[\"']application/ld\+json[\"'][^>]*>(.*?)</script>",
+    re.IGNORECASE | re.DOTALL
+)
+_MICRODATA_EVENT = re.compile(rb"itemtype\s*=\s*[\"'][^\"']*schema\.org/\w*Event", re.IGNORECASE)
+_EVENT_CLASS = "contains(concat(' ', normalize-space(@class), ' '), ' event ')"
+EVENT_DIVS = f"//div[{_EVENT_CLASS}]"   # XPath of the event blocks
+
+
+def _text(value) -> str:
+    """A field as text - JSON-LD values can also be lists or objects"""
+    if isinstance(value, list):
+        return next((text for text in map(_text, value) if text), "")
+    if isinstance(value, dict):
+        return _text(value.get("@value") or value.get("name"))
+    return "" if value is None else str(value).strip()
+
+
+def _event(title, date, description) -> dict:
+    return {
+        "title": _text(title),
+        "date": _text(date),
+        "description": _text(description),
+    }
+
+
+# =============================================================================
+# STRUCTURED DATA
+# =============================================================================
+
+def _json_ld_items(data):
+    """Every object in a JSON-LD document (lists and @graph included)"""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_items(item)
+    elif isinstance(data, dict):
+        yield data
+        yield from _json_ld_items(data.get("@graph", []))
+
+
+def _is_event(item: dict) -> bool:
+    types = item.get("@type", [])
+    types = types if isinstance(types, list) else [types]
+    return any(str(t).endswith("Event") for t in types)
+
+
+def parse_json_ld(html: bytes) -> List[dict]:
+    """Events from JSON-LD script blocks (no HTML parsing needed)"""
+    events = []
+    for match in _JSON_LD.finditer(html):
+        try:
+            data = json.loads(match.group(1))
+        except ValueError:
+            continue
+        for item in _json_ld_items(data):
+            if _is_event(item):
+                events.append(_event(item.get("name"), item.get("startDate"), item.get("description")))
+    return events
+
+
+def parse_microdata(html: bytes) -> List[dict]:
+    """Events from schema.org microdata (itemtype=".../Event")"""
+    if not _MICRODATA_EVENT.search(html):
+        return []
+    only = SoupStrainer(attrs={"itemtype": re.compile(r"schema\.org/\w*Event", re.IGNORECASE)})
+    soup = BeautifulSoup(html, "lxml" if HAS_LXML else "html.parser", parse_only=only)
+
+    def is_item(tag):
+        return tag.has_attr("itemscope") or tag.has_attr("itemtype")
+
+    def prop(node, name):
+        # Only the event's own properties - not those of items nested in
+        # it, like the name of its location
+        for found in node.find_all(attrs={"itemprop": name}):
+            if found.find_parent(is_item) is node:
+                return found.get("content") or found.get("datetime") or found.get_text()
+        return ""
+
+    return [
+        _event(prop(node, "name"), prop(node, "startDate"), prop(node, "description"))
+        for node in soup.find_all(attrs={"itemtype": True})
+        if re.search(r"schema\.org/\w*Event", node["itemtype"], re.IGNORECASE)
+    ]
+
+
+# =============================================================================
+# HTML ENGINES
+# =============================================================================
+
+def _soup_engine(parser: str, targeted: bool) -> Callable[[bytes], List[dict]]:
+    def parse(html: bytes) -> List[dict]:
+        # SoupStrainer skips building everything outside the event divs
+        only = SoupStrainer("div", class_="event") if targeted else None
+        soup = BeautifulSoup(html, parser, parse_only=only)
+
+        def text(node, *args, **kwargs):
+            found = node.find(*args, **kwargs)
+            return found.text if found is not None else ""
+
+        return [
+            _event(text(div, "h3"), text(div, "span", class_="date"), text(div, "p"))
+            for div in soup.find_all("div", class_="event")
+        ]
+    return parse
+
+
+def parse_tree(html: bytes):
+    """
+    Parse a page once with lxml, so several readers (events, links) can
+    share the tree. None for an empty document.
+    """
+    try:
+        return lxml.html.fromstring(html)
+    except lxml.etree.ParserError:
+        # "Document is empty": blank, or only a comment or XML declaration
+        return None
+
+
+def _parse_lxml_xpath(html: bytes, tree=None) -> List[dict]:
+    root = tree if tree is not None else parse_tree(html)
+    if root is None:
+        return []
+
+    def text(div, path):
+        found = div.xpath(path)
+        return found[0].text_content() if found else ""
+
+    return [
+        _event(
+            text(div, ".//h3"),
+            text(div, f".//span[contains(concat(' ', normalize-space(@class), ' '), ' date ')]"),
+            text(div, ".//p")
+        )
+        for div in root.xpath(EVENT_DIVS)
+    ]
+
+
+ENGINES: Dict[str, Callable[[bytes], List[dict]]] = {
+    "html.parser": _soup_engine("html.parser", targeted=False),
+    "html.parser-targeted": _soup_engine("html.parser", targeted=True),
+}
+if HAS_LXML:
+    ENGINES.update({
+        "lxml": _soup_engine("lxml", targeted=False),
+        "lxml-targeted": _soup_engine("lxml", targeted=True),
+        "lxml-xpath": _parse_lxml_xpath,
+    })
+
+DEFAULT_ENGINE = "lxml-xpath" if HAS_LXML else "html.parser-targeted"
+
+
+def parse_events(html: bytes, engine: str = None, structured: bool = True, tree=None) -> List[dict]:
+    """
+    Pull the events out of an events page.
+
+    Args:
+        html: Page content
+        engine: Name from ENGINES for the HTML fallback (default: fastest available)
+        structured: Use JSON-LD / microdata events when the page has them
+        tree: The page already parsed with parse_tree(), reused by the
+            "lxml-xpath" engine instead of parsing the page again
+
+    Returns:
+        Event dicts with "title", "date" and "description"
+    """
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+    if structured:
+        events = parse_json_ld(html) or parse_microdata(html)
+        if events:
+            return events
+    engine = engine or DEFAULT_ENGINE
+    if engine == "lxml-xpath" and tree is not None:
+        return _parse_lxml_xpath(html, tree)
+    return ENGINES[engine](html)
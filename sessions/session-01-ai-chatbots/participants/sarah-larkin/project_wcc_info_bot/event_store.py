@@ -0,0 +1,261 @@
+"""
+Incremental Event Store
+Keeps the scraped events on disk (SQLite) and works out what changed
+between scrapes, instead of starting from scratch every time.
+
+- Each event gets a fingerprint (hash of its content); a new scrape is
+  compared against the stored fingerprints and order to find inserted,
+  updated, deleted and moved events. Only events whose order relative to
+  the others changed count as moved, so a new event at the top of the
+  page doesn't move everything below it
+- Every change is appended to a change feed, so prompt and index builders
+  can process only what changed since they last looked (changes_since)
+- The feed doubles as a compact history - one row per change, not a copy
+  of the whole list per scrape - which answers "what's new this week?"
+  without scraping again (new_since)
+
+    store = EventStore("events.db")
+    changes = store.sync(fetch_wcc_events())
+    print(changes.inserted, changes.updated, changes.deleted, changes.moved)
+"""
+
+import bisect
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+
+def event_key(event: dict) -> str:
+    """Identity of an event across scrapes (its URL, else title + date)"""
+    if event.get("url"):
+        return event["url"]
+    return f"{event.get('title', '').strip().lower()}|{event.get('date', '').strip()}"
+
+
+def event_fingerprint(event: dict) -> str:
+    """Hash of everything in the event - changes whenever any field does"""
+    content = json.dumps(event, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def moved_keys(keys: List[str], old_positions: Dict[str, int]) -> set:
+    """
+    Which of keys (in their new order) moved, given where they used to be.
+
+    The longest run of keys still in their old relative order stays put
+    (a longest increasing subsequence of old positions); the rest moved.
+    That's the fewest moves that turn the old order into the new one.
+    """
+    tails = []       # tails[n]: index of the smallest last key of a run n + 1 long
+    tail_positions = []
+    previous = []    # previous[i]: index of the key before keys[i] in its run
+    for i, key in enumerate(keys):
+        position = old_positions[key]
+        n = bisect.bisect_left(tail_positions, position)
+        previous.append(tails[n - 1] if n else None)
+        if n == len(tails):
+            tails.append(i)
+            tail_positions.append(position)
+        else:
+            tails[n] = i
+            tail_positions[n] = position
+
+    kept = set()
+    i = tails[-1] if tails else None
+    while i is not None:
+        kept.add(keys[i])
+        i = previous[i]
+    return set(keys) - kept
+
+
+class ChangeSet(NamedTuple):
+    inserted: List[dict]
+    updated: List[dict]
+    deleted: List[dict]
+    moved: List[dict]    # Same content, new place on the page
+
+    def __bool__(self):
+        return bool(self.inserted or self.updated or self.deleted or self.moved)
+
+
+class Change(NamedTuple):
+    id: int          # Position in the change feed
+    kind: str        # "insert", "update", "delete" or "move"
+    key: str
+    event: dict      # The new version (the last version for deletes)
+    at: float        # When the scrape that found it ran
+
+
+class EventStore:
+    """Current events plus a feed of every change, in one SQLite file"""
+
+    def __init__(self, path: str = "events.db"):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "key TEXT PRIMARY KEY, fingerprint TEXT, data TEXT, "
+                "first_seen REAL, last_seen REAL, position INTEGER)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS changes ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT, key TEXT, data TEXT, at REAL)"
+            )
+            self._db.commit()
+
+    def sync(self, events: List[dict], scraped_at: float = None, allow_empty: bool = False) -> ChangeSet:
+        """
+        Store a fresh scrape and record what changed since the last one.
+
+        Args:
+            events: Every event currently on the site
+            scraped_at: When the scrape ran (default: now)
+            allow_empty: Accept an empty scrape as "all events removed". By
+                default it's ignored, since it usually means the scrape failed.
+        """
+        scraped_at = scraped_at or time.time()
+        with self._lock:
+            stored = {
+                key: (fingerprint, data, position)
+                for key, fingerprint, data, position in self._db.execute(
+                    "SELECT key, fingerprint, data, position FROM events"
+                )
+            }
+            if not events and stored and not allow_empty:
+                return ChangeSet([], [], [], [])
+
+            changes = ChangeSet([], [], [], [])
+            kept = list(dict.fromkeys(event_key(e) for e in events if event_key(e) in stored))
+            moved = moved_keys(kept, {key: stored[key][2] for key in kept})
+            seen = set()
+            for position, event in enumerate(events):
+                key = event_key(event)
+                if key in seen:
+                    continue
+                seen.add(key)
+                fingerprint = event_fingerprint(event)
+                data = json.dumps(event)
+                if key not in stored:
+                    changes.inserted.append(event)
+                    self._record("insert", key, data, scraped_at)
+                    self._db.execute(
+                        "INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, fingerprint, data, scraped_at, scraped_at, position)
+                    )
+                    continue
+                if stored[key][0] != fingerprint:
+                    changes.updated.append(event)
+                    self._record("update", key, data, scraped_at)
+                elif key in moved:
+                    # Only the order changed - still a change for anything
+                    # that lists events in page order
+                    changes.moved.append(event)
+                    self._record("move", key, data, scraped_at)
+                self._db.execute(
+                    "UPDATE events SET fingerprint = ?, data = ?, last_seen = ?, position = ? WHERE key = ?",
+                    (fingerprint, data, scraped_at, position, key)
+                )
+
+            for key, (_, data, _) in stored.items():
+                if key not in seen:
+                    changes.deleted.append(json.loads(data))
+                    self._record("delete", key, data, scraped_at)
+                    self._db.execute("DELETE FROM events WHERE key = ?", (key,))
+
+            self._db.commit()
+        return changes
+
+    def _record(self, kind: str, key: str, data: str, at: float):
+        self._db.execute(
+            "INSERT INTO changes (kind, key, data, at) VALUES (?, ?, ?, ?)",
+            (kind, key, data, at)
+        )
+
+    def current(self) -> List[dict]:
+        """The events from the latest scrape, in page order"""
+        with self._lock:
+            rows = self._db.execute("SELECT data FROM events ORDER BY position").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def keys(self) -> List[str]:
+        """Keys of the current events, in page order"""
+        with self._lock:
+            rows = self._db.execute("SELECT key FROM events ORDER BY position").fetchall()
+        return [row[0] for row in rows]
+
+    def changes_since(self, change_id: int = 0) -> List[Change]:
+        """The change feed after a cursor (pass the id of the last change you processed)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, kind, key, data, at FROM changes WHERE id > ? ORDER BY id",
+                (change_id,)
+            ).fetchall()
+        return [Change(id, kind, key, json.loads(data), at) for id, kind, key, data, at in rows]
+
+    @property
+    def last_change_id(self) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT MAX(id) FROM changes").fetchone()
+        return row[0] or 0
+
+    def new_since(self, timestamp: float) -> List[dict]:
+        """Events first seen after a time that are still listed ("what's new this week")"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT data FROM events WHERE first_seen > ? ORDER BY first_seen, position",
+                (timestamp,)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def compact(self, keep_seconds: float = 90 * 24 * 3600):
+        """Drop change feed entries older than the retention window"""
+        with self._lock:
+            self._db.execute("DELETE FROM changes WHERE at < ?", (time.time() - keep_seconds,))
+            self._db.commit()
+
+
+class RenderedEvents:
+    """
+    Keeps a rendered version of every event (e.g. a prompt line), updating
+    only the events that changed since the last refresh.
+    """
+
+    def __init__(self, store: EventStore, render: Callable[[dict], str]):
+        self.store = store
+        self.render = render
+        self.cursor = 0
+        self.rendered: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> bool:
+        """Apply new changes from the feed; True if anything changed"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> bool:
+        changes = self.store.changes_since(self.cursor)
+        if not changes and self.cursor:
+            return False
+        if not self.cursor:
+            # First run: start from the current events
+            self.rendered = {event_key(e): self.render(e) for e in self.store.current()}
+        else:
+            for change in changes:
+                if change.kind == "delete":
+                    self.rendered.pop(change.key, None)
+                elif change.kind != "move":
+                    self.rendered[change.key] = self.render(change.event)
+            # New and moved events go where they are on the page
+            self.rendered = {
+                key: self.rendered[key] for key in self.store.keys() if key in self.rendered
+            }
+        self.cursor = changes[-1].id if changes else self.cursor
+        return True
+
+    def lines(self) -> List[str]:
+        """Rendered events, in page order"""
+        return list(self.rendered.values())
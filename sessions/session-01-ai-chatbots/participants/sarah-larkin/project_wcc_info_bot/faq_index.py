@@ -0,0 +1,322 @@
+"""
+FAQ Embedding Index
+Finds the FAQs relevant to a question, so the prompt only carries those
+instead of every FAQ in wcc_faqs.json.
+
+Build step (run whenever wcc_faqs.json changes - only new or edited FAQs
+are embedded again, the rest are reused by their content hash):
+
+    python faq_index.py wcc_faqs.json              # Gemini embeddings
+    python faq_index.py wcc_faqs.json --offline    # HashingEmbedder, no API key
+
+Each build writes a new version directory, then points faq_index/CURRENT
+at it - one atomic rename, so a running app sees either the old index or
+the new one, never vectors from one build with FAQs from another:
+
+    faq_index/CURRENT                 name of the live version, e.g. "v-3f2a..."
+    faq_index/v-3f2a.../vectors.npy   (FAQs x dimensions) float32 matrix, unit-length rows
+    faq_index/v-3f2a.../faqs.json     row -> FAQ sidecar, plus content hashes and the embedder used
+
+At runtime the matrix is memory-mapped (the OS pages it in as needed, and
+every process shares one copy) and a question is scored against all FAQs
+with one matrix-vector product:
+
+    index = FAQIndex("faq_index")
+    for match in index.search("How do I become a member?", k=3):
+        print(match.score, match.question)
+
+Query embeddings are cached, so a repeated question doesn't call the
+embeddings API again. If embedding a question fails, search falls back
+to matching key words (keyword_search), which needs no API.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional
+
+import numpy as np
+
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+
+from intent_matcher import key_terms
+from semantic_cache import HashingEmbedder, gemini_embedder
+
+VECTORS_FILE = "vectors.npy"
+SIDECAR_FILE = "faqs.json"
+CURRENT_FILE = "CURRENT"
+KEEP_VERSIONS = 2   # The live version and the one before (still open in running apps)
+DEFAULT_EMBEDDER = "gemini:models/text-embedding-004"
+
+
+class FAQMatch(NamedTuple):
+    question: str
+    answer: str
+    score: float  # Cosine similarity
+
+
+def faq_hash(faq: dict) -> str:
+    """Content hash of a FAQ - it only needs embedding again when this changes"""
+    content = json.dumps([faq["question"], faq["answer"]], ensure_ascii=False)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+
+
+def make_embedder(name: str, dimensions: int = 512) -> Callable[[str], np.ndarray]:
+    """Embedding function from its name ("hashing" or "gemini:<model>")"""
+    if name == "hashing":
+        return HashingEmbedder(dimensions)
+    if name.startswith("gemini:"):
+        return gemini_embedder(name.split(":", 1)[1])
+    raise ValueError(f"Unknown embedder {name!r}")
+
+
+def _unit(vector: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def current_version(directory: str = "faq_index") -> Optional[str]:
+    """Name of the live index version, or None if there's no index yet"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _read_sidecar(version_directory: str):
+    path = os.path.join(version_directory, SIDECAR_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _remove_old_versions(directory: str, live: str):
+    """Delete all but the newest KEEP_VERSIONS version directories"""
+    versions = sorted(
+        (entry for entry in os.scandir(directory) if entry.is_dir() and entry.name.startswith("v-")),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    for entry in versions[KEEP_VERSIONS:]:
+        if entry.name != live:
+            for name in os.listdir(entry.path):
+                os.remove(os.path.join(entry.path, name))
+            os.rmdir(entry.path)
+
+
+def keyword_search(faqs: List[dict], question: str, k: int = 3) -> List[FAQMatch]:
+    """
+    FAQs sharing the most key words with a question - no embeddings needed.
+
+    Scores are the Dice overlap of key words (0-1), so they aren't
+    comparable with FAQIndex's cosine scores.
+    """
+    terms = key_terms(question)
+    if not terms or k <= 0:
+        return []
+    scored = []
+    for faq in faqs:
+        faq_terms = key_terms(f"{faq['question']} {faq['answer']}")
+        overlap = len(terms & faq_terms)
+        if overlap:
+            scored.append(FAQMatch(faq["question"], faq["answer"], 2 * overlap / (len(terms) + len(faq_terms))))
+    scored.sort(key=lambda match: -match.score)
+    return scored[:k]
+
+
+def build_index(faqs: List[dict], directory: str = "faq_index", embedder: str = None) -> dict:
+    """
+    Embed the FAQs and save the index, reusing unchanged FAQs' vectors.
+
+    Args:
+        faqs: [{"question", "answer"}, ...] as in wcc_faqs.json
+        directory: Where to write the index versions and CURRENT
+        embedder: "hashing" or "gemini:<model>" (default: whatever the
+            existing index used, else Gemini)
+
+    Returns:
+        Counts of FAQs embedded, reused and removed
+    """
+    live = current_version(directory)
+    live_directory = os.path.join(directory, live) if live else None
+    sidecar = _read_sidecar(live_directory) if live else None
+    embedder = embedder or (sidecar or {}).get("embedder", DEFAULT_EMBEDDER)
+
+    # Vectors we already have, by content hash (only valid for the same embedder)
+    existing = {}
+    if sidecar and sidecar["embedder"] == embedder:
+        if [entry["hash"] for entry in sidecar["faqs"]] == [faq_hash(faq) for faq in faqs]:
+            return {"embedded": 0, "reused": len(faqs), "removed": 0}  # Already up to date
+        vectors = np.load(os.path.join(live_directory, VECTORS_FILE), mmap_mode="r")
+        existing = {entry["hash"]: vectors[row] for row, entry in enumerate(sidecar["faqs"])}
+
+    embed = None
+    rows = []
+    entries = []
+    embedded = 0
+    for faq in faqs:
+        content_hash = faq_hash(faq)
+        vector = existing.get(content_hash)
+        if vector is None:
+            embed = embed or make_embedder(embedder)
+            vector = _unit(np.asarray(embed(f"{faq['question']}\n{faq['answer']}"), dtype=np.float32))
+            embedded += 1
+        rows.append(np.array(vector, dtype=np.float32))
+        entries.append({"hash": content_hash, "question": faq["question"], "answer": faq["answer"]})
+
+    dimensions = len(rows[0]) if rows else 0
+    matrix = np.vstack(rows) if rows else np.zeros((0, 0), dtype=np.float32)
+    kept = {entry["hash"] for entry in entries}
+
+    # Write a new version directory, then swap the CURRENT pointer to it in
+    # one rename, so a running app never sees a half-written index
+    sidecar = {"embedder": embedder, "dimensions": dimensions, "faqs": entries}
+    content = json.dumps(sidecar, sort_keys=True, ensure_ascii=False)
+    version = "v-" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:16]
+    version_directory = os.path.join(directory, version)
+    if _read_sidecar(version_directory) is None:
+        os.makedirs(version_directory, exist_ok=True)
+        with open(os.path.join(version_directory, VECTORS_FILE), "wb") as f:
+            np.save(f, matrix)
+        with open(os.path.join(version_directory, SIDECAR_FILE), "w", encoding="utf-8") as f:
+            json.dump(sidecar, f, indent=2)
+    else:
+        # Built before (e.g. an edit that was undone) and maybe open in a
+        # running app - the sidecar is written last, so it's complete. Reuse
+        # it, marked newest so it isn't cleaned up
+        os.utime(version_directory)
+
+    pointer = os.path.join(directory, CURRENT_FILE)
+    with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(pointer + ".tmp", pointer)
+    _remove_old_versions(directory, version)
+
+    return {
+        "embedded": embedded,
+        "reused": len(entries) - embedded,
+        "removed": len([h for h in existing if h not in kept]),
+    }
+
+
+class FAQIndex:
+    """Read-only, memory-mapped FAQ index built by build_index()"""
+
+    def __init__(self, directory: str = "faq_index", max_cached_queries: int = 1024):
+        """
+        Args:
+            directory: Index directory written by build_index()
+            max_cached_queries: Question embeddings kept for repeat questions
+        """
+        self.version = current_version(directory)
+        sidecar = _read_sidecar(os.path.join(directory, self.version)) if self.version else None
+        if sidecar is None:
+            raise FileNotFoundError(
+                f"No FAQ index in {directory!r} - build it with: python faq_index.py wcc_faqs.json"
+            )
+        self.faqs = sidecar["faqs"]
+        self.vectors = np.load(os.path.join(directory, self.version, VECTORS_FILE), mmap_mode="r")
+        self.embed = make_embedder(sidecar["embedder"], sidecar["dimensions"] or 512)
+        self.max_cached_queries = max_cached_queries
+        self.last_error = None   # Why the last search fell back to key words
+        self._queries = OrderedDict()   # question -> unit vector, least recently used first
+        self._lock = threading.Lock()
+
+    def is_current(self, faqs: List[dict]) -> bool:
+        """Whether the index was built from exactly these FAQs"""
+        return [entry["hash"] for entry in self.faqs] == [faq_hash(faq) for faq in faqs]
+
+    def _query_vector(self, question: str) -> np.ndarray:
+        """Embedding of a question, from the cache when it was asked before"""
+        with self._lock:
+            vector = self._queries.get(question)
+            if vector is not None:
+                self._queries.move_to_end(question)
+                return vector
+        vector = _unit(np.asarray(self.embed(question), dtype=np.float32))
+        with self._lock:
+            self._queries[question] = vector
+            while len(self._queries) > self.max_cached_queries:
+                self._queries.popitem(last=False)
+        return vector
+
+    def __len__(self) -> int:
+        return len(self.faqs)
+
+    def search(self, question: str, k: int = 3, min_score: float = 0.0) -> List[FAQMatch]:
+        """
+        Most similar FAQs to a question.
+
+        Args:
+            question: The user's question
+            k: Most FAQs to return
+            min_score: Leave out FAQs less similar than this
+
+        Returns:
+            Up to k FAQMatch, best first (by key words if the question
+            couldn't be embedded - see last_error)
+        """
+        self.last_error = None
+        if not self.faqs or k <= 0:
+            return []
+
+        try:
+            query = self._query_vector(question)
+        except Exception as e:
+            # Embeddings API down or out of quota - key words still find most FAQs
+            self.last_error = str(e)
+            return keyword_search(self.faqs, question, k)
+        scores = self.vectors @ query
+        if len(scores) > k:
+            # Only fully sort the k best
+            top = np.argpartition(-scores, k)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        return [
+            FAQMatch(self.faqs[row]["question"], self.faqs[row]["answer"], float(scores[row]))
+            for row in top
+            if scores[row] >= min_score
+        ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the FAQ embedding index")
+    parser.add_argument("faqs", nargs="?", default="wcc_faqs.json", help="FAQ JSON file")
+    parser.add_argument("--output", default="faq_index", help="Index directory")
+    parser.add_argument("--offline", action="store_true", help="Use the HashingEmbedder (no API key)")
+    parser.add_argument("--embedder", help='"hashing" or "gemini:<model>"')
+    args = parser.parse_args()
+
+    with open(args.faqs, encoding="utf-8") as f:
+        faqs = json.load(f)["faqs"]
+
+    embedder = "hashing" if args.offline else args.embedder
+    if embedder is None or embedder.startswith("gemini:"):
+        import google.generativeai as genai
+        from dotenv import load_dotenv
+        load_dotenv()
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+    counts = build_index(faqs, args.output, embedder)
+    print(
+        f"✅ {len(faqs)} FAQs indexed in {args.output}/ "
+        f"({counts['embedded']} embedded, {counts['reused']} reused, {counts['removed']} removed)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+HTTP Fetch Layer with Revalidation
+Downloads pages with a pooled session, timeouts and an on-disk cache.
+
+The first fetch of a URL saves the page with its ETag / Last-Modified
+headers. Later fetches send them back (If-None-Match / If-Modified-Since);
+if the page hasn't changed the server answers "304 Not Modified" with no
+body and we serve the saved copy. Each result has a version (hash of the
+content) so callers can also skip re-parsing unchanged pages.
+
+    fetcher = HTTPFetcher(cache_dir=".http_cache")
+    page = fetcher.fetch("https://www.womencodingcommunity.com/events")
+    page.status      # 200 first time, 304 when unchanged
+    page.content     # The page bytes either way
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import NamedTuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int          # 200, or 304 when the saved copy is still current
+    content: bytes
+    version: str         # Hash of the content - changes only when the page does
+    from_cache: bool
+
+
+class HTTPFetcher:
+    """Pooled, cached, conditional HTTP GETs"""
+
+    def __init__(
+        self,
+        cache_dir: str = ".http_cache",
+        timeout: tuple = (3.05, 10),
+        pool_size: int = 10,
+        session: requests.Session = None
+    ):
+        """
+        Args:
+            cache_dir: Where saved pages live (None = keep them in memory only)
+            timeout: (connect, read) timeouts in seconds
+            pool_size: Connections kept open per host
+            session: Optional requests.Session to use
+        """
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.stats = {"requests": 0, "not_modified": 0, "downloaded": 0}
+        self._memory = {}   # url -> (meta, content) when cache_dir is None
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def fetch(self, url: str, headers: dict = None) -> FetchResult:
+        """
+        GET a URL, revalidating any saved copy.
+
+        Raises:
+            requests.RequestException: Network errors, timeouts and HTTP errors
+        """
+        saved = self._load(url)
+        request_headers = dict(headers or {})
+        if saved:
+            meta, _ = saved
+            if meta.get("etag"):
+                request_headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                request_headers["If-Modified-Since"] = meta["last_modified"]
+
+        response = self.session.get(url, headers=request_headers, timeout=self.timeout)
+        with self._lock:
+            self.stats["requests"] += 1
+
+        if response.status_code == 304 and saved:
+            meta, content = saved
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return FetchResult(url, 304, content, meta["version"], True)
+
+        if response.status_code == 304:
+            # Not modified, but we have no copy to serve (the caller sent its
+            # own validators) - ask again for the page itself
+            unconditional = {
+                name: value for name, value in request_headers.items()
+                if name.lower() not in ("if-none-match", "if-modified-since")
+            }
+            response = self.session.get(url, headers=unconditional, timeout=self.timeout)
+            with self._lock:
+                self.stats["requests"] += 1
+
+        response.raise_for_status()
+        content = response.content
+        meta = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "version": hashlib.sha256(content).hexdigest()[:16],
+            "fetched_at": time.time(),
+        }
+        self._save(url, meta, content)
+        with self._lock:
+            self.stats["downloaded"] += 1
+        return FetchResult(url, response.status_code, content, meta["version"], False)
+
+    def close(self):
+        self.session.close()
+
+    def _paths(self, url: str) -> tuple:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        base = os.path.join(self.cache_dir, key)
+        return base + ".json", base + ".body"
+
+    def _load(self, url: str):
+        """Saved (meta, content) for a URL, or None"""
+        if not self.cache_dir:
+            return self._memory.get(url)
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, url: str, meta: dict, content: bytes):
+        if not self.cache_dir:
+            self._memory[url] = (meta, content)
+            return
+        # Body first, then metadata, each swapped in whole - a reader never
+        # gets metadata pointing at a half-written body
+        meta_path, body_path = self._paths(url)
+        suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(body_path + suffix, "wb") as f:
+            f.write(content)
+        os.replace(body_path + suffix, body_path)
+        with open(meta_path + suffix, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
@@ -1,28 +1,58 @@
-import requests
-from bs4 import BeautifulSoup
+import asyncio
 import json
+from http_fetch import HTTPFetcher
+from event_parser import parse_events
 
-def scrape_wcc_events():
-    """Scrape upcoming events from WCC website"""
-    url = "https://www.womencodingcommunity.com/events" #TODO: No events coming up, is there an API for this? 
-    
+EVENTS_URL = "https://www.womencodingcommunity.com/events" #TODO: No events coming up, is there an API for this?
+
+_fetcher = None
+_parsed = {}  # url -> (page version, events), so unchanged pages aren't parsed again
+
+
+def get_fetcher() -> HTTPFetcher:
+    """One shared fetcher, so every scrape reuses the same connections and cache"""
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = HTTPFetcher()
+    return _fetcher
+
+
+def fetch_wcc_events(url: str = EVENTS_URL, fetcher: HTTPFetcher = None):
+    """
+    Scrape upcoming events from WCC website, raising if it fails - so a
+    caller can tell "no events" from "couldn't get the events" (e.g. to
+    keep the last good list)
+    """
+    # An unchanged page costs one 304 response and no parsing
+    page = (fetcher or get_fetcher()).fetch(url)
+    cached = _parsed.get(url)
+    if cached is None or cached[0] != page.version:
+        cached = _parsed[url] = (page.version, parse_events(page.content))
+
+    return [dict(event) for event in cached[1]]
+
+
+def scrape_wcc_events(url: str = EVENTS_URL, fetcher: HTTPFetcher = None):
+    """Scrape upcoming events from WCC website (no events if it fails)"""
     try:
-        response = requests.get(url)
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        events = []
-        for event in soup.find_all('div', class_='event'):
-            events.append({
-                "title": event.find('h3').text,
-                "date": event.find('span', class_='date').text,
-                "description": event.find('p').text
-            })
-        
-        return events
+        return fetch_wcc_events(url, fetcher)
     except Exception as e:
         print(f"Error scraping: {e}")
         return []
 
+def crawl_wcc_events(start_url: str = EVENTS_URL, **options):
+    """
+    Crawl every page of a paginated events listing (and each event's
+    detail page) concurrently - see crawler.EventCrawler for the options
+    """
+    from crawler import EventCrawler
+
+    try:
+        return asyncio.run(EventCrawler(**options).crawl(start_url))
+    except Exception as e:
+        print(f"Error crawling: {e}")
+        return []
+
 # # Use in chatbot
 # events = scrape_wcc_events()
 # events_text = "\n".join([
@@ -33,4 +63,4 @@ def scrape_wcc_events():
 # system_prompt = f"""You are a WCC assistant.
 # Upcoming events:
 # {events_text}
-# """
\ No newline at end of file
+# """
@@ -1,8 +1,20 @@
 import os
+import sys
+from pathlib import Path
 import google.generativeai as genai
 from dotenv import load_dotenv
 import json
 
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from context_window import ContextWindow, message_text
+from conversation_store import ConversationManager
+from intent_matcher import IntentMatcher
+
 
 # Load environment variables from .env file
 load_dotenv()
@@ -21,19 +33,117 @@ genai.configure(api_key=API_KEY)
 class SimpleBot:
     """A simple chatbot using Gemini API"""
 
-    def __init__(self, system_prompt: str = None):
+    def __init__(
+        self,
+        system_prompt: str = None,
+        max_context_tokens: int = None,
+        min_recent_messages: int = 2,
+        summarize_dropped: bool = False,
+        model: genai.GenerativeModel = None,
+        conversations: ConversationManager = None,
+        session_id: str = None,
+        intents: IntentMatcher = None,
+        retrieve=None
+    ):
         """
         Initialize the chatbot.
 
         Args:
             system_prompt: Optional system prompt to set bot personality
+            max_context_tokens: Optional token budget for the history sent
+                on each turn (None = send the whole conversation)
+            min_recent_messages: Latest messages always kept in the context
+            summarize_dropped: Summarize turns that fall out of the budget
+                instead of forgetting them
+            model: Optional ready-made model to share between bots (must
+                already use system_prompt as its system instruction)
+            conversations: Optional ConversationManager to save the history
+                to disk instead of keeping it only in memory
+            session_id: Conversation to load/save (required with conversations)
+            intents: Optional IntentMatcher (e.g. built from the FAQs) whose
+                confident matches are answered without calling the model
+            retrieve: Optional function returning reference text for a
+                question (e.g. the relevant FAQs). It is sent with that turn
+                only and not saved in the history.
         """
-        self.model = genai.GenerativeModel(
+        self.model = model or genai.GenerativeModel(
             "gemini-2.5-flash-lite",
             system_instruction=system_prompt
         )
         self.system_prompt = system_prompt
-        self.conversation_history = []
+        self.conversations = conversations
+        self.session_id = session_id
+        self.intents = intents
+        self.retrieve = retrieve
+        self._history = []
+        self.last_input_tokens = 0  # Prompt tokens used by the last request
+        self.last_path = None       # "fast_path" or "model": what served the last reply
+        self.last_error = None      # Why the last turn failed (None if it didn't)
+
+        # Keep the prompt bounded so per-turn latency stays flat
+        self.context_window = None
+        if max_context_tokens:
+            self.context_window = ContextWindow(
+                max_context_tokens,
+                min_recent_messages=min_recent_messages,
+                summarizer=self._summarize if summarize_dropped else None
+            )
+
+    @property
+    def conversation_history(self) -> list:
+        """Messages so far (for a saved session: the recent part loaded in memory)"""
+        if self.conversations:
+            return self.conversations.history(self.session_id)
+        return self._history
+
+    def _add_turn(self, user_message: str, bot_response: str):
+        """Add a finished turn to the history (and save it, if using a store) -
+        only once the reply is complete, and both messages together, so a
+        failed turn never leaves a question without an answer"""
+        turn = [
+            {"role": "user", "parts": [user_message]},
+            {"role": "model", "parts": [bot_response]},
+        ]
+        if self.conversations:
+            self.conversations.extend(self.session_id, turn)
+        else:
+            self._history.extend(turn)
+
+    def _build_context(self, user_message: str) -> list:
+        """Get the part of the conversation to send to the model, ending with
+        the new message (and its reference text, which counts towards the
+        token budget like any other message)"""
+        reference = self.retrieve(user_message) if self.retrieve else ""
+        question = f"{reference}\n\nQuestion: {user_message}" if reference else user_message
+        history = self.conversation_history + [{"role": "user", "parts": [question]}]
+        if self.context_window is None:
+            return history
+        return self.context_window.select(history)
+
+    def _summarize(self, previous_summary: str, dropped: list) -> str:
+        """Fold turns that no longer fit the budget into a short summary"""
+        transcript = "\n".join(
+            f"{m['role']}: {message_text(m)}" for m in dropped
+        )
+        prompt = (
+            "Summarize this conversation in a few sentences, keeping names, "
+            "facts and anything the user asked you to remember.\n\n"
+        )
+        if previous_summary:
+            prompt += f"Earlier summary: {previous_summary}\n\n"
+        prompt += transcript
+        return self.model.generate_content(prompt).text
+
+    def _fast_answer(self, user_message: str):
+        """Answer from the intents without the model, if the match is confident"""
+        match = self.intents.match(user_message) if self.intents else None
+        if match is None:
+            self.last_path = "model"
+            return None
+        self._add_turn(user_message, match.answer)
+        self.last_input_tokens = 0
+        self.last_path = "fast_path"
+        return match.answer
 
     def chat(self, user_message: str) -> str:
         """
@@ -45,35 +155,79 @@ class SimpleBot:
         Returns:
             The bot's response
         """
+        self.last_error = None
         try:
-            # Add user message to history
-            self.conversation_history.append(
-                {"role": "user", "parts": [user_message]}
-            )
+            fast_answer = self._fast_answer(user_message)
+            if fast_answer is not None:
+                return fast_answer
 
-            # Generate response using conversation history
+            # Generate response using (budgeted) conversation history
             response = self.model.generate_content(
-                self.conversation_history
+                self._build_context(user_message)
             )
 
             # Extract response text
             bot_response = response.text
+            self.last_input_tokens = response.usage_metadata.prompt_token_count
 
-            # Add bot response to history
-            self.conversation_history.append(
-                {"role": "model", "parts": [bot_response]}
-            )
+            # Add the finished turn to history
+            self._add_turn(user_message, bot_response)
 
             return bot_response
 
         except Exception as e:
+            self.last_error = str(e)
             error_msg = f"Error: {str(e)}"
             print(error_msg)
             return error_msg
 
+    def chat_stream(self, user_message: str):
+        """
+        Send a message and stream the response as it is generated.
+
+        The turn is added to the conversation history once the stream has
+        finished. If it fails, nothing is added and the error is kept in
+        bot.last_error instead of being mixed into the reply.
+
+        Args:
+            user_message: The user's input message
+
+        Yields:
+            Chunks of the bot's response text
+        """
+        self.last_error = None
+        try:
+            fast_answer = self._fast_answer(user_message)
+            if fast_answer is not None:
+                yield fast_answer
+                return
+
+            # Ask for the response in chunks instead of waiting for all of it
+            response = self.model.generate_content(
+                self._build_context(user_message),
+                stream=True
+            )
+
+            chunks = []
+            for chunk in response:
+                chunks.append(chunk.text)
+                yield chunk.text
+            # Usage is reported once the stream has finished
+            self.last_input_tokens = response.usage_metadata.prompt_token_count
+
+            # Add the finished turn to history
+            self._add_turn(user_message, "".join(chunks))
+
+        except Exception as e:
+            self.last_error = str(e)
+
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        if self.conversations:
+            self.conversations.clear(self.session_id)
+        self._history = []
+        if self.context_window:
+            self.context_window.reset()
 
 
 # def main():
@@ -118,9 +272,11 @@ class SimpleBot:
 #                 print("Conversation history cleared.\n")
 #                 continue
 
-#             # Get response from bot
-#             response = bot.chat(user_input)
-#             print(f"\nBot: {response}\n")
+#             # Stream response from bot as it is generated
+#             print("\nBot: ", end="", flush=True)
+#             for chunk in bot.chat_stream(user_input):
+#                 print(chunk, end="", flush=True)
+#             print("\n")
 
 #         except KeyboardInterrupt:
 #             print("\n\nGoodbye! 👋")
@@ -1,18 +1,203 @@
-from sl_chatbot import SimpleBot
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
 
-def test_wcc_bot():
-    bot = SimpleBot(system_prompt="You are a WCC assistant.")
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from cassette import Cassette
+from context_window import estimate_tokens, message_text
+from intent_matcher import IntentMatcher
+from faq_index import FAQIndex, build_index, current_version, keyword_search
+from data_loader import BackgroundRefresher, CachedFile
+
+# Recorded Gemini responses - the test replays them offline in milliseconds
+# (it never calls the API unless asked to). Record again with
+# CASSETTE_MODE=record and a real GEMINI_API_KEY after changing the prompts.
+CASSETTE = os.path.join(HERE, "cassettes", "test_wcc_bot.json")
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "replay")
+
+
+@pytest.fixture
+def sl_chatbot(monkeypatch):
+    """sl_chatbot, which needs a key at import (replayed calls never use it)"""
+    if CASSETTE_MODE != "record":
+        monkeypatch.setenv("GEMINI_API_KEY", "replayed-from-cassette")
+    return importlib.import_module("sl_chatbot")
+
+def test_wcc_bot(sl_chatbot):
+    with Cassette(CASSETTE, mode=CASSETTE_MODE):
+        bot = sl_chatbot.SimpleBot(system_prompt="You are a WCC assistant.")
+        
+        # Test basic response (errors are reported apart from the reply)
+        response = bot.chat("What is WCC?")
+        assert bot.last_error is None, bot.last_error
+        assert bot.last_path == "model"
+        assert "coding" in response.lower() or "community" in response.lower()
+        
+        # Test conversation memory
+        bot.chat("I'm interested in AI")
+        assert bot.last_error is None, bot.last_error
+        response = bot.chat("Can you recommend a session?")
+        assert bot.last_error is None, bot.last_error
+        assert "AI" in response or "session" in response.lower()
+        assert len(bot.conversation_history) == 6
     
-    # Test basic response
-    response = bot.chat("What is WCC?")
-    assert len(response) > 0
+    print("✅ All tests passed!")
+
+def test_faq_fast_path(sl_chatbot):
+    with open(os.path.join(HERE, "wcc_faqs.json")) as f:
+        intents = IntentMatcher.from_faqs(json.load(f)["faqs"])
+    bot = sl_chatbot.SimpleBot(system_prompt="You are a WCC assistant.", intents=intents)
     
-    # Test conversation memory
-    bot.chat("I'm interested in AI")
-    response = bot.chat("Can you recommend a session?")
-    assert "AI" in response or "session" in response.lower()
+    # FAQ questions are answered without calling Gemini
+    response = bot.chat("How can I volunteer?")
+    assert response.startswith("Absolutely!")
+    assert bot.last_path == "fast_path"
+    assert len(bot.conversation_history) == 2
     
-    print("✅ All tests passed!")
+    # Anything less certain goes to the model
+    assert intents.match("Can I volunteer at the AI workshop in London next month?") is None
+
+def test_reference_text_counts_towards_the_budget(sl_chatbot):
+    sent = []
+    class FakeModel:
+        def generate_content(self, contents, stream=False):
+            sent.append(contents)
+            return SimpleNamespace(text="Sure!", usage_metadata=SimpleNamespace(prompt_token_count=0))
+    
+    reference = "FAQ: " + "volunteer details " * 40
+    bot = sl_chatbot.SimpleBot(
+        model=FakeModel(), max_context_tokens=200, retrieve=lambda question: reference
+    )
+    for i in range(20):
+        bot.chat(f"Question {i}")
+    
+    # The reference is in the last message sent, and the budget holds with it
+    assert sent[-1][-1]["parts"][0].startswith(reference)
+    assert sum(estimate_tokens(message_text(m)) for m in sent[-1]) <= 200
+    assert len(sent[-1]) < len(bot.conversation_history) + 1
+    # ...but only the plain question is kept in the history
+    assert bot.conversation_history[-2]["parts"] == ["Question 19"]
+
+def test_faq_index(tmp_path):
+    faqs = [
+        {"question": "How do I join WCC?", "answer": "Sign up for free on our website."},
+        {"question": "When are the sessions?", "answer": "Every other Wednesday at 7 PM."},
+        {"question": "Can I volunteer?", "answer": "Yes, we need mentors and speakers."},
+    ]
+    directory = str(tmp_path / "faq_index")
+    assert build_index(faqs, directory, "hashing")["embedded"] == 3
+    
+    matches = FAQIndex(directory).search("how can I volunteer as a mentor", k=2)
+    assert len(matches) == 2
+    assert matches[0].question == "Can I volunteer?"
+    
+    # Only the edited FAQ is embedded again, into a new version that the
+    # CURRENT pointer swaps to in one step; the open index keeps working
+    old_index = FAQIndex(directory)
+    faqs[1] = {"question": "When are the sessions?", "answer": "Every Thursday at 6 PM."}
+    assert build_index(faqs, directory) == {"embedded": 1, "reused": 2, "removed": 1}
+    index = FAQIndex(directory)
+    assert index.version != old_index.version
+    assert current_version(directory) == index.version
+    assert index.is_current(faqs) and not old_index.is_current(faqs)
+    assert index.search("sessions on Thursday", k=1)[0].answer == "Every Thursday at 6 PM."
+    assert old_index.search("sessions on Wednesday", k=1)[0].answer == "Every other Wednesday at 7 PM."
+    
+    # Old versions are cleaned up, keeping the previous one for open indexes
+    for i in range(3):
+        faqs[2] = {"question": "Can I volunteer?", "answer": f"Yes, edit {i}."}
+        build_index(faqs, directory)
+    assert len([name for name in os.listdir(directory) if name.startswith("v-")]) == 2
+
+def test_faq_index_caches_queries_and_falls_back_to_key_words(tmp_path):
+    faqs = [
+        {"question": "How do I join WCC?", "answer": "Sign up for free on our website."},
+        {"question": "Can I volunteer?", "answer": "Yes, we need mentors and speakers."},
+    ]
+    directory = str(tmp_path / "faq_index")
+    build_index(faqs, directory, "hashing")
+    index = FAQIndex(directory)
+    
+    calls = []
+    embed = index.embed
+    index.embed = lambda text: calls.append(text) or embed(text)
+    first = index.search("how can I volunteer", k=1)
+    assert index.search("how can I volunteer", k=1) == first
+    assert calls == ["how can I volunteer"]
+    
+    # Embeddings API down: key words still find the FAQ
+    def failing(text):
+        raise RuntimeError("quota exceeded")
+    index.embed = failing
+    matches = index.search("I want to volunteer as a mentor", k=1)
+    assert matches[0].question == "Can I volunteer?"
+    assert index.last_error == "quota exceeded"
+    assert keyword_search(faqs, "join", k=2)[0].question == "How do I join WCC?"
+    assert keyword_search(faqs, "quantum", k=2) == []
+
+def test_cached_file(tmp_path):
+    path = tmp_path / "faqs.json"
+    path.write_text('{"faqs": []}')
+    faq_file = CachedFile(str(path))
+    assert faq_file.get() == {"faqs": []}
+    
+    # Same content with a new modified time is not parsed again
+    os.utime(path, ns=(0, 10**9))
+    faq_file.get()
+    assert faq_file.reloads == 1
+    
+    path.write_text('{"faqs": [{"question": "Q", "answer": "A"}]}')
+    os.utime(path, ns=(0, 2 * 10**9))
+    assert len(faq_file.get()["faqs"]) == 1
+    assert faq_file.reloads == 2
+
+def test_background_refresher():
+    calls = []
+    def fetch():
+        calls.append(1)
+        if len(calls) == 2:
+            raise RuntimeError("site down")
+        return [{"title": "Workshop"}]
+    
+    feed = BackgroundRefresher(fetch, initial=[])
+    assert feed.get() == [] and feed.status()["age_seconds"] is None
+    
+    feed.refresh()
+    assert feed.get() == [{"title": "Workshop"}]
+    assert feed.status()["version"] == 1
+    
+    # A failed refresh keeps serving the last good value
+    feed.refresh()
+    assert feed.get() == [{"title": "Workshop"}]
+    assert feed.status()["last_error"] == "site down"
 
 if __name__ == "__main__":
-    test_wcc_bot()
\ No newline at end of file
+    import pathlib
+    import tempfile
+    
+    # Outside pytest there's no fixture, so set the placeholder key here
+    if CASSETTE_MODE != "record":
+        os.environ.setdefault("GEMINI_API_KEY", "replayed-from-cassette")
+    sl_chatbot = importlib.import_module("sl_chatbot")
+    test_wcc_bot(sl_chatbot)
+    test_faq_fast_path(sl_chatbot)
+    test_reference_text_counts_towards_the_budget(sl_chatbot)
+    # Outside pytest there's no tmp_path fixture, so make the directory here
+    with tempfile.TemporaryDirectory() as tmp:
+        test_faq_index(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_faq_index_caches_queries_and_falls_back_to_key_words(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_cached_file(pathlib.Path(tmp))
+    test_background_refresher()
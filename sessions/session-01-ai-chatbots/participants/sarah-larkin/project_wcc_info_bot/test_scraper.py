@@ -0,0 +1,382 @@
+import asyncio
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import scraper
+from crawler import EventCrawler
+from data_loader import BackgroundRefresher
+from event_parser import ENGINES, parse_events
+from event_store import EventStore, RenderedEvents
+from http_fetch import HTTPFetcher
+
+
+def events_page(count: int) -> str:
+    events = "".join(
+        f'<div class="event"><h3>Workshop {i}</h3>'
+        f'<span class="date">2025-11-{i % 28 + 1:02d}</span>'
+        f'<p>Hands-on session {i}</p></div>'
+        for i in range(count)
+    )
+    return f"<html><body><main>{events}</main></body></html>"
+
+
+class FixtureServer:
+    """Local HTTP server serving fixed pages, with ETag support"""
+
+    def __init__(self, pages: dict):
+        self.pages = pages          # path -> HTML
+        self.requests = []          # (path, status) for every request
+        self.failures = {}          # path -> times to answer 503 before succeeding
+        self.in_flight = 0
+        self.max_in_flight = 0
+        lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with lock:
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                try:
+                    self._serve()
+                finally:
+                    with lock:
+                        server.in_flight -= 1
+
+            def _serve(self):
+                if server.failures.get(self.path):
+                    server.failures[self.path] -= 1
+                    return self._reply(503, b"")
+                html = server.pages.get(self.path)
+                if html is None:
+                    return self._reply(404, b"")
+                body = html.encode("utf-8")
+                etag = '"%s"' % hashlib.md5(body).hexdigest()
+                if self.headers.get("If-None-Match") == etag:
+                    return self._reply(304, b"", etag)
+                self._reply(200, body, etag)
+
+            def _reply(self, status, body, etag=None):
+                server.requests.append((self.path, status))
+                self.send_response(status)
+                if etag:
+                    self.send_header("ETag", etag)
+                self.send_header("Content-Type", "text/html")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    fixture = FixtureServer({"/events": events_page(3)})
+    yield fixture
+    fixture.close()
+
+
+def test_unchanged_page_is_revalidated_not_reparsed(server, tmp_path, monkeypatch):
+    fetcher = HTTPFetcher(cache_dir=str(tmp_path))
+    url = server.url + "/events"
+
+    parses = []
+    real_parse = scraper.parse_events
+    monkeypatch.setattr(scraper, "parse_events", lambda html: parses.append(1) or real_parse(html))
+
+    assert len(scraper.scrape_wcc_events(url, fetcher)) == 3
+    assert len(scraper.scrape_wcc_events(url, fetcher)) == 3
+    assert server.requests == [("/events", 200), ("/events", 304)]
+    assert len(parses) == 1
+
+    # The saved copy survives a restart (new fetcher, same cache folder)
+    page = HTTPFetcher(cache_dir=str(tmp_path)).fetch(url)
+    assert page.status == 304 and page.from_cache
+
+    # A changed page is downloaded and parsed again
+    server.pages["/events"] = events_page(5)
+    assert len(scraper.scrape_wcc_events(url, fetcher)) == 5
+    assert server.requests[-1] == ("/events", 200)
+    assert len(parses) == 2
+
+
+def test_not_modified_without_a_saved_copy_downloads_the_page(server, tmp_path):
+    url = server.url + "/events"
+    etag = '"%s"' % hashlib.md5(server.pages["/events"].encode("utf-8")).hexdigest()
+
+    # The caller's own validator gets a 304, but there's nothing saved to serve
+    page = HTTPFetcher(cache_dir=str(tmp_path)).fetch(url, headers={"If-None-Match": etag})
+    assert server.requests == [("/events", 304), ("/events", 200)]
+    assert page.status == 200 and not page.from_cache
+    assert page.content == server.pages["/events"].encode("utf-8")
+
+    # ...and the page is saved, so next time the 304 is served from disk
+    assert HTTPFetcher(cache_dir=str(tmp_path)).fetch(url).content == page.content
+
+
+def test_errors_return_no_events(server):
+    fetcher = HTTPFetcher(cache_dir=None, timeout=(0.5, 0.5))
+    assert scraper.scrape_wcc_events(server.url + "/missing", fetcher) == []
+
+    # fetch_wcc_events raises instead, so a refresher keeps the last good events
+    feed = BackgroundRefresher(lambda: scraper.fetch_wcc_events(server.url + "/events", fetcher), initial=[])
+    feed.refresh()
+    assert len(feed.get()) == 3
+    del server.pages["/events"]
+    feed.refresh()
+    assert len(feed.get()) == 3
+    assert feed.status()["last_error"]
+
+
+def test_engines_agree():
+    html = events_page(20).encode("utf-8")
+    expected = ENGINES["html.parser"](html)
+    assert len(expected) == 20
+    assert expected[0] == {"title": "Workshop 0", "date": "2025-11-01", "description": "Hands-on session 0"}
+    for name, engine in ENGINES.items():
+        assert engine(html) == expected, name
+
+
+def test_engines_handle_pages_without_elements():
+    for html in [b"", b"   ", b"<!-- moved -->", b'<?xml version="1.0"?>']:
+        for name, engine in ENGINES.items():
+            assert engine(html) == [], (name, html)
+        assert parse_events(html) == []
+
+
+def test_structured_data_is_preferred():
+    json_ld = (
+        '<script type="application/ld+json">{"@context": "https://schema.org", "@graph": ['
+        '{"@type": "Event", "name": "AI Night", "startDate": "2025-11-05", "description": "Talks"},'
+        '{"@type": "Organization", "name": "WCC"}]}</script>'
+    )
+    html = events_page(3).replace("<body>", "<body>" + json_ld)
+    assert parse_events(html) == [{"title": "AI Night", "date": "2025-11-05", "description": "Talks"}]
+    assert len(parse_events(html, structured=False)) == 3
+
+    microdata = (
+        '<div itemscope itemtype="https://schema.org/Event">'
+        '<span itemprop="name">Mentor Match</span>'
+        '<time itemprop="startDate" datetime="2025-11-12">Nov 12</time>'
+        '<p itemprop="description">Meet mentors</p></div>'
+    )
+    assert parse_events(microdata) == [{"title": "Mentor Match", "date": "2025-11-12", "description": "Meet mentors"}]
+
+
+def test_structured_data_in_other_shapes():
+    # JSON-LD fields can be lists or objects, not just strings
+    json_ld = (
+        '<script type="application/ld+json">{"@type": "Event", "name": ["AI Night", "Nuit IA"], '
+        '"startDate": {"@value": "2025-11-05"}, "description": 42}</script>'
+    )
+    assert parse_events(json_ld) == [{"title": "AI Night", "date": "2025-11-05", "description": "42"}]
+
+    # The location's name belongs to the location, not the event
+    microdata = (
+        '<div itemscope itemtype="https://schema.org/Event">'
+        '<div itemprop="location" itemscope itemtype="https://schema.org/Place">'
+        '<span itemprop="name">London Office</span></div>'
+        '<span itemprop="name">Mentor Match</span>'
+        '<time itemprop="startDate" datetime="2025-11-12">Nov 12</time></div>'
+    )
+    assert parse_events(microdata) == [{"title": "Mentor Match", "date": "2025-11-12", "description": ""}]
+
+
+def crawl_site(listing_pages: int, per_page: int) -> dict:
+    """Paginated listing with a detail page per event"""
+    pages = {}
+    for page in range(1, listing_pages + 1):
+        events = "".join(
+            f'<div class="event"><h3><a href="/events/{page}-{i}">Workshop {page}-{i}</a></h3>'
+            f'<span class="date">2025-11-{i + 1:02d}</span><p>Short</p></div>'
+            for i in range(per_page)
+        )
+        nav = f'<a href="/events?page={page + 1}">Next</a>' if page < listing_pages else ""
+        pages[f"/events?page={page}"] = f"<html><body>{events}{nav}</body></html>"
+        for i in range(per_page):
+            pages[f"/events/{page}-{i}"] = (
+                f'<div class="event"><h3>Workshop {page}-{i}</h3>'
+                f'<span class="date">2025-11-{i + 1:02d}</span><p>Full description {page}-{i}</p></div>'
+            )
+    return pages
+
+
+def test_crawler_covers_hundreds_of_pages():
+    server = FixtureServer(crawl_site(listing_pages=30, per_page=10))
+    # Some pages fail the first time and must be retried
+    server.failures = {"/events?page=3": 1, "/events/5-5": 2}
+    try:
+        crawler = EventCrawler(
+            HTTPFetcher(cache_dir=None),
+            max_concurrency=8,
+            rate=0,
+            backoff=0.01
+        )
+        events = asyncio.run(crawler.crawl(server.url + "/events?page=1"))
+    finally:
+        server.close()
+
+    assert len(events) == 300
+    assert events[0]["title"] == "Workshop 1-0"
+    assert all(e["description"].startswith("Full description") for e in events)
+    assert crawler.errors == {}
+    assert crawler.pages_fetched == 330
+    assert server.max_in_flight <= 8
+
+
+def test_crawler_skips_pages_it_cannot_parse(monkeypatch):
+    import crawler as crawler_module
+
+    pages = crawl_site(listing_pages=2, per_page=2)
+    pages["/events/1-1"] = "<!-- broken -->"
+    real_parse = crawler_module.parse_events
+
+    def parse(content, **options):
+        if b"broken" in content:
+            raise ValueError("unparseable page")
+        return real_parse(content, **options)
+
+    monkeypatch.setattr(crawler_module, "parse_events", parse)
+    server = FixtureServer(pages)
+    try:
+        # One worker: if it died on the broken page, the crawl would hang
+        crawler = EventCrawler(HTTPFetcher(cache_dir=None), max_concurrency=1, rate=0)
+        events = asyncio.run(asyncio.wait_for(crawler.crawl(server.url + "/events?page=1"), timeout=10))
+    finally:
+        server.close()
+
+    assert len(events) == 4
+    assert list(crawler.errors) == [server.url + "/events/1-1"]
+    assert "unparseable page" in crawler.errors[server.url + "/events/1-1"]
+    assert crawler.pages_fetched == 6
+
+
+def test_crawler_parses_each_page_once_off_the_event_loop(monkeypatch):
+    import crawler as crawler_module
+
+    pages = crawl_site(listing_pages=2, per_page=2)
+    real_tree = crawler_module.parse_tree
+    parsed = []
+
+    def parse_tree(content):
+        parsed.append(threading.current_thread())
+        return real_tree(content)
+
+    monkeypatch.setattr(crawler_module, "parse_tree", parse_tree)
+    server = FixtureServer(pages)
+    try:
+        crawler = EventCrawler(HTTPFetcher(cache_dir=None), max_concurrency=2, rate=0)
+        events = asyncio.run(asyncio.wait_for(crawler.crawl(server.url + "/events?page=1"), timeout=10))
+    finally:
+        server.close()
+
+    assert len(events) == 4
+    # Events and links come from one tree per page, built in a worker thread
+    if crawler_module.HAS_LXML:
+        assert len(parsed) == crawler.pages_fetched
+        assert threading.main_thread() not in parsed
+
+
+def test_crawler_rate_limit_per_host():
+    server = FixtureServer(crawl_site(listing_pages=10, per_page=0))
+    try:
+        crawler = EventCrawler(HTTPFetcher(cache_dir=None), max_concurrency=5, rate=20)
+        start = time.perf_counter()
+        asyncio.run(crawler.crawl(server.url + "/events?page=1"))
+        elapsed = time.perf_counter() - start
+    finally:
+        server.close()
+
+    # 10 pages at 20 per second: at least 9 gaps of 50ms
+    assert len(server.requests) == 10
+    assert elapsed >= 0.45
+
+
+def test_event_store_diffs_scrapes(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    workshop = {"title": "Workshop", "date": "2025-11-05", "description": "AI basics"}
+    meetup = {"title": "Meetup", "date": "2025-11-12", "description": "Networking"}
+
+    changes = store.sync([workshop, meetup], scraped_at=100)
+    assert len(changes.inserted) == 2 and not changes.updated and not changes.deleted
+
+    # Unchanged events aren't reported again
+    assert not store.sync([workshop, meetup], scraped_at=200)
+
+    edited = dict(workshop, description="AI basics and prompting")
+    career = {"title": "Career Talk", "date": "2025-11-19", "description": "CVs"}
+    changes = store.sync([edited, career], scraped_at=300)
+    assert changes.inserted == [career]
+    assert changes.updated == [edited]
+    assert changes.deleted == [meetup]
+    assert store.current() == [edited, career]
+
+    # A failed (empty) scrape doesn't wipe the events
+    assert not store.sync([])
+    assert len(store.current()) == 2
+
+    assert [c.kind for c in store.changes_since(2)] == ["update", "insert", "delete"]
+    assert store.new_since(250) == [career]
+
+
+def test_rendered_events_follow_the_change_feed(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    store.sync([{"title": "A", "date": "1"}, {"title": "B", "date": "2"}])
+
+    renders = []
+    lines = RenderedEvents(store, lambda e: renders.append(e["title"]) or e["title"])
+    assert lines.refresh() and lines.lines() == ["A", "B"]
+    assert not lines.refresh()
+
+    store.sync([{"title": "A", "date": "1"}, {"title": "C", "date": "3"}])
+    assert lines.refresh()
+    assert lines.lines() == ["A", "C"]
+    assert renders == ["A", "B", "C"]   # Only the new event was rendered again
+
+    # A reorder is a change too, and the lines follow the page order
+    changes = store.sync([{"title": "D", "date": "4"}, {"title": "C", "date": "3"}, {"title": "A", "date": "1"}])
+    assert changes.inserted == [{"title": "D", "date": "4"}]
+    assert changes.moved == [{"title": "C", "date": "3"}]   # One move: C now comes before A
+    assert lines.refresh()
+    assert lines.lines() == ["D", "C", "A"]
+    assert renders == ["A", "B", "C", "D"]
+
+    changes = store.sync([{"title": "A", "date": "1"}, {"title": "D", "date": "4"}, {"title": "C", "date": "3"}])
+    assert changes and not (changes.inserted or changes.updated or changes.deleted)
+    assert lines.refresh()
+    assert lines.lines() == ["A", "D", "C"]
+    assert renders == ["A", "B", "C", "D"]
+
+
+def test_insert_at_the_top_moves_nothing(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    events = [{"title": f"Event {i}", "date": str(i)} for i in range(100)]
+    store.sync(events)
+    cursor = store.last_change_id
+
+    new = {"title": "New", "date": "0"}
+    changes = store.sync([new] + events)
+    assert changes.inserted == [new]
+    assert changes.moved == []
+    assert [c.kind for c in store.changes_since(cursor)] == ["insert"]
+    assert store.current() == [new] + events
+
+    # Swapping two neighbours is one move, not a shift of everything after them
+    events[10], events[11] = events[11], events[10]
+    changes = store.sync([new] + events)
+    assert len(changes.moved) == 1 and changes.moved[0] in (events[10], events[11])
+    assert store.last_change_id == cursor + 2
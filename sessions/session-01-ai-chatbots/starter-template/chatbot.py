@@ -3,10 +3,23 @@ Basic Chatbot Starter Template
 This is a simple chatbot that uses Gemini API to respond to user input.
 """
 
+import asyncio
 import os
+import sys
+from pathlib import Path
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+# Modules shared by the session folders (context window, caches, conversation
+# store, ...) live in utilities/ at the top of the repository
+sys.path.append(str(next(
+    folder / "utilities" for folder in Path(__file__).resolve().parents
+    if (folder / "utilities").is_dir()
+)))
+from context_window import ContextWindow, message_text
+from conversation_store import ConversationManager
+from response_cache import ResponseCache, is_deterministic
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -24,19 +37,111 @@ genai.configure(api_key=API_KEY)
 class SimpleBot:
     """A simple chatbot using Gemini API"""
 
-    def __init__(self, system_prompt: str = None):
+    def __init__(
+        self,
+        system_prompt: str = None,
+        max_context_tokens: int = None,
+        min_recent_messages: int = 2,
+        summarize_dropped: bool = False,
+        generation_config: dict = None,
+        cache: ResponseCache = None,
+        cache_all: bool = False,
+        conversations: ConversationManager = None,
+        session_id: str = None
+    ):
         """
         Initialize the chatbot.
 
         Args:
             system_prompt: Optional system prompt to set bot personality
+            max_context_tokens: Optional token budget for the history sent
+                on each turn (None = send the whole conversation)
+            min_recent_messages: Latest messages always kept in the context
+            summarize_dropped: Summarize turns that fall out of the budget
+                instead of forgetting them
+            generation_config: Optional model settings (temperature, etc.)
+            cache: Optional ResponseCache for repeated requests
+            cache_all: Cache even when temperature isn't 0 (by default only
+                deterministic settings are cached)
+            conversations: Optional ConversationManager to save the history
+                to disk instead of keeping it only in memory
+            session_id: Conversation to load/save (required with conversations)
         """
+        self.model_id = "gemini-2.5-flash-lite"
+        self.generation_config = generation_config
         self.model = genai.GenerativeModel(
-            "gemini-2.5-flash-lite",
+            self.model_id,
+            generation_config=generation_config,
             system_instruction=system_prompt or "You are a helpful assistant."
         )
         self.system_prompt = system_prompt or "You are a helpful assistant."
-        self.conversation_history = []
+        self.conversations = conversations
+        self.session_id = session_id
+        self._history = []
+        self.last_error = None  # Why the last turn failed (None if it didn't)
+
+        # Keep the prompt bounded so per-turn latency stays flat
+        self.context_window = None
+        if max_context_tokens:
+            self.context_window = ContextWindow(
+                max_context_tokens,
+                min_recent_messages=min_recent_messages,
+                summarizer=self._summarize if summarize_dropped else None
+            )
+
+        self.cache = cache
+        self.cache_all = cache_all
+
+    @property
+    def conversation_history(self) -> list:
+        """Messages so far (for a saved session: the recent part loaded in memory)"""
+        if self.conversations:
+            return self.conversations.history(self.session_id)
+        return self._history
+
+    def _add_turn(self, user_message: str, bot_response: str):
+        """Add a finished turn to the history (and save it, if using a store) -
+        only once the reply is complete, and both messages together, so a
+        failed turn never leaves a question without an answer"""
+        turn = [
+            {"role": "user", "parts": [user_message]},
+            {"role": "model", "parts": [bot_response]},
+        ]
+        if self.conversations:
+            self.conversations.extend(self.session_id, turn)
+        else:
+            self._history.extend(turn)
+
+    def _build_context(self, user_message: str) -> list:
+        """Get the part of the conversation to send to the model, ending with the new message"""
+        history = self.conversation_history + [{"role": "user", "parts": [user_message]}]
+        if self.context_window is None:
+            return history
+        return self.context_window.select(history)
+
+    def _cache_key(self, context: list):
+        """Cache key for this request, or None if it shouldn't be cached"""
+        if self.cache is None:
+            return None
+        if not (self.cache_all or is_deterministic(self.generation_config)):
+            return None
+        return ResponseCache.make_key(
+            self.model_id, self.generation_config, self.system_prompt, context
+        )
+
+    def _summarize(self, previous_summary: str, dropped: list) -> str:
+        """Fold turns that no longer fit the budget into a short summary"""
+        transcript = "\n".join(
+            f"{m['role']}: {message_text(m)}" for m in dropped
+        )
+        prompt = (
+            "Summarize this conversation in a few sentences, keeping names, "
+            "facts and anything the user asked you to remember.\n\n"
+        )
+        if previous_summary:
+            prompt += f"Earlier summary: {previous_summary}\n\n"
+        prompt += transcript
+        return self.model.generate_content(prompt).text
 
     def chat(self, user_message: str) -> str:
         """
@@ -48,35 +153,213 @@ class SimpleBot:
         Returns:
             The bot's response
         """
+        self.last_error = None
         try:
-            # Add user message to history
-            self.conversation_history.append(
-                {"role": "user", "parts": [user_message]}
-            )
+            # Reuse the cached response for an identical request
+            context = self._build_context(user_message)
+            cache_key = self._cache_key(context)
+            bot_response = self.cache.get(cache_key) if cache_key else None
 
-            # Generate response using conversation history
-            response = self.model.generate_content(
-                self.conversation_history
-            )
+            if bot_response is None:
+                # Generate response using (budgeted) conversation history
+                response = self.model.generate_content(context)
 
-            # Extract response text
-            bot_response = response.text
+                # Extract response text
+                bot_response = response.text
+                if cache_key:
+                    self.cache.set(cache_key, bot_response)
 
-            # Add bot response to history
-            self.conversation_history.append(
-                {"role": "model", "parts": [bot_response]}
-            )
+            # Add the finished turn to history
+            self._add_turn(user_message, bot_response)
 
             return bot_response
 
         except Exception as e:
+            self.last_error = str(e)
             error_msg = f"Error: {str(e)}"
             print(error_msg)
             return error_msg
 
+    def chat_stream(self, user_message: str):
+        """
+        Send a message and stream the response as it is generated.
+
+        The turn is added to the conversation history once the stream has
+        finished. If it fails, nothing is added and the error is kept in
+        bot.last_error instead of being mixed into the reply.
+
+        Args:
+            user_message: The user's input message
+
+        Yields:
+            Chunks of the bot's response text
+        """
+        self.last_error = None
+        try:
+            context = self._build_context(user_message)
+            cache_key = self._cache_key(context)
+            bot_response = self.cache.get(cache_key) if cache_key else None
+
+            if bot_response is not None:
+                yield bot_response
+            else:
+                # Ask for the response in chunks instead of waiting for all of it
+                response = self.model.generate_content(context, stream=True)
+
+                chunks = []
+                for chunk in response:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+
+                bot_response = "".join(chunks)
+                if cache_key:
+                    self.cache.set(cache_key, bot_response)
+
+            # Add the finished turn to history
+            self._add_turn(user_message, bot_response)
+
+        except Exception as e:
+            self.last_error = str(e)
+
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        if self.conversations:
+            self.conversations.clear(self.session_id)
+        self._history = []
+        if self.context_window:
+            self.context_window.reset()
+
+
+class AsyncSimpleBot(SimpleBot):
+    """
+    SimpleBot for asyncio apps.
+
+    Uses the async Gemini API, so one event loop can serve many chats
+    while they wait on the network instead of needing a thread each.
+    Calls that can block (SQLite conversation store and response cache,
+    summarizing) run in a thread so they don't hold up the other chats.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # One turn at a time per conversation, so history stays in order
+        self._lock = asyncio.Lock()
+
+    async def _build_context_async(self, user_message: str) -> list:
+        """Build the context without blocking the event loop"""
+        summarizing = self.context_window and self.context_window.summarizer
+        if self.conversations or summarizing:
+            # Reads the history from disk / makes a model call, so use a thread
+            return await asyncio.to_thread(self._build_context, user_message)
+        return self._build_context(user_message)
+
+    async def _cached_response_async(self, cache_key) -> str:
+        """Cached response for a request key (None on a miss or without a key)"""
+        if not cache_key:
+            return None
+        return await asyncio.to_thread(self.cache.get, cache_key)
+
+    async def _finish_turn_async(self, user_message: str, bot_response: str, cache_key):
+        """Cache a fresh response and add the turn, off the event loop"""
+        if cache_key:
+            await asyncio.to_thread(self.cache.set, cache_key, bot_response)
+        if self.conversations:
+            await asyncio.to_thread(self._add_turn, user_message, bot_response)
+        else:
+            self._add_turn(user_message, bot_response)
+
+    async def chat(self, user_message: str) -> str:
+        """
+        Send a message and get a response.
+
+        Args:
+            user_message: The user's input message
+
+        Returns:
+            The bot's response
+        """
+        async with self._lock:
+            self.last_error = None
+            try:
+                context = await self._build_context_async(user_message)
+                cache_key = self._cache_key(context)
+                bot_response = await self._cached_response_async(cache_key)
+
+                if bot_response is None:
+                    # Other chats can run while we wait for this response
+                    response = await self.model.generate_content_async(context)
+                    bot_response = response.text
+                    # Add the finished turn to history (and the cache)
+                    await self._finish_turn_async(user_message, bot_response, cache_key)
+                else:
+                    await self._finish_turn_async(user_message, bot_response, None)
+
+                return bot_response
+
+            except Exception as e:
+                self.last_error = str(e)
+                error_msg = f"Error: {str(e)}"
+                print(error_msg)
+                return error_msg
+
+    async def chat_stream(self, user_message: str):
+        """
+        Send a message and stream the response as it is generated.
+
+        Like SimpleBot.chat_stream, a failed turn isn't added to the
+        history and its error is kept in bot.last_error.
+
+        Args:
+            user_message: The user's input message
+
+        Yields:
+            Chunks of the bot's response text
+        """
+        async with self._lock:
+            self.last_error = None
+            try:
+                context = await self._build_context_async(user_message)
+                cache_key = self._cache_key(context)
+                bot_response = await self._cached_response_async(cache_key)
+
+                if bot_response is not None:
+                    yield bot_response
+                    await self._finish_turn_async(user_message, bot_response, None)
+                else:
+                    response = await self.model.generate_content_async(context, stream=True)
+
+                    chunks = []
+                    async for chunk in response:
+                        chunks.append(chunk.text)
+                        yield chunk.text
+
+                    # Add the finished turn to history (and the cache)
+                    await self._finish_turn_async(user_message, "".join(chunks), cache_key)
+
+            except Exception as e:
+                self.last_error = str(e)
+
+
+async def chat_many(requests: list, max_concurrency: int = 50) -> list:
+    """
+    Run many chat turns concurrently in one event loop.
+
+    Args:
+        requests: List of (bot, user_message) pairs, one bot per session
+        max_concurrency: Most API calls allowed in flight at once
+
+    Returns:
+        The bot responses, in the same order as requests
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(bot: AsyncSimpleBot, user_message: str) -> str:
+        async with semaphore:
+            return await bot.chat(user_message)
+
+    return await asyncio.gather(
+        *(run(bot, user_message) for bot, user_message in requests)
+    )
 
 
 def main():
@@ -86,7 +369,7 @@ def main():
 
     # Create bot with optional system prompt
     system_prompt = "You are a friendly and helpful AI assistant."
-    bot = SimpleBot(system_prompt=system_prompt)
+    bot = SimpleBot(system_prompt=system_prompt, max_context_tokens=4000)
 
     while True:
         try:
@@ -104,9 +387,14 @@ def main():
                 print("Conversation history cleared.\n")
                 continue
 
-            # Get response from bot
-            response = bot.chat(user_input)
-            print(f"\nBot: {response}\n")
+            # Stream response from bot as it is generated
+            print("\nBot: ", end="", flush=True)
+            for chunk in bot.chat_stream(user_input):
+                print(chunk, end="", flush=True)
+            if bot.last_error:
+                # Shown apart from the reply; the turn wasn't saved, so just ask again
+                print(f"\n⚠️  Error: {bot.last_error}")
+            print("\n")
 
         except KeyboardInterrupt:
             print("\n\nGoodbye! 👋")
@@ -0,0 +1,122 @@
+import asyncio
+import importlib
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+
+@pytest.fixture
+def chatbot(monkeypatch):
+    """chatbot, which needs a key at import (the fake models never use it)"""
+    monkeypatch.setenv("GEMINI_API_KEY", "not-used-by-fake-models")
+    return importlib.import_module("chatbot")
+
+
+class FakeAsyncModel:
+    """Async Gemini stand-in that counts the calls in flight"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content_async(self, contents, stream=False):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        text = f"Reply to: {contents[-1]['parts'][0]}"
+        if not stream:
+            return SimpleNamespace(text=text)
+
+        async def chunks():
+            for word in text.split(" "):
+                yield SimpleNamespace(text=word + " ")
+        return chunks()
+
+
+def make_bots(chatbot, model, count, **options):
+    bots = [chatbot.AsyncSimpleBot(**options) for _ in range(count)]
+    for bot in bots:
+        bot.model = model
+    return bots
+
+
+def test_chat_many_runs_turns_concurrently_within_the_limit(chatbot):
+    model = FakeAsyncModel(latency=0.05)
+    bots = make_bots(chatbot, model, 10)
+
+    start = time.perf_counter()
+    replies = asyncio.run(chatbot.chat_many(
+        [(bot, f"Question {i}") for i, bot in enumerate(bots)], max_concurrency=5
+    ))
+    elapsed = time.perf_counter() - start
+
+    # Replies in request order; two waves of 5, not 10 calls one by one
+    assert replies == [f"Reply to: Question {i}" for i in range(10)]
+    assert model.max_in_flight == 5
+    assert elapsed < 0.3
+    assert all(len(bot.conversation_history) == 2 for bot in bots)
+
+
+def test_one_turn_at_a_time_per_conversation(chatbot):
+    model = FakeAsyncModel(latency=0.01)
+    bot, = make_bots(chatbot, model, 1)
+
+    async def ask_both():
+        return await asyncio.gather(bot.chat("First"), bot.chat("Second"))
+
+    asyncio.run(ask_both())
+    assert model.max_in_flight == 1
+    assert [m["parts"][0] for m in bot.conversation_history] == [
+        "First", "Reply to: First", "Second", "Reply to: Second"
+    ]
+
+
+def test_async_bot_uses_the_response_cache(chatbot, tmp_path):
+    cache = chatbot.ResponseCache(path=str(tmp_path / "responses.db"))
+    model = FakeAsyncModel()
+    first, second, third = make_bots(
+        chatbot, model, 3, generation_config={"temperature": 0}, cache=cache
+    )
+
+    assert asyncio.run(first.chat("What is WCC?")) == "Reply to: What is WCC?"
+    assert asyncio.run(second.chat("What is WCC?")) == "Reply to: What is WCC?"
+    assert model.calls == 1
+
+    # Streaming reuses the same cached response
+    async def stream(bot, message):
+        return "".join([chunk async for chunk in bot.chat_stream(message)])
+
+    assert asyncio.run(stream(third, "What is WCC?")) == "Reply to: What is WCC?"
+    assert model.calls == 1
+    assert asyncio.run(stream(third, "How do I join?")).strip() == "Reply to: How do I join?"
+    assert model.calls == 2
+    assert third.last_error is None
+    assert len(third.conversation_history) == 4
+    assert cache.stats()["hits"] == 2
+
+
+def test_store_calls_run_off_the_event_loop(chatbot, tmp_path):
+    conversation_store = importlib.import_module("conversation_store")
+    store = chatbot.ConversationManager(
+        conversation_store.SQLiteConversationStore(str(tmp_path / "chats.db"))
+    )
+    threads = []
+    for name in ("history", "extend"):
+        method = getattr(store, name)
+        def record(*args, method=method):
+            threads.append(threading.current_thread())
+            return method(*args)
+        setattr(store, name, record)
+
+    bot, = make_bots(chatbot, FakeAsyncModel(), 1, conversations=store, session_id="s1")
+    assert asyncio.run(bot.chat("Hello")) == "Reply to: Hello"
+    assert threads and threading.main_thread() not in threads
+    assert len(store.history("s1")) == 2
@@ -0,0 +1,254 @@
+"""
+Record/Replay Cassettes for Model Calls
+Run tests and demos against recorded Gemini responses instead of the
+live API.
+
+In "record" mode every generate_content call goes to the real API and
+the request/response pair is saved to a JSON cassette, keyed by a hash
+of the canonical request (model, system instruction, generation config,
+contents). In "replay" mode (the default) responses are served from the
+cassette with no network access, and a request that isn't recorded fails
+instead of quietly going to the API. "auto" replays what it has and
+records the rest.
+
+A request only replays if it is exactly the same as the recorded one, so
+keep prompts deterministic: anything like the current date or time in a
+system prompt should be passed in as a fixed value under a cassette.
+
+Works for both google.generativeai.GenerativeModel and
+vertexai.generative_models.GenerativeModel:
+
+    from cassette import Cassette
+
+    with Cassette("cassettes/test_wcc_bot.json", mode="replay"):
+        bot = SimpleBot(system_prompt="You are a WCC assistant.")
+        bot.chat("What is WCC?")   # Served from disk
+
+The mode can also be set with the CASSETTE_MODE environment variable.
+Any script can be run under a cassette without changing it:
+
+    python utilities/cassette.py --cassette demo.json --mode record wcc_info_bot_demo.py
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import runpy
+import sys
+import threading
+from types import SimpleNamespace
+from typing import List
+
+
+MODES = ("record", "replay", "auto")
+
+
+class CassetteMissError(Exception):
+    """A request in replay mode that isn't in the cassette"""
+
+
+def default_targets() -> List[type]:
+    """GenerativeModel classes from whichever SDKs are installed"""
+    targets = []
+    try:
+        import google.generativeai as genai
+        targets.append(genai.GenerativeModel)
+    except ImportError:
+        pass
+    try:
+        from vertexai.generative_models import GenerativeModel
+        targets.append(GenerativeModel)
+    except ImportError:
+        pass
+    return targets
+
+
+def _model_settings(model) -> dict:
+    """Everything on the model object that affects the response"""
+    return {
+        "model": getattr(model, "model_name", None) or getattr(model, "_model_name", None),
+        "system_instruction": getattr(model, "_system_instruction", None),
+        "generation_config": getattr(model, "_generation_config", None),
+        "safety_settings": getattr(model, "_safety_settings", None),
+    }
+
+
+def request_key(model, contents, stream: bool, kwargs: dict) -> str:
+    """Hash of the canonical request, used to find it in the cassette"""
+    payload = json.dumps(
+        {
+            **_model_settings(model),
+            "contents": contents,
+            "stream": stream,
+            "kwargs": kwargs,
+        },
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReplayResponse:
+    """Looks like a GenerateContentResponse: .text, .usage_metadata, chunks"""
+
+    def __init__(self, entry: dict):
+        self.text = entry["text"]
+        self.usage_metadata = SimpleNamespace(**entry.get("usage", {}))
+        self._chunks = [SimpleNamespace(text=t) for t in entry.get("chunks") or [self.text]]
+
+    def __iter__(self):
+        return iter(self._chunks)
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            yield chunk
+
+
+def _usage_dict(response) -> dict:
+    usage = getattr(response, "usage_metadata", None)
+    return {
+        name: getattr(usage, name, 0)
+        for name in ("prompt_token_count", "candidates_token_count", "total_token_count")
+    }
+
+
+class Cassette:
+    """Context manager that records or replays generate_content calls"""
+
+    def __init__(self, path: str, mode: str = None, targets: List[type] = None):
+        """
+        Args:
+            path: JSON file holding the recorded requests/responses
+            mode: "record", "replay" or "auto" (default: $CASSETTE_MODE or "replay")
+            targets: Model classes to patch (default: installed Gemini SDKs)
+        """
+        self.path = path
+        self.mode = mode or os.getenv("CASSETTE_MODE", "replay")
+        if self.mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {MODES}, got {self.mode!r}")
+        self.targets = targets if targets is not None else default_targets()
+        self.entries = {}
+        self.hits = 0
+        self.recorded = 0
+        self._originals = []
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.entries = json.load(f)
+
+        for cls in self.targets:
+            self._patch(cls, "generate_content", self._patch_sync)
+            self._patch(cls, "generate_content_async", self._patch_async)
+        return self
+
+    def __exit__(self, *exc_info):
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals = []
+
+        if self.recorded:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "w") as f:
+                json.dump(self.entries, f, indent=2, sort_keys=True)
+        return False
+
+    def _patch(self, cls: type, name: str, wrap):
+        """Wrap a method on the class that defines it (may be a base class)"""
+        owner = next((k for k in cls.__mro__ if name in k.__dict__), None)
+        if owner is None or any(o is owner and n == name for o, n, _ in self._originals):
+            return
+        original = owner.__dict__[name]
+        self._originals.append((owner, name, original))
+        setattr(owner, name, wrap(original))
+
+    def _lookup(self, key: str):
+        """Recorded response for a request, or None if we should record it"""
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is not None and self.mode != "record":
+            self.hits += 1
+            return ReplayResponse(entry)
+        if self.mode == "replay":
+            raise CassetteMissError(
+                f"Request {key[:12]} not found in {self.path}. "
+                "Re-record with CASSETTE_MODE=record."
+            )
+        return None
+
+    def _save(self, key: str, response, stream: bool) -> ReplayResponse:
+        """Store a live response (consuming a stream) and return a replayable copy"""
+        chunks = [chunk.text for chunk in response] if stream else None
+        entry = {
+            "text": "".join(chunks) if stream else response.text,
+            "chunks": chunks,
+            "usage": _usage_dict(response),
+        }
+        with self._lock:
+            self.entries[key] = entry
+            self.recorded += 1
+        return ReplayResponse(entry) if stream else response
+
+    def _patch_sync(self, original):
+        cassette = self
+
+        def generate_content(model, contents, *args, stream=False, **kwargs):
+            key = request_key(model, contents, stream, kwargs)
+            replayed = cassette._lookup(key)
+            if replayed is not None:
+                return replayed
+            response = original(model, contents, *args, stream=stream, **kwargs)
+            return cassette._save(key, response, stream)
+
+        return generate_content
+
+    def _patch_async(self, original):
+        cassette = self
+
+        async def generate_content_async(model, contents, *args, stream=False, **kwargs):
+            key = request_key(model, contents, stream, kwargs)
+            replayed = cassette._lookup(key)
+            if replayed is not None:
+                return replayed
+            response = await original(model, contents, *args, stream=stream, **kwargs)
+            if stream:
+                # Collect the async stream so _save can read it like a sync one
+                chunks = [chunk async for chunk in response]
+                response = _ChunkList(chunks, getattr(response, "usage_metadata", None))
+            return cassette._save(key, response, stream)
+
+        return generate_content_async
+
+
+class _ChunkList(list):
+    """Already-collected async stream chunks, with the stream's usage metadata"""
+
+    def __init__(self, chunks, usage_metadata):
+        super().__init__(chunks)
+        self.usage_metadata = usage_metadata
+
+
+def main():
+    """Run a Python script with its model calls recorded or replayed"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--cassette", required=True, help="Cassette JSON file")
+    parser.add_argument("--mode", choices=MODES, default=None)
+    parser.add_argument("script", help="Script to run")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="Script arguments")
+    options = parser.parse_args()
+
+    if options.mode != "record" and os.path.exists(options.cassette):
+        # Scripts check for a key at startup; replayed calls never use it
+        os.environ.setdefault("GEMINI_API_KEY", "replayed-from-cassette")
+
+    sys.argv = [options.script] + options.args
+    sys.path.insert(0, os.path.dirname(os.path.abspath(options.script)))
+    with Cassette(options.cassette, mode=options.mode) as cassette:
+        runpy.run_path(options.script, run_name="__main__")
+    print(f"\n📼 Cassette: {cassette.hits} replayed, {cassette.recorded} recorded")
+
+
+if __name__ == "__main__":
+    main()
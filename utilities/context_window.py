@@ -0,0 +1,144 @@
+"""
+Token-Budgeted Context Window
+Keeps the conversation sent to the model under a fixed token budget.
+
+Each message is counted once and the count is cached, so building the
+context for a new turn only costs the new messages. When the budget is
+exceeded the oldest turns are dropped (or folded into a running summary),
+while the latest turns are always kept intact.
+"""
+
+from typing import Callable, List, Optional
+
+
+SUMMARY_PREFIX = "Summary of our earlier conversation:"
+SUMMARY_ACK = "Got it, I'll keep that in mind."
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token), no API call needed"""
+    return max(1, len(text) // 4)
+
+
+def message_text(message: dict) -> str:
+    """Get the text of a {"role": ..., "parts": [...]} message"""
+    return "".join(str(part) for part in message.get("parts", []))
+
+
+def _content(message: dict) -> tuple:
+    """What identifies a message for the token count cache"""
+    return message.get("role"), message_text(message)
+
+
+class ContextWindow:
+    """Selects the most recent messages that fit in a token budget"""
+
+    def __init__(
+        self,
+        max_tokens: int,
+        count_tokens: Callable[[str], int] = estimate_tokens,
+        min_recent_messages: int = 2,
+        summarizer: Optional[Callable[[Optional[str], List[dict]], str]] = None
+    ):
+        """
+        Initialize the context window.
+
+        Args:
+            max_tokens: Token budget for the history sent on each turn
+            count_tokens: Function returning the token count of a string
+            min_recent_messages: Latest messages that are never dropped
+            summarizer: Optional function (previous_summary, dropped_messages)
+                -> new summary. If not set, dropped turns are simply forgotten.
+        """
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.min_recent_messages = max(1, min_recent_messages)
+        self.summarizer = summarizer
+        self.reset()
+
+    def reset(self):
+        """Forget all cached counts (call when the history is cleared)"""
+        self.token_counts = []      # Cached token count for every message
+        self.counted = []           # (role, text) of the messages those counts belong to
+        self.start = 0              # Index of the oldest message still sent
+        self.window_tokens = 0      # Tokens in history[start:]
+        self.summary = None
+        self.summary_tokens = 0
+
+    def select(self, history: List[dict]) -> List[dict]:
+        """
+        Get the messages to send for this turn.
+
+        Args:
+            history: Full conversation history (appended to, or with the
+                latest messages removed or replaced)
+
+        Returns:
+            The latest messages that fit the budget, preceded by the
+            summary of older turns if a summarizer is configured
+        """
+        # Latest messages may have been taken back or replaced (e.g. a
+        # failed turn) - keep the counts up to the last unchanged message.
+        # Messages are compared by content, since a history loaded again
+        # from a store holds new (but equal) message objects
+        kept = min(len(history), len(self.counted))
+        while kept and _content(history[kept - 1]) != self.counted[kept - 1]:
+            kept -= 1
+        if kept < self.start:
+            # History was replaced behind our back - start again
+            self.reset()
+        else:
+            self.window_tokens -= sum(self.token_counts[kept:])
+            del self.token_counts[kept:]
+            del self.counted[kept:]
+
+        # Count each new message exactly once
+        for message in history[len(self.token_counts):]:
+            tokens = self.count_tokens(message_text(message))
+            self.token_counts.append(tokens)
+            self.counted.append(_content(message))
+            self.window_tokens += tokens
+
+        # Drop the oldest turn until we fit the budget
+        dropped_from = self.start
+        while self.summary_tokens + self.window_tokens > self.max_tokens:
+            end = self._next_turn(history, self.start)
+            if len(history) - end < self.min_recent_messages:
+                break
+            self.window_tokens -= sum(self.token_counts[self.start:end])
+            self.start = end
+
+        if self.summarizer and self.start > dropped_from:
+            self._update_summary(history[dropped_from:self.start])
+
+        return self._summary_messages() + history[self.start:]
+
+    @staticmethod
+    def _next_turn(history: List[dict], start: int) -> int:
+        """Index of the first user message after start, so the window never
+        starts on a model reply (even if a reply or question is missing)"""
+        end = start + 1
+        while end < len(history) and history[end].get("role") != "user":
+            end += 1
+        return end
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens in the context selected by the last call to select()"""
+        return self.summary_tokens + self.window_tokens
+
+    def _update_summary(self, dropped: List[dict]):
+        """Fold newly dropped messages into the running summary"""
+        self.summary = self.summarizer(self.summary, dropped)
+        self.summary_tokens = sum(
+            self.count_tokens(message_text(m)) for m in self._summary_messages()
+        )
+
+    def _summary_messages(self) -> List[dict]:
+        """The summary as a user/model exchange, so roles keep alternating"""
+        if not self.summary:
+            return []
+        return [
+            {"role": "user", "parts": [f"{SUMMARY_PREFIX}\n{self.summary}"]},
+            {"role": "model", "parts": [SUMMARY_ACK]},
+        ]
@@ -0,0 +1,216 @@
+"""
+Persistent Conversation Store
+Keeps chat history on disk (SQLite) instead of only in Python lists.
+
+- History survives restarts and is keyed by a session ID
+- Only the most recent page of a conversation is loaded into memory;
+  older pages are fetched on demand (for scrollback - they're kept apart
+  from the history sent to the model)
+- A whole turn (question and reply) is saved at once, so a failure can't
+  leave half of one behind
+- Sessions that have been idle for a while are dropped from memory and
+  reloaded from disk on their next message
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+
+class ConversationStore:
+    """Storage backend interface - subclass this to use another database"""
+
+    def append(self, session_id: str, message: dict):
+        """Save one message at the end of a conversation"""
+        raise NotImplementedError
+
+    def extend(self, session_id: str, messages: List[dict]):
+        """Save several messages at the end of a conversation - all or none of them"""
+        for message in messages:
+            self.append(session_id, message)
+
+    def load_page(self, session_id: str, before: int = None, limit: int = 50) -> List[dict]:
+        """
+        Load up to `limit` messages, oldest first.
+
+        Args:
+            session_id: Conversation to load
+            before: Only messages older than this position (None = latest page)
+            limit: Page size
+        """
+        raise NotImplementedError
+
+    def count(self, session_id: str) -> int:
+        """Number of messages saved for a conversation"""
+        raise NotImplementedError
+
+    def delete(self, session_id: str):
+        """Remove a conversation"""
+        raise NotImplementedError
+
+
+class SQLiteConversationStore(ConversationStore):
+    """Default backend: one append-only SQLite table"""
+
+    def __init__(self, path: str = "conversations.db"):
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "session_id TEXT, position INTEGER, message TEXT, created_at REAL, "
+                "PRIMARY KEY (session_id, position))"
+            )
+            self._db.commit()
+
+    def append(self, session_id: str, message: dict):
+        self.extend(session_id, [message])
+
+    def extend(self, session_id: str, messages: List[dict]):
+        with self._lock, self._db:   # One transaction: rolled back if any insert fails
+            for message in messages:
+                self._db.execute(
+                    "INSERT INTO messages VALUES (?, "
+                    "(SELECT COUNT(*) FROM messages WHERE session_id = ?), ?, ?)",
+                    (session_id, session_id, json.dumps(message), time.time())
+                )
+
+    def load_page(self, session_id: str, before: int = None, limit: int = 50) -> List[dict]:
+        if before is None:
+            before = self.count(session_id)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT message FROM messages "
+                "WHERE session_id = ? AND position >= ? AND position < ? "
+                "ORDER BY position",
+                (session_id, max(0, before - limit), before)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT COUNT(*) FROM messages WHERE session_id = ?",
+                (session_id,)
+            ).fetchone()
+        return row[0]
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            self._db.commit()
+
+
+class _Session:
+    """A conversation currently held in memory"""
+
+    def __init__(self, messages: List[dict], first_position: int):
+        self.messages = messages              # Loaded tail of the conversation
+        self.first_position = first_position  # Position of messages[0] on disk
+        self.scrollback_position = first_position  # Oldest position load_older() has returned
+        self.last_used = time.time()
+
+
+class ConversationManager:
+    """
+    In-memory front for a ConversationStore.
+
+    Holds recently active conversations in memory, writes every new
+    message through to the store and spills idle sessions out of memory.
+    """
+
+    def __init__(
+        self,
+        store: ConversationStore = None,
+        page_size: int = 50,
+        idle_timeout: float = 30 * 60
+    ):
+        """
+        Args:
+            store: Storage backend (default: SQLite file conversations.db)
+            page_size: Messages loaded when a session is (re)hydrated
+            idle_timeout: Seconds without a message before a session is
+                dropped from memory
+        """
+        self.store = store or SQLiteConversationStore()
+        self.page_size = page_size
+        self.idle_timeout = idle_timeout
+        self._sessions: Dict[str, _Session] = {}
+        self._lock = threading.Lock()
+        self._last_eviction = time.time()
+
+    def history(self, session_id: str) -> List[dict]:
+        """Recent messages of a conversation (loaded from disk if needed)"""
+        return self._session(session_id).messages
+
+    def append(self, session_id: str, message: dict):
+        """Add a message to a conversation and save it"""
+        self.extend(session_id, [message])
+
+    def extend(self, session_id: str, messages: List[dict]):
+        """Add several messages (e.g. a question and its reply) and save them together"""
+        session = self._session(session_id)
+        self.store.extend(session_id, messages)
+        session.messages.extend(messages)
+
+    def load_older(self, session_id: str) -> List[dict]:
+        """
+        Load the page before the oldest one loaded so far (for scrollback).
+
+        The older messages are only returned for display - history() and
+        the context sent to the model stay as they are. Call again for the
+        page before that; an empty list means the start was reached.
+
+        Returns:
+            The older messages, oldest first
+        """
+        session = self._session(session_id)
+        older = self.store.load_page(
+            session_id, before=session.scrollback_position, limit=self.page_size
+        )
+        session.scrollback_position -= len(older)
+        return older
+
+    def clear(self, session_id: str):
+        """Delete a conversation from memory and disk"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self.store.delete(session_id)
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle for longer than idle_timeout from memory"""
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            idle = [sid for sid, s in self._sessions.items() if s.last_used < cutoff]
+            for session_id in idle:
+                del self._sessions[session_id]
+            self._last_eviction = time.time()
+        return len(idle)
+
+    @property
+    def active_sessions(self) -> int:
+        """Number of conversations currently held in memory"""
+        return len(self._sessions)
+
+    def _session(self, session_id: str) -> _Session:
+        """Get an in-memory session, rehydrating it from the store"""
+        # Check for idle sessions now and then, not on every call
+        if time.time() - self._last_eviction > self.idle_timeout / 10:
+            self.evict_idle()
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                total = self.store.count(session_id)
+                messages = self.store.load_page(session_id, limit=self.page_size)
+                # Start on a question - a page can begin halfway through a turn
+                first = next(
+                    (i for i, m in enumerate(messages) if m.get("role") == "user"),
+                    len(messages)
+                )
+                session = _Session(messages[first:], total - len(messages) + first)
+                self._sessions[session_id] = session
+            session.last_used = time.time()
+            return session
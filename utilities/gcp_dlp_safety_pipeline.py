@@ -1,14 +1,46 @@
-from google.cloud import dlp_v2
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 
+from pii_redaction import redact_findings
+from safety_engines import shared_engine
+
+# DLP rejects inspect requests over 0.5 MB - leave room for the table structure
+MAX_REQUEST_BYTES = 400_000
+# inspect_content returns at most 2,000 findings, however many rows were sent,
+# so keep batches small enough that a busy batch rarely hits the cap
+MAX_ROWS_PER_REQUEST = 500
+MAX_FINDINGS_PER_REQUEST = 2_000
+
+# Common PII types (region-supported)
+DEFAULT_INFO_TYPES = [
+    "EMAIL_ADDRESS",
+    "PHONE_NUMBER",
+    "CREDIT_CARD_NUMBER",
+    "US_SOCIAL_SECURITY_NUMBER",
+    "PERSON_NAME",
+    "DATE_OF_BIRTH",
+    "STREET_ADDRESS",
+    "IP_ADDRESS",
+    "MAC_ADDRESS",
+    "IBAN_CODE",
+    "SWIFT_CODE",
+]
+
 class ProductionPIIDetector:
     """Production-grade PII detection using Google Cloud DLP"""
     
-    def __init__(self, project_id: str):
+    def __init__(self, project_id: str, dlp_client=None):
         self.project_id = project_id
-        self.dlp_client = dlp_v2.DlpServiceClient()
+        # Created on first use, and shared with the rest of the process
+        self._dlp_client = dlp_client
         self.parent = f"projects/{project_id}"
     
+    @property
+    def dlp_client(self):
+        if self._dlp_client is None:
+            self._dlp_client = shared_engine("dlp")
+        return self._dlp_client
+    
     def detect_pii(
         self, 
         text: str, 
@@ -29,19 +61,7 @@ class ProductionPIIDetector:
         
         # Default: Detect common PII types (region-supported)
         if info_types is None:
-            info_types = [
-                "EMAIL_ADDRESS",
-                "PHONE_NUMBER",
-                "CREDIT_CARD_NUMBER",
-                "US_SOCIAL_SECURITY_NUMBER",
-                "PERSON_NAME",
-                "DATE_OF_BIRTH",
-                "STREET_ADDRESS",
-                "IP_ADDRESS",
-                "MAC_ADDRESS",
-                "IBAN_CODE",
-                "SWIFT_CODE",
-            ]
+            info_types = DEFAULT_INFO_TYPES
         
         # Configure what to detect
         inspect_config = {
@@ -81,6 +101,139 @@ class ProductionPIIDetector:
             "text": text,
         }
     
+    def detect_pii_many(
+        self,
+        texts: List[str],
+        info_types: List[str] = None,
+        min_likelihood: str = "POSSIBLE",
+        max_concurrency: int = 4,
+        max_request_bytes: int = MAX_REQUEST_BYTES,
+        max_rows: int = MAX_ROWS_PER_REQUEST
+    ) -> List[Dict]:
+        """
+        Detect PII in many texts with as few DLP calls as possible
+        
+        Texts are packed into table items (one row per text) up to the
+        request size limits, and the requests run in parallel. When DLP
+        says a response was truncated (too many findings), the batch is
+        split in half and sent again; a single text that is still
+        truncated is returned with "findings_truncated" set.
+        
+        Args:
+            texts: Texts to scan
+            info_types: List of PII types to detect (None = same as detect_pii)
+            min_likelihood: VERY_UNLIKELY, UNLIKELY, POSSIBLE, LIKELY, VERY_LIKELY
+            max_concurrency: Most DLP requests in flight at once
+            max_request_bytes: Most text bytes per request
+            max_rows: Most texts per request
+        
+        Returns:
+            One result per text, in order, shaped like detect_pii's
+            (finding locations are byte offsets within that text)
+        
+        Raises:
+            ValueError: a single text is bigger than max_request_bytes
+        """
+        
+        # Pack texts into batches of (first index, texts)
+        batches = []
+        batch, batch_start, batch_bytes = [], 0, 0
+        for i, text in enumerate(texts):
+            size = len(text.encode("utf-8"))
+            if size > max_request_bytes:
+                raise ValueError(
+                    f"Text {i} is {size} bytes, over the {max_request_bytes} byte "
+                    "request limit - split it before scanning"
+                )
+            if batch and (batch_bytes + size > max_request_bytes or len(batch) >= max_rows):
+                batches.append((batch_start, batch))
+                batch, batch_start, batch_bytes = [], i, 0
+            batch.append(text)
+            batch_bytes += size
+        if batch:
+            batches.append((batch_start, batch))
+        
+        inspect_config = {
+            "info_types": [{"name": info_type} for info_type in (info_types or DEFAULT_INFO_TYPES)],
+            "min_likelihood": min_likelihood,
+            "include_quote": True,
+            "limits": {"max_findings_per_request": MAX_FINDINGS_PER_REQUEST},
+        }
+        truncated = set()
+        
+        def inspect_batch(batch):
+            start, batch_texts = batch
+            table = {
+                "headers": [{"name": "text"}],
+                "rows": [{"values": [{"string_value": text}]} for text in batch_texts],
+            }
+            response = self.dlp_client.inspect_content(
+                request={
+                    "parent": self.parent,
+                    "inspect_config": inspect_config,
+                    "item": {"table": table},
+                }
+            )
+            if getattr(response.result, "findings_truncated", False):
+                if len(batch_texts) > 1:
+                    # Some findings were dropped - ask again with half as many rows
+                    half = len(batch_texts) // 2
+                    return (
+                        inspect_batch((start, batch_texts[:half]))
+                        + inspect_batch((start + half, batch_texts[half:]))
+                    )
+                truncated.add(start)
+            # Each finding says which row (text) it came from
+            found = []
+            for finding in response.result.findings:
+                row = finding.location.content_locations[0].record_location.table_location.row_index
+                found.append((start + row, finding))
+            return found
+        
+        results = [{"has_pii": False, "findings": [], "text": text} for text in texts]
+        if not batches:
+            return results
+        
+        with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as pool:
+            for found in pool.map(inspect_batch, batches):
+                for index, finding in found:
+                    results[index]["findings"].append({
+                        "type": finding.info_type.name,
+                        "likelihood": finding.likelihood.name,
+                        "quote": finding.quote,
+                        "location": {
+                            "start": finding.location.byte_range.start,
+                            "end": finding.location.byte_range.end,
+                        }
+                    })
+                    results[index]["has_pii"] = True
+        
+        for index in truncated:
+            results[index]["findings_truncated"] = True
+        
+        return results
+    
+    def detect_and_redact_pii(
+        self,
+        text: str,
+        info_types: List[str] = None,
+        min_likelihood: str = "POSSIBLE",
+        replacement_text: str = "[REDACTED]"
+    ) -> Dict:
+        """
+        Detect AND redact PII with a single DLP call
+        
+        Same as detect_pii followed by redact_pii, but the redaction is done
+        locally from the findings' locations instead of a second round trip
+        (DLP's deidentify_content doesn't return the findings).
+        
+        Returns:
+            detect_pii's dictionary plus "redacted_text"
+        """
+        result = self.detect_pii(text, info_types, min_likelihood)
+        result["redacted_text"] = redact_findings(text, result["findings"], replacement_text)
+        return result
+    
     def redact_pii(
         self, 
         text: str, 
@@ -135,39 +288,38 @@ class ProductionPIIDetector:
         return response.item.value
 
 # Usage Example
-detector = ProductionPIIDetector(project_id="static-concept-459810-q7")
-
-# Example text - showcasing DLP detection capabilities
-text = """
-Contact Information:
-Name: Sarah Johnson
-Email: sarah.johnson@company.com
-Phone: +44 20 7946 0958
-Address: 42 Baker Street, London, W1U 7AE
-Date of Birth: 25 March 1990
-
-Additional Contact:
-Name: Michael Chen
-Email: m.chen@enterprise.org
-Phone: +44 121 555 1234
-Address: 5 Broad Street, Birmingham, B1 2HS
-Date of Birth: 12 July 1988
-"""
-
-# Detect PII
-result = detector.detect_pii(text)
-
-print(f"Contains PII: {result['has_pii']}")
-print(f"\nFound {len(result['findings'])} PII instances:")
-
-for finding in result['findings']:
-    print(f"\n  Type: {finding['type']}")
-    print(f"  Value: {finding['quote']}")
-    print(f"  Confidence: {finding['likelihood']}")
-
-# Redact PII
-redacted = detector.redact_pii(text)
-print(f"\nRedacted text:\n{redacted}")
+if __name__ == "__main__":
+    detector = ProductionPIIDetector(project_id="static-concept-459810-q7")
+
+    # Example text - showcasing DLP detection capabilities
+    text = """
+    Contact Information:
+    Name: Sarah Johnson
+    Email: sarah.johnson@company.com
+    Phone: +44 20 7946 0958
+    Address: 42 Baker Street, London, W1U 7AE
+    Date of Birth: 25 March 1990
+
+    Additional Contact:
+    Name: Michael Chen
+    Email: m.chen@enterprise.org
+    Phone: +44 121 555 1234
+    Address: 5 Broad Street, Birmingham, B1 2HS
+    Date of Birth: 12 July 1988
+    """
+
+    # Detect and redact PII (one DLP call)
+    result = detector.detect_and_redact_pii(text)
+
+    print(f"Contains PII: {result['has_pii']}")
+    print(f"\nFound {len(result['findings'])} PII instances:")
+
+    for finding in result['findings']:
+        print(f"\n  Type: {finding['type']}")
+        print(f"  Value: {finding['quote']}")
+        print(f"  Confidence: {finding['likelihood']}")
+
+    print(f"\nRedacted text:\n{result['redacted_text']}")
 
 
 '''### **Output:**
@@ -0,0 +1,132 @@
+"""
+Intent Matcher - Zero-LLM Fast Path
+Answers questions the knowledge base already covers word for word
+("What's your code of conduct?", "How do I volunteer?") without calling
+the model at all.
+
+Each intent has an answer and a few example questions. A question is
+compared with the examples that share at least one word with it; only a
+close match (all of the example's key words, and not much else) is
+answered directly. Anything less confident returns None so the caller
+falls through to the model.
+
+    matcher = IntentMatcher()
+    matcher.add("volunteering", "We're always looking for volunteers...",
+                ["How do I volunteer?", "Can I help out?"])
+    match = matcher.match("how can I volunteer")
+    if match:
+        print(match.answer)   # In microseconds, no API call
+"""
+
+import re
+from collections import defaultdict
+from typing import Iterable, List, NamedTuple, Optional
+
+
+STOPWORDS = {
+    "a", "about", "am", "an", "and", "any", "are", "at", "be", "can", "could",
+    "do", "does", "for", "get", "have", "hi", "hello", "how", "i", "in", "is",
+    "it", "me", "my", "of", "on", "or", "please", "s", "t", "tell", "the",
+    "there", "to", "us", "we", "what", "whats", "where", "which", "who", "with",
+    "would", "you", "your",
+}
+
+
+def _stem(word: str) -> str:
+    """Very light stemming so "volunteering"/"volunteer" match"""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+
+def key_terms(text: str) -> frozenset:
+    """The words that carry a question's meaning"""
+    return frozenset(
+        _stem(word)
+        for word in re.findall(r"[a-z0-9]+", text.lower())
+        if word not in STOPWORDS
+    )
+
+
+class IntentMatch(NamedTuple):
+    intent: str
+    answer: str
+    confidence: float      # 0-1, 1 = same key words as an example
+    example: str           # The example question that matched
+
+
+class IntentMatcher:
+    """Matches questions to known intents by their key words"""
+
+    def __init__(self, threshold: float = 0.8):
+        """
+        Args:
+            threshold: Minimum confidence for a direct answer (0-1). Higher
+                means fewer direct answers but fewer wrong ones.
+        """
+        self.threshold = threshold
+        self.answers = {}                   # intent -> answer
+        self._examples = []                 # (intent, example text, key terms)
+        self._by_term = defaultdict(list)   # term -> example indexes
+
+    def add(self, intent: str, answer: str, examples: Iterable[str]):
+        """
+        Register an intent.
+
+        Args:
+            intent: Name reported when it matches (e.g. a knowledge section)
+            answer: Text returned for a match
+            examples: Questions that should be answered with it
+        """
+        self.answers[intent] = answer
+        for example in examples:
+            terms = key_terms(example)
+            if not terms:
+                continue
+            index = len(self._examples)
+            self._examples.append((intent, example, terms))
+            for term in terms:
+                self._by_term[term].append(index)
+
+    def __len__(self) -> int:
+        return len(self.answers)
+
+    def match(self, question: str) -> Optional[IntentMatch]:
+        """
+        Find a confident direct answer.
+
+        Returns:
+            The best IntentMatch, or None if nothing reaches the threshold
+        """
+        terms = key_terms(question)
+        if not terms:
+            return None
+
+        # Only examples sharing a word with the question are compared
+        candidates = set()
+        for term in terms:
+            candidates.update(self._by_term.get(term, ()))
+
+        best = None
+        best_score = 0.0
+        for index in candidates:
+            intent, example, example_terms = self._examples[index]
+            # Dice overlap: 1 only when both have exactly the same key words
+            score = 2 * len(terms & example_terms) / (len(terms) + len(example_terms))
+            if score > best_score:
+                best, best_score = (intent, example), score
+
+        if best is None or best_score < self.threshold:
+            return None
+        intent, example = best
+        return IntentMatch(intent, self.answers[intent], best_score, example)
+
+    @classmethod
+    def from_faqs(cls, faqs: List[dict], threshold: float = 0.8) -> "IntentMatcher":
+        """One intent per FAQ entry ({"question", "answer", optional "examples"})"""
+        matcher = cls(threshold)
+        for faq in faqs:
+            examples = [faq["question"]] + faq.get("examples", [])
+            matcher.add(faq["question"], faq["answer"], examples)
+        return matcher
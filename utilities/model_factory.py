@@ -0,0 +1,72 @@
+"""
+Shared GenerativeModel Factory
+Builds each configured model once and reuses it.
+
+Streamlit reruns the script on every message, so creating a new
+GenerativeModel each time puts object construction and connection setup
+on every request. get_model() keeps a small, thread-safe LRU of models
+keyed by (model ID, generation config, system instruction), shared by
+all sessions in the server process.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import google.generativeai as genai
+
+from response_cache import config_to_dict
+
+
+MAX_MODELS = 32
+
+_models = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_model(
+    model_id: str,
+    generation_config: dict = None,
+    system_instruction: str = None
+) -> genai.GenerativeModel:
+    """
+    Get a configured model, creating it only the first time.
+
+    Args:
+        model_id: Gemini model name, e.g. 'gemini-2.5-flash-lite'
+        generation_config: Optional settings (temperature, top_p, ...) as a
+            dict or a genai.types.GenerationConfig
+        system_instruction: Optional system prompt
+
+    Returns:
+        A GenerativeModel shared with every caller using the same settings
+    """
+    # Values can be lists (stop_sequences), so the key is the config as JSON
+    config = config_to_dict(generation_config)
+    config_key = json.dumps(config, sort_keys=True, default=str)
+    key = (model_id, config_key, system_instruction)
+
+    with _lock:
+        model = _models.get(key)
+        if model is not None:
+            _models.move_to_end(key)
+            return model
+
+        model = genai.GenerativeModel(
+            model_id,
+            generation_config=genai.types.GenerationConfig(**config) if config else None,
+            system_instruction=system_instruction
+        )
+        _models[key] = model
+
+        # Drop the least recently used model when we hold too many
+        while len(_models) > MAX_MODELS:
+            _models.popitem(last=False)
+
+        return model
+
+
+def clear_models():
+    """Forget all cached models (e.g. after changing the API key)"""
+    with _lock:
+        _models.clear()
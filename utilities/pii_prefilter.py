@@ -0,0 +1,105 @@
+"""
+Local PII Pre-filter
+A quick local check for whether a message could contain PII at all,
+before paying for a DLP call or a Presidio NLP pass.
+
+Most chat messages ("What events are on this week?") have no digits, no
+@ and no names in them, so there's nothing for the remote detectors to
+find. The pre-filter looks for:
+
+- Structured PII, matched with precompiled patterns and validated the
+  same way real numbers are: Luhn checksum for cards, mod-97 for IBANs,
+  SSN structure rules, email/phone/IP formats
+- Hints for PII it can't check locally: digits (dates of birth, street
+  numbers, passport and licence numbers) and capitalised words mid-sentence
+  (names, street names)
+
+    candidates = pii_candidates("Call me on 020 7946 0958")
+    # {"PHONE_NUMBER", "DATE_OF_BIRTH", "STREET_ADDRESS", ...}
+
+An empty set means the remote PII layers can be skipped; otherwise only
+the candidate info types need to be requested from DLP.
+
+It is a heuristic, not a detector: names and addresses typed in lower
+case ("my name is john smith", "I live on baker street") have no digit or
+capital to hint at them, so they come back as an empty set and would go
+unchecked. That's why ProductionSafetyPipeline only uses it when asked
+(use_prefilter=True) - turn it on where saving the remote calls matters
+more than catching every name.
+"""
+
+import ipaddress
+import re
+from typing import Dict, List, Set
+
+EMAIL = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+CARD = re.compile(r"(?<!\d)(?:\d[ -]?){12,18}\d(?!\d)")
+IBAN = re.compile(r"\b[A-Z]{2}\d{2}(?: ?[A-Z0-9]){11,30}\b")
+SSN = re.compile(r"(?<!\d)(?!000|666|9)\d{3}([- ]?)(?!00)\d{2}\1(?!0000)\d{4}(?!\d)")
+PHONE = re.compile(r"(?<![\w+])\+?\(?\d[\d ().-]{5,}\d(?!\w)")
+IPV4 = re.compile(r"(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?![\d.])")
+IPV6 = re.compile(r"(?<![\w:])[0-9A-Fa-f]{0,4}(?::[0-9A-Fa-f]{0,4}){2,7}(?![\w:])")
+
+DIGIT = re.compile(r"\d")
+# A capitalised word that doesn't start a sentence ("...to London", "I'm Sarah")
+PROPER_NOUN = re.compile(r"[^\s.!?:;\"'(\[]\s+[A-Z][a-z]")
+
+# PII only DLP can judge, hinted at by digits or capitalised words
+DIGIT_HINTS = {"DATE_OF_BIRTH", "STREET_ADDRESS", "PASSPORT", "DRIVER_LICENSE_NUMBER"}
+PROPER_NOUN_HINTS = {"PERSON_NAME", "STREET_ADDRESS"}
+
+
+def luhn_valid(number: str) -> bool:
+    """Card number checksum: double every second digit from the right"""
+    digits = [int(d) for d in reversed(number)]
+    total = sum(digits[0::2]) + sum(sum(divmod(d * 2, 10)) for d in digits[1::2])
+    return total % 10 == 0
+
+
+def iban_valid(iban: str) -> bool:
+    """IBAN checksum: move the first 4 characters to the end, read letters as 10-35, mod 97 == 1"""
+    iban = iban.replace(" ", "")
+    rearranged = iban[4:] + iban[:4]
+    return int("".join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+def _valid_ip(candidate: str) -> bool:
+    try:
+        ipaddress.ip_address(candidate)
+        return True
+    except ValueError:
+        return False
+
+
+def find_pii(text: str) -> Dict[str, List[str]]:
+    """Structured PII that passes validation, by DLP info type"""
+    found = {
+        "EMAIL_ADDRESS": EMAIL.findall(text),
+        "CREDIT_CARD_NUMBER": [
+            m for m in CARD.findall(text)
+            if luhn_valid(re.sub(r"\D", "", m))
+        ],
+        "IBAN_CODE": [m.group() for m in IBAN.finditer(text) if iban_valid(m.group())],
+        "US_SOCIAL_SECURITY_NUMBER": [m.group() for m in SSN.finditer(text)],
+        "PHONE_NUMBER": [
+            m for m in PHONE.findall(text)
+            if 7 <= len(re.sub(r"\D", "", m)) <= 15
+        ],
+        "IP_ADDRESS": [
+            m for m in IPV4.findall(text) + IPV6.findall(text)
+            if _valid_ip(m)
+        ],
+    }
+    return {info_type: matches for info_type, matches in found.items() if matches}
+
+
+def pii_candidates(text: str) -> Set[str]:
+    """DLP info types that could be in the text (empty = nothing worth checking)"""
+    candidates = set()
+    if DIGIT.search(text):
+        candidates |= DIGIT_HINTS
+    if PROPER_NOUN.search(text):
+        candidates |= PROPER_NOUN_HINTS
+    if candidates or "@" in text or ":" in text:
+        candidates |= set(find_pii(text))
+    return candidates
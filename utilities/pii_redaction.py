@@ -0,0 +1,61 @@
+"""
+Local PII Redaction from Findings
+Redacts text using the locations an inspection already returned, so
+detecting and redacting PII takes one service call instead of two.
+
+DLP reports where each finding is as UTF-8 *byte* offsets, but Python
+strings are indexed by *character*. For ASCII text they're the same; for
+text like "Café ☕" they aren't, so byte offsets are mapped to character
+offsets before slicing:
+
+    redacted = redact_findings(text, detector.detect_pii(text)["findings"])
+"""
+
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, Iterable, List, Tuple
+
+
+def byte_ranges_to_char_ranges(text: str, byte_ranges: Iterable[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """
+    Convert UTF-8 byte offsets in text into character offsets.
+
+    An offset in the middle of a multi-byte character rounds outwards, so
+    the whole character is covered.
+    """
+    byte_ranges = list(byte_ranges)
+    if text.isascii():
+        return byte_ranges
+
+    # char_ends[i] = byte offset just after character i
+    char_ends = list(accumulate(len(char.encode("utf-8")) for char in text))
+    return [
+        # Character containing the start byte ... character containing the last byte
+        (bisect_left(char_ends, start + 1), bisect_left(char_ends, end) + 1 if end else 0)
+        for start, end in byte_ranges
+    ]
+
+
+def redact_ranges(text: str, char_ranges: Iterable[Tuple[int, int]], replacement: str = "[REDACTED]") -> str:
+    """Replace each character range (overlapping ones merged) with replacement"""
+    merged = []
+    for start, end in sorted(char_ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+
+    pieces = []
+    position = 0
+    for start, end in merged:
+        pieces.append(text[position:start])
+        pieces.append(replacement)
+        position = end
+    pieces.append(text[position:])
+    return "".join(pieces)
+
+
+def redact_findings(text: str, findings: List[Dict], replacement: str = "[REDACTED]") -> str:
+    """Redact findings shaped like detect_pii's (location = byte offsets in text)"""
+    byte_ranges = [(f["location"]["start"], f["location"]["end"]) for f in findings]
+    return redact_ranges(text, byte_ranges_to_char_ranges(text, byte_ranges), replacement)
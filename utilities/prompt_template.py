@@ -0,0 +1,96 @@
+"""
+Precompiled Prompt Templates
+Builds prompts from static sections (prepared once) and dynamic slots
+(filled in per request), and reports how many tokens each prompt uses.
+
+Static text such as the system prompt is joined and counted once when
+the template is created. Each request only fills the slots (search
+results, the user's question, ...), counts those, and joins the
+prebuilt parts - no re-formatting of the whole prompt every time.
+"""
+
+from typing import Callable, List, NamedTuple, Union
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (about 4 characters per token), no API call needed"""
+    return max(1, len(text) // 4) if text else 0
+
+
+class Slot(NamedTuple):
+    """A placeholder filled in per request"""
+    name: str
+    prefix: str = ""   # Only added when the slot has a value
+    suffix: str = ""
+
+
+class RenderedPrompt(NamedTuple):
+    text: str
+    input_tokens: int    # Static + dynamic tokens
+    static_tokens: int
+    dynamic_tokens: int
+
+
+class PromptTemplate:
+    """A prompt made of static text sections and named Slots"""
+
+    def __init__(
+        self,
+        sections: List[Union[str, Slot]],
+        count_tokens: Callable[[str], int] = estimate_tokens
+    ):
+        """
+        Compile the template.
+
+        Args:
+            sections: Static strings and Slots, in prompt order
+            count_tokens: Token counter for the static sections (counted once)
+                and the filled slots (counted on every render, so a fast local
+                counter is best)
+        """
+        self.count_tokens = count_tokens
+
+        # Merge neighbouring static sections so rendering joins fewer parts
+        self._parts = []
+        for section in sections:
+            if isinstance(section, str) and self._parts and isinstance(self._parts[-1], str):
+                self._parts[-1] += section
+            else:
+                self._parts.append(section)
+
+        self.section_tokens = {
+            f"static_{i}": count_tokens(part)
+            for i, part in enumerate(self._parts)
+            if isinstance(part, str)
+        }
+        self.static_tokens = sum(self.section_tokens.values())
+        self.slot_names = [p.name for p in self._parts if isinstance(p, Slot)]
+
+    def render(self, **values: str) -> RenderedPrompt:
+        """
+        Fill in the slots.
+
+        Args:
+            **values: Text for each slot (missing or empty slots are left out)
+
+        Returns:
+            The prompt text and its token counts
+        """
+        pieces = []
+        dynamic_tokens = 0
+        for part in self._parts:
+            if isinstance(part, str):
+                pieces.append(part)
+                continue
+            value = values.get(part.name)
+            if value:
+                filled = f"{part.prefix}{value}{part.suffix}"
+                pieces.append(filled)
+                dynamic_tokens += self.count_tokens(filled)
+
+        return RenderedPrompt(
+            text="".join(pieces),
+            input_tokens=self.static_tokens + dynamic_tokens,
+            static_tokens=self.static_tokens,
+            dynamic_tokens=dynamic_tokens
+        )
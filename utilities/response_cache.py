@@ -0,0 +1,195 @@
+"""
+Exact-Match Response Cache
+Stores model responses so identical requests don't cost another API call.
+
+Entries are keyed on everything that affects the answer: model ID,
+generation config, system prompt and the (normalized) prompt/history.
+Recent entries live in an in-memory LRU; an optional SQLite file keeps
+them across restarts. Every entry has a time-to-live, and the file is
+kept to a maximum size (expired entries go first, then those that would
+expire soonest).
+"""
+
+import dataclasses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def normalize_text(text: str) -> str:
+    """Make trivially different prompts ("What is WCC? " / "what is wcc?") match"""
+    return " ".join(text.split()).casefold()
+
+
+def config_to_dict(generation_config: Any) -> dict:
+    """Turn a GenerationConfig (object or dict) into a plain dict"""
+    if generation_config is None:
+        return {}
+    if isinstance(generation_config, dict):
+        config = generation_config
+    elif dataclasses.is_dataclass(generation_config):
+        config = dataclasses.asdict(generation_config)
+    else:
+        config = vars(generation_config)
+    return {k: v for k, v in config.items() if v is not None}
+
+
+def is_deterministic(generation_config: Any) -> bool:
+    """Only temperature 0 gives (near) repeatable answers worth caching"""
+    return config_to_dict(generation_config).get("temperature") == 0
+
+
+def _normalize_contents(contents: Any) -> Any:
+    """Normalize the text inside a prompt string or a list of messages"""
+    if isinstance(contents, str):
+        return normalize_text(contents)
+    if isinstance(contents, dict):
+        return {k: _normalize_contents(v) for k, v in contents.items()}
+    if isinstance(contents, (list, tuple)):
+        return [_normalize_contents(item) for item in contents]
+    return contents
+
+
+class ResponseCache:
+    """LRU + TTL cache of model responses, optionally persisted to disk"""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 24 * 60 * 60,
+        path: str = None,
+        max_disk_entries: int = 10_000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Most responses kept in memory
+            ttl_seconds: Default time-to-live of an entry
+            path: Optional SQLite file so the cache survives restarts
+            max_disk_entries: Most responses kept in that file
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, response TEXT, expires_at REAL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS responses_expires_at ON responses (expires_at)"
+            )
+            self._prune_disk()
+
+    @staticmethod
+    def make_key(
+        model_id: str,
+        generation_config: Any,
+        system_prompt: Optional[str],
+        contents: Any
+    ) -> str:
+        """Hash everything that affects the response into a cache key"""
+        payload = json.dumps(
+            {
+                "model": model_id,
+                "config": config_to_dict(generation_config),
+                "system": system_prompt or "",
+                "contents": _normalize_contents(contents),
+            },
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None on a miss"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._db is not None:
+                row = self._db.execute(
+                    "SELECT expires_at, response FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row:
+                    entry = tuple(row)
+                    self._remember(key, entry)
+
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    self._forget(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: str, response: str, ttl_seconds: float = None):
+        """Store a response for ttl_seconds (default: the cache's TTL)"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        entry = (time.time() + ttl, response)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, response, entry[0])
+                )
+                self._prune_disk()
+
+    def clear(self):
+        """Remove every entry (memory and disk) and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+    def _remember(self, key: str, entry: tuple):
+        """Add to the in-memory LRU, evicting the least recently used"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _prune_disk(self):
+        """Delete expired entries, then the soonest to expire beyond max_disk_entries"""
+        self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN ("
+            "SELECT key FROM responses ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,)
+        )
+        self._db.commit()
+
+    def _forget(self, key: str):
+        """Drop an expired entry everywhere"""
+        self._entries.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._db.commit()
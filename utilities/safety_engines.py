@@ -0,0 +1,65 @@
+"""
+Shared Safety Engines
+The DLP client, Presidio engines and OpenAI client, created on first use
+and shared by every pipeline in the process.
+
+Creating them is slow - Presidio's AnalyzerEngine loads a spaCy model,
+and the SDK imports alone take a while - so nothing happens when this
+module is imported. Each engine is built the first time it's needed, once
+per process, even when several threads ask at the same time:
+
+    analyzer = shared_engine("presidio_analyzer")
+    client = shared_engine("openai", api_key)   # One client per key
+"""
+
+import threading
+from typing import Callable, Dict
+
+
+def _create_dlp_client():
+    from google.cloud import dlp_v2
+    return dlp_v2.DlpServiceClient()
+
+
+def _create_presidio_analyzer():
+    from presidio_analyzer import AnalyzerEngine
+    return AnalyzerEngine()
+
+
+def _create_presidio_anonymizer():
+    from presidio_anonymizer import AnonymizerEngine
+    return AnonymizerEngine()
+
+
+def _create_openai_client(api_key: str):
+    import openai
+    return openai.OpenAI(api_key=api_key)
+
+
+FACTORIES: Dict[str, Callable] = {
+    "dlp": _create_dlp_client,
+    "presidio_analyzer": _create_presidio_analyzer,
+    "presidio_anonymizer": _create_presidio_anonymizer,
+    "openai": _create_openai_client,
+}
+
+_engines = {}
+_lock = threading.Lock()
+
+
+def shared_engine(name: str, *args):
+    """The process-wide engine called name (created by FACTORIES[name](*args) the first time)"""
+    key = (name, *args)
+    engine = _engines.get(key)
+    if engine is None:
+        with _lock:
+            engine = _engines.get(key)
+            if engine is None:
+                engine = _engines[key] = FACTORIES[name](*args)
+    return engine
+
+
+def clear():
+    """Forget every engine (the next use creates new ones)"""
+    with _lock:
+        _engines.clear()
@@ -1,8 +1,23 @@
-from google.cloud import dlp_v2
-from presidio_analyzer import AnalyzerEngine
-from presidio_anonymizer import AnonymizerEngine
-import openai
-from typing import Dict, List, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Callable, Dict, Iterator, List, Tuple
+
+from pii_prefilter import pii_candidates
+from pii_redaction import redact_findings
+from safety_engines import shared_engine
+from verdict_cache import VerdictCache
+
+# What DLP looks for, and the subset it redacts from blocked messages
+DLP_INFO_TYPES = [
+    "EMAIL_ADDRESS", "PHONE_NUMBER", "CREDIT_CARD_NUMBER",
+    "US_SOCIAL_SECURITY_NUMBER", "PERSON_NAME", "STREET_ADDRESS",
+    "DATE_OF_BIRTH", "IP_ADDRESS", "PASSPORT", "DRIVER_LICENSE_NUMBER"
+]
+DLP_REDACT_INFO_TYPES = {
+    "EMAIL_ADDRESS", "PHONE_NUMBER", "CREDIT_CARD_NUMBER",
+    "US_SOCIAL_SECURITY_NUMBER", "PERSON_NAME", "STREET_ADDRESS"
+}
 
 class ProductionSafetyPipeline:
     """
@@ -16,23 +31,109 @@ class ProductionSafetyPipeline:
         openai_api_key: str,
         use_google_dlp: bool = True,
         use_presidio: bool = True,
-        use_openai_moderation: bool = True
+        use_openai_moderation: bool = True,
+        use_prefilter: bool = False,
+        concurrent_layers: bool = False,
+        max_workers: int = 8,
+        verdict_cache: VerdictCache = None,
+        dlp_client=None
     ):
         # Initialize services
         self.use_google_dlp = use_google_dlp
         self.use_presidio = use_presidio
         self.use_openai_moderation = use_openai_moderation
+        # Skip the remote PII layers for messages that look PII-free. Off by
+        # default: a name or address with no digits or capitals ("my name is
+        # john smith") gives the pre-filter nothing to see, so turning it on
+        # trades some recall for fewer DLP and Presidio calls
+        self.use_prefilter = use_prefilter
+        # Run the PII layers (DLP and Presidio) at the same time instead of one
+        # by one. Moderation sends the text to OpenAI, so it still waits until
+        # the PII layers have passed it (unless block_on_pii is off, when they
+        # could never stop it anyway)
+        self.concurrent_layers = concurrent_layers
+        self._executor = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="safety-layer")
+            if concurrent_layers else None
+        )
+        # Verdicts for texts already checked (None = check every time)
+        self.verdict_cache = verdict_cache
         
-        if use_google_dlp:
-            self.dlp_client = dlp_v2.DlpServiceClient()
-            self.gcp_parent = f"projects/{gcp_project_id}"
+        # The services themselves are created on first use (or by warmup())
+        # and shared with every other pipeline in the process
+        self.gcp_parent = f"projects/{gcp_project_id}"
+        self._openai_api_key = openai_api_key
+        self._dlp_client = dlp_client
+        self._presidio_analyzer = None
+        self._presidio_anonymizer = None
+        self._openai_client = None
+    
+    @property
+    def dlp_client(self):
+        if self._dlp_client is None:
+            self._dlp_client = shared_engine("dlp")
+        return self._dlp_client
+    
+    @dlp_client.setter
+    def dlp_client(self, client):
+        self._dlp_client = client
+    
+    @property
+    def presidio_analyzer(self):
+        if self._presidio_analyzer is None:
+            self._presidio_analyzer = shared_engine("presidio_analyzer")
+        return self._presidio_analyzer
+    
+    @presidio_analyzer.setter
+    def presidio_analyzer(self, analyzer):
+        self._presidio_analyzer = analyzer
+    
+    @property
+    def presidio_anonymizer(self):
+        if self._presidio_anonymizer is None:
+            self._presidio_anonymizer = shared_engine("presidio_anonymizer")
+        return self._presidio_anonymizer
+    
+    @presidio_anonymizer.setter
+    def presidio_anonymizer(self, anonymizer):
+        self._presidio_anonymizer = anonymizer
+    
+    @property
+    def openai_client(self):
+        if self._openai_client is None:
+            self._openai_client = shared_engine("openai", self._openai_api_key)
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
+    def warmup(self) -> Dict[str, float]:
+        """
+        Create the services for every enabled layer and make one small call
+        to each (loads Presidio's models, opens the DLP and OpenAI
+        connections), so the first real message doesn't pay for it.
         
-        if use_presidio:
-            self.presidio_analyzer = AnalyzerEngine()
-            self.presidio_anonymizer = AnonymizerEngine()
+        Returns:
+            Seconds each layer took to warm up
+        """
+        checks = []
+        if self.use_google_dlp:
+            checks.append(("google_dlp", lambda: self._inspect_dlp("warm up", ["EMAIL_ADDRESS"])))
+        if self.use_presidio:
+            checks.append(("presidio", lambda: (
+                self.presidio_anonymizer,
+                self.presidio_analyzer.analyze(text="warm up", language="en")
+            )))
+        if self.use_openai_moderation:
+            checks.append(("openai_moderation", lambda: self.openai_client.moderations.create(input="warm up")))
         
-        if use_openai_moderation:
-            self.openai_client = openai.OpenAI(api_key=openai_api_key)
+        timings = {}
+        for layer, check in checks:
+            start = time.perf_counter()
+            check()
+            timings[layer] = time.perf_counter() - start
+        return timings
     
     def validate_input(
         self,
@@ -46,6 +147,10 @@ class ProductionSafetyPipeline:
         
         Returns:
             (is_safe, processed_text, details)
+            details["skipped_layers"] lists the PII layers the pre-filter
+            skipped, details["pii_candidates"] what it found (None when
+            the pre-filter is off), and details["cached_layers"] the
+            layers answered from the verdict cache
         """
         
         details = {
@@ -54,7 +159,10 @@ class ProductionSafetyPipeline:
             "length_exceeded": False,
             "pii_findings": [],
             "moderation_flags": {},
-            "redacted_text": text
+            "redacted_text": text,
+            "pii_candidates": None,
+            "skipped_layers": [],
+            "cached_layers": []
         }
         
         # Layer 1: Length Check
@@ -63,132 +171,186 @@ class ProductionSafetyPipeline:
             if block_on_pii:
                 return False, text, details
         
-        # Layer 2: PII Detection (Google DLP)
-        if self.use_google_dlp:
-            pii_result = self._detect_pii_dlp(text)
-            details["pii_detected"] = pii_result["has_pii"]
-            details["pii_findings"].extend(pii_result["findings"])
-            
-            if block_on_pii and pii_result["has_pii"]:
-                # Redact PII
-                details["redacted_text"] = self._redact_pii_dlp(text)
-                return False, details["redacted_text"], details
-        
-        # Layer 3: PII Detection (Presidio - backup/validation)
-        if self.use_presidio:
-            presidio_result = self._detect_pii_presidio(text)
-            if presidio_result["has_pii"]:
-                details["pii_detected"] = True
-                details["pii_findings"].extend(presidio_result["findings"])
-                
-                if block_on_pii:
-                    details["redacted_text"] = self._redact_pii_presidio(text)
-                    return False, details["redacted_text"], details
+        # Layer 2: PII Pre-filter (local) - which info types could be present
+        dlp_info_types = DLP_INFO_TYPES
+        if self.use_prefilter:
+            candidates = pii_candidates(text)
+            details["pii_candidates"] = sorted(candidates)
+            dlp_info_types = [t for t in DLP_INFO_TYPES if t in candidates]
+            if self.use_google_dlp and not dlp_info_types:
+                details["skipped_layers"].append("google_dlp")
+            if self.use_presidio and not candidates:
+                details["skipped_layers"].append("presidio")
         
-        # Layer 4: Content Moderation (OpenAI)
+        # Layers 3-5 run in stages: the PII layers first, then moderation, so
+        # a message with PII is blocked before it is sent to OpenAI. With
+        # concurrent_layers the layers of a stage start at once. Verdicts are
+        # still applied in this order, so the result is the same as running
+        # them one by one.
+        pii_layers = []
+        if self.use_google_dlp and dlp_info_types:
+            pii_layers.append(("google_dlp", lambda: self._detect_pii_dlp(text, dlp_info_types)))
+        if self.use_presidio and "presidio" not in details["skipped_layers"]:
+            pii_layers.append(("presidio", lambda: self._detect_pii_presidio(text)))
+        moderation_layers = []
         if self.use_openai_moderation:
-            moderation_result = self._moderate_content(text)
-            details["harmful_content"] = moderation_result["flagged"]
-            details["moderation_flags"] = moderation_result["categories"]
-            
-            if block_on_harmful and moderation_result["flagged"]:
-                return False, text, details
+            moderation_layers.append(("openai_moderation", lambda: self._moderate_content(text)))
+        if block_on_pii:
+            stages = [pii_layers, moderation_layers]
+        else:
+            # PII never blocks, so moderation sees the text either way
+            stages = [pii_layers + moderation_layers]
+        
+        with closing(self._run_layers(stages)) as results:
+            for layer, result in results:
+                if result["cached"]:
+                    details["cached_layers"].append(layer)
+                
+                # Layer 3: PII Detection (Google DLP), only for the candidate info types
+                if layer == "google_dlp":
+                    details["pii_detected"] = result["has_pii"]
+                    details["pii_findings"].extend(result["findings"])
+                    
+                    if block_on_pii and result["has_pii"]:
+                        # Redacted from the same DLP response - no second call
+                        details["redacted_text"] = result["redacted_text"]
+                        return False, details["redacted_text"], details
+                
+                # Layer 4: PII Detection (Presidio - backup/validation)
+                elif layer == "presidio" and result["has_pii"]:
+                    details["pii_detected"] = True
+                    details["pii_findings"].extend(result["findings"])
+                    
+                    if block_on_pii:
+                        details["redacted_text"] = self._redact_pii_presidio(text)
+                        return False, details["redacted_text"], details
+                
+                # Layer 5: Content Moderation (OpenAI) - never skipped
+                elif layer == "openai_moderation":
+                    details["harmful_content"] = result["flagged"]
+                    details["moderation_flags"] = result["categories"]
+                    
+                    if block_on_harmful and result["flagged"]:
+                        return False, text, details
         
         # All checks passed
         return True, text, details
     
-    def _detect_pii_dlp(self, text: str) -> Dict:
-        """Detect PII using Google Cloud DLP"""
-        
-        info_types = [
-            "EMAIL_ADDRESS", "PHONE_NUMBER", "CREDIT_CARD_NUMBER",
-            "US_SOCIAL_SECURITY_NUMBER", "PERSON_NAME", "STREET_ADDRESS",
-            "DATE_OF_BIRTH", "IP_ADDRESS", "PASSPORT", "DRIVER_LICENSE_NUMBER"
-        ]
+    def _run_layers(self, stages: List[List[Tuple[str, Callable]]]) -> Iterator[Tuple[str, Dict]]:
+        """
+        Yield (layer, result) in order, one stage after another.
         
-        inspect_config = {
-            "info_types": [{"name": t} for t in info_types],
-            "min_likelihood": "POSSIBLE",
-        }
+        One by one, a layer only runs once the caller asks for its result,
+        so a blocked message never reaches the later layers. Concurrently,
+        the layers of a stage start together, and the next stage only starts
+        once the caller has taken every result of this one; when the caller
+        stops early (blocked), layers that haven't started are cancelled and
+        running ones ignored.
+        """
+        for layers in stages:
+            if not self.concurrent_layers:
+                for layer, check in layers:
+                    yield layer, check()
+                continue
+            
+            futures = [(layer, self._executor.submit(check)) for layer, check in layers]
+            try:
+                for layer, future in futures:
+                    yield layer, future.result()
+            finally:
+                for _, future in futures:
+                    future.cancel()
+    
+    def close(self):
+        """Stop the layer threads (concurrent_layers only)"""
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _detect_pii_dlp(self, text: str, info_types: List[str] = DLP_INFO_TYPES) -> Dict:
+        """Detect PII using Google Cloud DLP, and redact it from the same response"""
         
-        response = self.dlp_client.inspect_content(
-            request={
-                "parent": self.gcp_parent,
-                "inspect_config": inspect_config,
-                "item": {"value": text},
-            }
+        spans, cached = self._cached(
+            "google_dlp", text, (tuple(info_types), "POSSIBLE"),
+            lambda: self._inspect_dlp(text, info_types)
         )
         
+        # Quotes come from the text itself, so the cache only needs offsets
+        data = text.encode("utf-8")
         findings = [
             {
-                "type": f.info_type.name,
-                "quote": f.quote,
-                "likelihood": f.likelihood.name
+                "type": info_type,
+                "quote": data[start:end].decode("utf-8", errors="replace"),
+                "likelihood": likelihood,
+                "location": {"start": start, "end": end}
             }
-            for f in response.result.findings
+            for info_type, likelihood, start, end in spans
         ]
         
         return {
             "has_pii": len(findings) > 0,
-            "findings": findings
+            "findings": findings,
+            "redacted_text": redact_findings(
+                text, [f for f in findings if f["type"] in DLP_REDACT_INFO_TYPES]
+            ),
+            "cached": cached
         }
     
-    def _redact_pii_dlp(self, text: str) -> str:
-        """Redact PII using Google Cloud DLP"""
-        
-        info_types = [
-            "EMAIL_ADDRESS", "PHONE_NUMBER", "CREDIT_CARD_NUMBER",
-            "US_SOCIAL_SECURITY_NUMBER", "PERSON_NAME", "STREET_ADDRESS"
-        ]
+    def _inspect_dlp(self, text: str, info_types: List[str]) -> List[Tuple[str, str, int, int]]:
+        """DLP findings as (type, likelihood, start byte, end byte)"""
         
         inspect_config = {
             "info_types": [{"name": t} for t in info_types],
+            "min_likelihood": "POSSIBLE",
         }
         
-        deidentify_config = {
-            "info_type_transformations": {
-                "transformations": [{
-                    "primitive_transformation": {
-                        "replace_config": {
-                            "new_value": {"string_value": "[REDACTED]"}
-                        }
-                    }
-                }]
-            }
-        }
-        
-        response = self.dlp_client.deidentify_content(
+        response = self.dlp_client.inspect_content(
             request={
                 "parent": self.gcp_parent,
-                "deidentify_config": deidentify_config,
                 "inspect_config": inspect_config,
                 "item": {"value": text},
             }
         )
         
-        return response.item.value
+        return [
+            (
+                f.info_type.name,
+                f.likelihood.name,
+                f.location.byte_range.start,
+                f.location.byte_range.end
+            )
+            for f in response.result.findings
+        ]
+    
+    def _redact_pii_dlp(self, text: str) -> str:
+        """Redact PII using Google Cloud DLP"""
+        return self._detect_pii_dlp(text)["redacted_text"]
     
     def _detect_pii_presidio(self, text: str) -> Dict:
         """Detect PII using Presidio (backup validation)"""
         
-        results = self.presidio_analyzer.analyze(
-            text=text,
-            language="en",
-            score_threshold=0.5
-        )
+        def analyze():
+            results = self.presidio_analyzer.analyze(
+                text=text,
+                language="en",
+                score_threshold=0.5
+            )
+            return [(r.entity_type, r.start, r.end, r.score) for r in results]
+        
+        spans, cached = self._cached("presidio", text, ("en", 0.5), analyze)
         
         findings = [
             {
-                "type": r.entity_type,
-                "text": text[r.start:r.end],
-                "score": r.score
+                "type": entity_type,
+                "text": text[start:end],
+                "score": score
             }
-            for r in results
+            for entity_type, start, end, score in spans
         ]
         
         return {
             "has_pii": len(findings) > 0,
-            "findings": findings
+            "findings": findings,
+            "cached": cached
         }
     
     def _redact_pii_presidio(self, text: str) -> str:
@@ -209,44 +371,64 @@ class ProductionSafetyPipeline:
     def _moderate_content(self, text: str) -> Dict:
         """Check for harmful content using OpenAI Moderation"""
         
-        response = self.openai_client.moderations.create(input=text)
-        result = response.results[0]
-        
-        return {
-            "flagged": result.flagged,
-            "categories": {
-                cat: score 
+        def moderate():
+            response = self.openai_client.moderations.create(input=text)
+            result = response.results[0]
+            categories = tuple(
+                (cat, score)
                 for cat, score in result.category_scores.model_dump().items()
                 if score > 0.5
-            }
+            )
+            return result.flagged, categories
+        
+        (flagged, categories), cached = self._cached("openai_moderation", text, None, moderate)
+        
+        return {
+            "flagged": flagged,
+            "categories": dict(categories),
+            "cached": cached
         }
+    
+    def _cached(self, layer: str, text: str, config, check: Callable) -> Tuple[object, bool]:
+        """(verdict, came from the cache) - check() must return a verdict without any text in it"""
+        if self.verdict_cache is None:
+            return check(), False
+        verdict = self.verdict_cache.get(layer, text, config)
+        if verdict is not None:
+            return verdict, True
+        verdict = check()
+        self.verdict_cache.put(layer, text, config, verdict)
+        return verdict, False
 
 # Usage Example
-pipeline = ProductionSafetyPipeline(
-    gcp_project_id="your-project",
-    openai_api_key="your-key",
-    use_google_dlp=True,
-    use_presidio=True,
-    use_openai_moderation=True
-)
+if __name__ == "__main__":
+    pipeline = ProductionSafetyPipeline(
+        gcp_project_id="your-project",
+        openai_api_key="your-key",
+        use_google_dlp=True,
+        use_presidio=True,
+        use_openai_moderation=True
+    )
+    # Load models and open connections before the first message
+    print(f"Warm-up: {pipeline.warmup()}")
 
-# Test with problematic input
-test_input = """
-Hi, I'm John Smith. Email me at john@company.com or call 555-123-4567.
-My SSN is 123-45-6789. Also, I hate [harmful content here].
-"""
+    # Test with problematic input
+    test_input = """
+    Hi, I'm John Smith. Email me at john@company.com or call 555-123-4567.
+    My SSN is 123-45-6789. Also, I hate [harmful content here].
+    """
 
-is_safe, processed_text, details = pipeline.validate_input(
-    test_input,
-    block_on_pii=True,
-    block_on_harmful=True
-)
+    is_safe, processed_text, details = pipeline.validate_input(
+        test_input,
+        block_on_pii=True,
+        block_on_harmful=True
+    )
 
-if not is_safe:
-    print("❌ Input blocked!")
-    print(f"  PII detected: {details['pii_detected']}")
-    print(f"  Harmful content: {details['harmful_content']}")
-    print(f"  Redacted text: {details['redacted_text']}")
-else:
-    print("✅ Input is safe")
-    # Proceed to LLM
\ No newline at end of file
+    if not is_safe:
+        print("❌ Input blocked!")
+        print(f"  PII detected: {details['pii_detected']}")
+        print(f"  Harmful content: {details['harmful_content']}")
+        print(f"  Redacted text: {details['redacted_text']}")
+    else:
+        print("✅ Input is safe")
+        # Proceed to LLM
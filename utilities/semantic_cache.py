@@ -0,0 +1,169 @@
+"""
+Semantic Answer Cache
+Reuses answers for questions that are asked again in other words.
+
+Questions are embedded into vectors and stored in a NumPy matrix. A new
+question is compared against all stored questions with one matrix
+multiply (cosine similarity); above the threshold, the stored answer is
+returned without calling the LLM.
+
+How "similar" is judged depends on the embedding function. The default
+HashingEmbedder is lexical: it matches small changes in wording ("How do
+I join WCC?" / "how can I join WCC") but not paraphrases that share few
+words ("How do I join?" / "How can I become a member?"). For those, pass
+embed=gemini_embedder(), which compares meaning at the cost of an API
+call per question.
+"""
+
+import hashlib
+import re
+import threading
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+
+class HashingEmbedder:
+    """
+    Offline embedding function - no API key or model download needed.
+
+    Hashes words, word pairs and character trigrams into a fixed-size
+    vector. It only captures wording overlap, not meaning, but it is
+    fast, deterministic and good enough for tests and simple FAQs.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    def __call__(self, text: str) -> np.ndarray:
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for word in words:
+            padded = f"#{word}#"
+            features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature in features:
+            digest = hashlib.md5(feature.encode("utf-8")).digest()
+            index = int.from_bytes(digest[:4], "little") % self.dimensions
+            vector[index] += 1.0 if digest[4] & 1 else -1.0
+        return vector
+
+
+def gemini_embedder(model: str = "models/text-embedding-004") -> Callable[[str], np.ndarray]:
+    """Embedding function backed by the Gemini embeddings API"""
+    import google.generativeai as genai
+
+    def embed(text: str) -> np.ndarray:
+        result = genai.embed_content(
+            model=model,
+            content=text,
+            task_type="SEMANTIC_SIMILARITY"
+        )
+        return np.asarray(result["embedding"], dtype=np.float32)
+
+    return embed
+
+
+class SemanticMatch(NamedTuple):
+    answer: str
+    question: str
+    similarity: float
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of answered questions"""
+
+    def __init__(
+        self,
+        embed: Callable[[str], np.ndarray] = None,
+        threshold: float = 0.9,
+        max_entries: int = 10000
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            embed: Function turning text into a vector (default: HashingEmbedder)
+            threshold: Minimum cosine similarity to reuse an answer (0-1)
+            max_entries: Most questions stored; the oldest are replaced first
+        """
+        self.embed = embed or HashingEmbedder()
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._vectors = None   # (capacity, dimensions) matrix, unit-length rows
+        self._questions = []
+        self._answers = []
+        self._size = 0
+        self._next_slot = 0
+        self._last_query = (None, None)  # Reuse the embedding in add()
+        self._lock = threading.Lock()
+
+    def lookup(self, question: str) -> Optional[SemanticMatch]:
+        """Find the stored answer to the most similar question, if close enough"""
+        query = self._embed(question)
+        self._last_query = (question, query)
+
+        with self._lock:
+            if self._size == 0:
+                self.misses += 1
+                return None
+
+            similarities = self._vectors[:self._size] @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return SemanticMatch(self._answers[best], self._questions[best], similarity)
+
+    def add(self, question: str, answer: str):
+        """Store an answered question"""
+        last_question, vector = self._last_query
+        if last_question != question:
+            vector = self._embed(question)
+
+        with self._lock:
+            if self._vectors is None:
+                capacity = min(16, self.max_entries)
+                self._vectors = np.zeros((capacity, vector.shape[0]), dtype=np.float32)
+            elif self._size == len(self._vectors) and self._size < self.max_entries:
+                # Grow the matrix by doubling, like a Python list
+                capacity = min(2 * len(self._vectors), self.max_entries)
+                grown = np.zeros((capacity, vector.shape[0]), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+
+            slot = self._next_slot
+            self._vectors[slot] = vector
+            if slot < len(self._questions):
+                self._questions[slot] = question
+                self._answers[slot] = answer
+            else:
+                self._questions.append(question)
+                self._answers.append(answer)
+
+            self._size = max(self._size, slot + 1)
+            self._next_slot = (slot + 1) % self.max_entries
+
+    def stats(self) -> dict:
+        """Hit/miss counters for monitoring"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._size,
+        }
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed and normalize to unit length, so a dot product is the cosine"""
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import tempfile
+from types import SimpleNamespace
+
+from cassette import Cassette, CassetteMissError
+
+
+class EchoModel:
+    """Stands in for GenerativeModel - counts the 'live' calls it makes"""
+
+    calls = 0
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        EchoModel.calls += 1
+        text = f"echo: {contents}"
+        if stream:
+            return [SimpleNamespace(text=text[:5]), SimpleNamespace(text=text[5:])]
+        return SimpleNamespace(text=text, usage_metadata=None)
+
+    async def generate_content_async(self, contents, stream=False, **kwargs):
+        EchoModel.calls += 1
+        return SimpleNamespace(text=f"echo: {contents}", usage_metadata=None)
+
+
+def test_record_and_replay():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cassette.json")
+        model = EchoModel("fake-model")
+
+        # Record: calls go through and are saved
+        with Cassette(path, mode="record", targets=[EchoModel]):
+            assert model.generate_content("What is WCC?").text == "echo: What is WCC?"
+            chunks = [c.text for c in model.generate_content("Hi", stream=True)]
+        assert chunks == ["echo:", " Hi"]
+        assert EchoModel.calls == 2
+
+        # Replay: served from disk, no live calls
+        with Cassette(path, mode="replay", targets=[EchoModel]) as cassette:
+            assert model.generate_content("What is WCC?").text == "echo: What is WCC?"
+            assert [c.text for c in model.generate_content("Hi", stream=True)] == chunks
+            reply = asyncio.run(model.generate_content_async("What is WCC?"))
+            assert reply.text == "echo: What is WCC?"
+            assert cassette.hits == 3
+
+            try:
+                model.generate_content("Never recorded")
+                assert False, "expected a CassetteMissError"
+            except CassetteMissError:
+                pass
+        assert EchoModel.calls == 2
+
+        # Auto: replays what it has and records only what's missing
+        with Cassette(path, mode="auto", targets=[EchoModel]):
+            assert model.generate_content("What is WCC?").text
+            assert asyncio.run(model.generate_content_async("New question")).text
+        assert EchoModel.calls == 3
+
+        # The original methods are restored afterwards
+        model.generate_content("live again")
+        assert EchoModel.calls == 4
+
+    print("✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    test_record_and_replay()
@@ -0,0 +1,111 @@
+import copy
+
+from context_window import ContextWindow
+
+
+def one_token(text):
+    return 1
+
+
+def make_history(turns):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "parts": [f"question {i}"]})
+        history.append({"role": "model", "parts": [f"answer {i}"]})
+    return history
+
+
+def test_context_window():
+    counted = []
+
+    def counter(text):
+        counted.append(text)
+        return 1
+
+    window = ContextWindow(max_tokens=5, count_tokens=counter)
+    history = make_history(4)
+    history.append({"role": "user", "parts": ["latest"]})
+
+    # Oldest pairs are dropped, latest message kept, user turn first
+    selected = window.select(history)
+    assert len(selected) <= 5
+    assert selected[-1]["parts"] == ["latest"]
+    assert selected[0]["role"] == "user"
+
+    # Counts are cached - only the new message is counted
+    counted.clear()
+    history.append({"role": "model", "parts": ["reply"]})
+    history.append({"role": "user", "parts": ["next"]})
+    window.select(history)
+    assert counted == ["reply", "next"]
+
+    # Latest messages survive even when they alone exceed the budget
+    window = ContextWindow(max_tokens=1, count_tokens=one_token, min_recent_messages=3)
+    assert len(window.select(make_history(3))) >= 3
+
+    # Dropped turns are folded into a summary
+    def summarizer(previous, dropped):
+        return f"{len(dropped)} messages"
+
+    window = ContextWindow(max_tokens=4, count_tokens=one_token, summarizer=summarizer)
+    selected = window.select(make_history(4))
+    assert "messages" in selected[0]["parts"][0]
+    assert selected[1]["role"] == "model"
+
+    # A reply or question missing from the history never leaves a model
+    # message at the start of the window
+    history = make_history(3)
+    del history[1]
+    selected = ContextWindow(max_tokens=3, count_tokens=one_token).select(history)
+    assert selected == history[-2:]
+    selected = ContextWindow(max_tokens=3, count_tokens=one_token).select(make_history(3)[1:])
+    assert selected[0]["role"] == "user"
+
+    print("✅ All tests passed!")
+
+
+def test_context_window_handles_taken_back_messages():
+    # A failed turn is sent to the model but never added to the history
+    window = ContextWindow(max_tokens=100, count_tokens=one_token)
+    history = make_history(2)
+    window.select(history + [{"role": "user", "parts": ["failed"]}])
+    assert window.total_tokens == 5
+
+    # The next message takes its place and is counted instead
+    counted = []
+    window.count_tokens = lambda text: counted.append(text) or 1
+    selected = window.select(history + [{"role": "user", "parts": ["retry"]}])
+    assert selected == history + [{"role": "user", "parts": ["retry"]}]
+    assert counted == ["retry"]
+    assert window.total_tokens == 5
+
+    # Taken back without a replacement
+    assert window.select(history) == history
+    assert window.total_tokens == 4
+
+
+def test_context_window_keeps_its_state_for_a_reloaded_history():
+    # A history loaded again from a store is made of new, equal messages
+    def summarizer(previous, dropped):
+        return f"{previous or ''}+{len(dropped)}"
+
+    counted = []
+    window = ContextWindow(max_tokens=4, count_tokens=lambda text: counted.append(text) or 1,
+                           summarizer=summarizer)
+    history = make_history(4)
+    window.select(history)
+    assert window.summary == "+4"
+
+    counted.clear()
+    reloaded = copy.deepcopy(history) + [{"role": "user", "parts": ["latest"]}]
+    selected = window.select(reloaded)
+    # Only the new message is counted again (plus the updated summary)
+    assert [t for t in counted if not t.startswith(("Summary", "Got it"))] == ["latest"]
+    assert window.summary == "+4+2"         # The summary carries on, not restarted
+    assert selected[-1]["parts"] == ["latest"]
+
+
+if __name__ == "__main__":
+    test_context_window()
+    test_context_window_handles_taken_back_messages()
+    test_context_window_keeps_its_state_for_a_reloaded_history()
@@ -0,0 +1,61 @@
+from context_window import ContextWindow
+from conversation_store import ConversationManager, SQLiteConversationStore
+
+
+def one_token(text):
+    return 1
+
+
+def turn(i):
+    return [
+        {"role": "user", "parts": [f"question {i}"]},
+        {"role": "model", "parts": [f"answer {i}"]},
+    ]
+
+
+def test_conversation_store():
+    store = SQLiteConversationStore(":memory:")
+    manager = ConversationManager(store, page_size=5)
+    for i in range(6):
+        manager.extend("abc", turn(i))
+    assert store.count("abc") == 12
+    assert manager.history("abc")[-1] == {"role": "model", "parts": ["answer 5"]}
+
+    # A new manager (e.g. after a restart) loads only the latest page, and
+    # starts it on a question rather than halfway through a turn
+    manager = ConversationManager(store, page_size=5)
+    history = manager.history("abc")
+    assert history == turn(4) + turn(5)
+
+    # Older pages are returned for scrollback without changing the history
+    window = ContextWindow(max_tokens=3, count_tokens=one_token)
+    window.select(history)
+    assert manager.load_older("abc") == turn(1)[1:] + turn(2) + turn(3)
+    assert manager.history("abc") is history and history == turn(4) + turn(5)
+    assert manager.load_older("abc") == turn(0) + turn(1)[:1]
+    assert manager.load_older("abc") == []
+
+    # ...so the context window carries on from where it was
+    manager.extend("abc", turn(6))
+    assert window.select(history) == turn(6)
+
+    # A turn is saved whole or not at all
+    try:
+        manager.extend("abc", [{"role": "user", "parts": ["ok"]}, {"role": "model", "parts": [object()]}])
+    except TypeError:
+        pass
+    assert store.count("abc") == 14
+
+    # Idle sessions leave memory but not the disk
+    manager.idle_timeout = 0
+    assert manager.evict_idle() == 1 and manager.active_sessions == 0
+    assert manager.history("abc")[-1] == {"role": "model", "parts": ["answer 6"]}
+
+    manager.clear("abc")
+    assert store.count("abc") == 0 and manager.history("abc") == []
+
+    print("✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    test_conversation_store()
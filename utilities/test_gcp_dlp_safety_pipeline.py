@@ -0,0 +1,156 @@
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+from gcp_dlp_safety_pipeline import ProductionPIIDetector
+
+PATTERNS = {
+    "EMAIL_ADDRESS": re.compile(rb"[\w.+-]+@[\w-]+\.[\w.]+"),
+    "US_SOCIAL_SECURITY_NUMBER": re.compile(rb"\b\d{3}-\d{2}-\d{4}\b"),
+}
+
+
+class FakeDlpClient:
+    """Finds emails and SSNs locally, shaped like DLP's inspect_content responses"""
+
+    def __init__(self, latency: float = 0.0, max_findings=None):
+        self.latency = latency
+        # Like DLP's limits.max_findings_per_request, for truncation tests
+        self.max_findings = max_findings
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _findings(self, value: str, row=None):
+        data = value.encode("utf-8")
+        findings = []
+        for info_type, pattern in PATTERNS.items():
+            for match in pattern.finditer(data):
+                table_location = SimpleNamespace(row_index=row)
+                findings.append(SimpleNamespace(
+                    info_type=SimpleNamespace(name=info_type),
+                    likelihood=SimpleNamespace(name="VERY_LIKELY"),
+                    quote=match.group().decode("utf-8"),
+                    location=SimpleNamespace(
+                        byte_range=SimpleNamespace(start=match.start(), end=match.end()),
+                        content_locations=[SimpleNamespace(
+                            record_location=SimpleNamespace(table_location=table_location)
+                        )]
+                    )
+                ))
+        return findings
+
+    def inspect_content(self, request):
+        with self._lock:
+            self.requests.append(request)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            item = request["item"]
+            if "table" in item:
+                findings = [
+                    finding
+                    for row, values in enumerate(item["table"]["rows"])
+                    for finding in self._findings(values["values"][0]["string_value"], row)
+                ]
+            else:
+                findings = self._findings(item["value"])
+            truncated = self.max_findings is not None and len(findings) > self.max_findings
+            if truncated:
+                findings = findings[:self.max_findings]
+            return SimpleNamespace(result=SimpleNamespace(findings=findings, findings_truncated=truncated))
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_detect_pii_many_maps_findings_back():
+    client = FakeDlpClient()
+    detector = ProductionPIIDetector("test-project", dlp_client=client)
+    texts = [
+        "Hello there!",
+        "Mail me at ana@example.com",
+        "Café ☕ — SSN 123-45-6789, email bo@example.org",
+        "",
+    ]
+
+    results = detector.detect_pii_many(texts)
+
+    assert len(client.requests) == 1
+    assert [r["has_pii"] for r in results] == [False, True, True, False]
+    assert [r["text"] for r in results] == texts
+    finding = results[1]["findings"][0]
+    assert finding["quote"] == "ana@example.com"
+    assert texts[1].encode("utf-8")[finding["location"]["start"]:finding["location"]["end"]] == b"ana@example.com"
+    assert {f["type"] for f in results[2]["findings"]} == {"EMAIL_ADDRESS", "US_SOCIAL_SECURITY_NUMBER"}
+
+    # Same answer as scanning each text on its own
+    for text, result in zip(texts, results):
+        assert result["findings"] == detector.detect_pii(text)["findings"]
+
+
+def test_detect_pii_many_batches_within_limits_and_concurrency():
+    client = FakeDlpClient(latency=0.02)
+    detector = ProductionPIIDetector("test-project", dlp_client=client)
+    texts = [f"Message {i} from user{i}@example.com" for i in range(1000)]
+
+    results = detector.detect_pii_many(texts, max_rows=100, max_concurrency=3)
+
+    assert len(client.requests) == 10
+    assert client.max_in_flight <= 3
+    assert all(r["findings"][0]["quote"] == f"user{i}@example.com" for i, r in enumerate(results))
+
+    # Byte limit: each request stays under it
+    client.requests.clear()
+    detector.detect_pii_many(texts, max_request_bytes=2000)
+    for request in client.requests:
+        rows = request["item"]["table"]["rows"]
+        assert sum(len(r["values"][0]["string_value"].encode("utf-8")) for r in rows) <= 2000
+
+
+def test_detect_pii_many_splits_truncated_batches():
+    client = FakeDlpClient(max_findings=3)
+    detector = ProductionPIIDetector("test-project", dlp_client=client)
+    texts = [f"user{i}@example.com" for i in range(8)]
+
+    results = detector.detect_pii_many(texts)
+
+    # 8 rows -> 4 + 4 -> 2 + 2 + 2 + 2, and no finding is lost
+    assert len(client.requests) == 7
+    assert [r["findings"][0]["quote"] for r in results] == texts
+    assert not any(r.get("findings_truncated") for r in results)
+    assert client.requests[0]["inspect_config"]["limits"]["max_findings_per_request"] == 2000
+
+    # A single text with more findings than the cap can't be split - it's flagged
+    busy = " ".join(f"u{i}@example.com" for i in range(5))
+    results = detector.detect_pii_many(["hi", busy])
+    assert len(results[1]["findings"]) == 3
+    assert results[1]["findings_truncated"]
+    assert "findings_truncated" not in results[0]
+
+
+def test_detect_pii_many_rejects_oversized_text():
+    detector = ProductionPIIDetector("test-project", dlp_client=FakeDlpClient())
+    try:
+        detector.detect_pii_many(["short", "x" * 3000], max_request_bytes=2000)
+    except ValueError as e:
+        assert "Text 1 is 3000 bytes" in str(e)
+    else:
+        assert False, "expected ValueError"
+
+
+def test_detect_and_redact_pii_uses_one_call():
+    client = FakeDlpClient()
+    detector = ProductionPIIDetector("test-project", dlp_client=client)
+    text = "Café ☕ — SSN 123-45-6789, email bo@example.org!"
+
+    result = detector.detect_and_redact_pii(text)
+
+    assert len(client.requests) == 1
+    assert result["has_pii"]
+    # Byte offsets are mapped to characters, so the accented text stays intact
+    assert result["redacted_text"] == "Café ☕ — SSN [REDACTED], email [REDACTED]!"
+    assert detector.detect_and_redact_pii("Nothing here")["redacted_text"] == "Nothing here"
@@ -0,0 +1,59 @@
+from intent_matcher import IntentMatcher, key_terms
+
+
+def make_matcher():
+    matcher = IntentMatcher(threshold=0.8)
+    matcher.add("volunteering", "Volunteer as a mentor or speaker!",
+                ["How do I volunteer?", "How can I help WCC?"])
+    matcher.add("code_of_conduct", "Be kind and respectful.",
+                ["What's your code of conduct?"])
+    return matcher
+
+
+def test_close_questions_take_the_fast_path():
+    matcher = make_matcher()
+
+    # Stopwords, case and word endings don't matter
+    assert key_terms("How can I VOLUNTEER?") == key_terms("volunteering") == {"volunteer"}
+    match = matcher.match("How can I volunteer?")
+    assert match.intent == "volunteering"
+    assert match.answer == "Volunteer as a mentor or speaker!"
+    assert match.confidence == 1.0
+    assert match.example == "How do I volunteer?"
+
+    match = matcher.match("what is the code of conduct")
+    assert match.intent == "code_of_conduct" and match.confidence == 1.0
+    assert len(matcher) == 2
+
+
+def test_uncertain_questions_go_to_the_model():
+    matcher = make_matcher()
+
+    # Extra key words lower the confidence below the threshold
+    assert matcher.match("Can I volunteer at the AI workshop in London next month?") is None
+    # Nothing in common, or nothing but stopwords
+    assert matcher.match("When is the next meetup?") is None
+    assert matcher.match("How do I?") is None
+
+    # The threshold decides: a partial match is answered by a lenient matcher
+    lenient = make_matcher()
+    lenient.threshold = 0.5
+    match = lenient.match("volunteer mentor")
+    assert match.intent == "volunteering" and match.confidence == 2 / 3
+    assert make_matcher().match("volunteer mentor") is None
+
+
+def test_from_faqs_uses_questions_and_examples():
+    matcher = IntentMatcher.from_faqs([
+        {"question": "How do I join?", "answer": "Sign up for free.", "examples": ["Become a member"]},
+        {"question": "When are the sessions?", "answer": "Every other Wednesday."},
+    ])
+    assert matcher.match("how to become a member").answer == "Sign up for free."
+    assert matcher.match("when are sessions").intent == "When are the sessions?"
+
+
+if __name__ == "__main__":
+    test_close_questions_take_the_fast_path()
+    test_uncertain_questions_go_to_the_model()
+    test_from_faqs_uses_questions_and_examples()
+    print("✅ All tests passed!")
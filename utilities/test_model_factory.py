@@ -0,0 +1,37 @@
+import google.generativeai as genai
+
+import model_factory
+from model_factory import clear_models, get_model
+
+
+def test_model_factory():
+    clear_models()
+
+    # Same settings share one model, different settings don't
+    model = get_model("gemini-2.5-flash-lite", {"temperature": 0.2}, "Be brief")
+    assert get_model("gemini-2.5-flash-lite", {"temperature": 0.2}, "Be brief") is model
+    assert get_model("gemini-2.5-flash-lite", {"temperature": 0.7}, "Be brief") is not model
+    assert get_model("gemini-2.5-flash-lite", {"temperature": 0.2}, "Be chatty") is not model
+
+    # List values such as stop_sequences work, in any key order
+    stop = get_model("gemini-2.5-flash-lite", {"stop_sequences": ["END"], "temperature": 0})
+    assert get_model("gemini-2.5-flash-lite", {"temperature": 0, "stop_sequences": ["END"]}) is stop
+
+    # A GenerationConfig object is the same model as the equivalent dict
+    config = genai.types.GenerationConfig(temperature=0, stop_sequences=["END"])
+    assert get_model("gemini-2.5-flash-lite", config) is stop
+
+    # The cache is a bounded LRU
+    clear_models()
+    for i in range(model_factory.MAX_MODELS + 5):
+        get_model("gemini-2.5-flash-lite", {"max_output_tokens": i + 1})
+    assert len(model_factory._models) == model_factory.MAX_MODELS
+
+    clear_models()
+    assert len(model_factory._models) == 0
+
+    print("✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    test_model_factory()
@@ -0,0 +1,44 @@
+from prompt_template import PromptTemplate, Slot
+
+
+def test_prompt_template():
+    counted = []
+
+    def count_words(text):
+        counted.append(text)
+        return len(text.split())
+
+    template = PromptTemplate([
+        "You are a WCC assistant.",
+        " Be friendly.",
+        Slot("knowledge", prefix="\nINFO: "),
+        "\nQuestion: ",
+        Slot("question"),
+    ], count_tokens=count_words)
+
+    # Neighbouring static sections are merged and counted once
+    assert template.slot_names == ["knowledge", "question"]
+    assert counted == ["You are a WCC assistant. Be friendly.", "\nQuestion: "]
+    assert template.static_tokens == 7 + 1
+
+    # Filled slots use the same counter as the static sections
+    counted.clear()
+    prompt = template.render(knowledge="Events on Fridays", question="When is the next event?")
+    assert prompt.text == (
+        "You are a WCC assistant. Be friendly.\nINFO: Events on Fridays"
+        "\nQuestion: When is the next event?"
+    )
+    assert counted == ["\nINFO: Events on Fridays", "When is the next event?"]
+    assert prompt.dynamic_tokens == 4 + 5
+    assert prompt.input_tokens == prompt.static_tokens + prompt.dynamic_tokens
+
+    # Empty or missing slots are left out, prefix included
+    prompt = template.render(question="Hi")
+    assert prompt.text == "You are a WCC assistant. Be friendly.\nQuestion: Hi"
+    assert prompt.dynamic_tokens == 1
+
+    print("✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    test_prompt_template()
@@ -0,0 +1,53 @@
+import os
+import tempfile
+import time
+
+from response_cache import ResponseCache, is_deterministic
+
+
+def test_response_cache():
+    key = ResponseCache.make_key("model", {"temperature": 0}, "system", "What is WCC?")
+
+    # Prompts that only differ in case/whitespace share a key
+    assert key == ResponseCache.make_key("model", {"temperature": 0}, "system", " what is  WCC? ")
+    assert key != ResponseCache.make_key("model", {"temperature": 0.7}, "system", "What is WCC?")
+
+    cache = ResponseCache(max_entries=2)
+    assert cache.get(key) is None
+    cache.set(key, "WCC is a community")
+    assert cache.get(key) == "WCC is a community"
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+    # Least recently used entry is evicted
+    cache.set("b", "2")
+    cache.set("c", "3")
+    assert cache.get(key) is None
+
+    # Expired entries are misses
+    cache.set("short", "gone soon", ttl_seconds=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+
+    # Entries survive a restart when persisted to disk
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        ResponseCache(path=path).set(key, "saved")
+        assert ResponseCache(path=path).get(key) == "saved"
+
+        # The file is bounded too: expired entries go, then the oldest
+        disk = ResponseCache(path=os.path.join(tmp, "small.db"), max_disk_entries=3)
+        disk.set("expired", "old", ttl_seconds=-1)
+        for i in range(5):
+            disk.set(f"k{i}", str(i), ttl_seconds=100 + i)
+        rows = disk._db.execute("SELECT key FROM responses ORDER BY key").fetchall()
+        assert [row[0] for row in rows] == ["k2", "k3", "k4"]
+
+    assert is_deterministic({"temperature": 0})
+    assert not is_deterministic({"temperature": 0.7})
+    assert not is_deterministic(None)
+
+    print("✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    test_response_cache()
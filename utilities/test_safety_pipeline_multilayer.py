@@ -0,0 +1,250 @@
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import safety_engines
+from pii_prefilter import find_pii, pii_candidates
+from safety_pipeline_multilayer import ProductionSafetyPipeline
+from verdict_cache import VerdictCache
+from test_gcp_dlp_safety_pipeline import FakeDlpClient
+
+
+def make_pipeline(client, **options):
+    return ProductionSafetyPipeline(
+        gcp_project_id="test-project",
+        openai_api_key="test",
+        use_presidio=False,
+        use_openai_moderation=False,
+        dlp_client=client,
+        **options
+    )
+
+
+def test_blocked_message_is_redacted_from_one_dlp_call():
+    client = FakeDlpClient()
+    pipeline = make_pipeline(client)
+
+    is_safe, processed, details = pipeline.validate_input("Ünïcödé 👋 mail me at ana@example.com please")
+
+    assert not is_safe
+    assert processed == details["redacted_text"] == "Ünïcödé 👋 mail me at [REDACTED] please"
+    assert details["pii_findings"][0]["quote"] == "ana@example.com"
+    assert len(client.requests) == 1
+
+
+def test_clean_message_passes():
+    client = FakeDlpClient()
+    is_safe, processed, details = make_pipeline(client, use_prefilter=True).validate_input("What events are on this week?")
+    assert is_safe and processed == "What events are on this week?"
+    assert not details["pii_detected"]
+    # Nothing PII-like: DLP isn't called at all
+    assert details["skipped_layers"] == ["google_dlp"]
+    assert client.requests == []
+
+    # Without the pre-filter (the default) every message goes to DLP
+    client = FakeDlpClient()
+    _, _, details = make_pipeline(client).validate_input("What events are on this week?")
+    assert details["skipped_layers"] == [] and len(client.requests) == 1
+    assert details["pii_candidates"] is None
+
+
+def test_prefilter_misses_lower_case_names_so_it_is_opt_in():
+    # No digit or capital to go on: the pre-filter sees nothing...
+    for text in ["my name is john smith", "I live on baker street"]:
+        assert pii_candidates(text) == set()
+
+        # ...so by default these still go to DLP, for every info type
+        client = FakeDlpClient()
+        make_pipeline(client).validate_input(text)
+        requested = [t["name"] for t in client.requests[0]["inspect_config"]["info_types"]]
+        assert "PERSON_NAME" in requested and "STREET_ADDRESS" in requested
+
+
+def test_prefilter_requests_only_candidate_info_types():
+    client = FakeDlpClient()
+    is_safe, processed, details = make_pipeline(client, use_prefilter=True).validate_input("mail me at ana@example.com")
+
+    assert not is_safe and processed == "mail me at [REDACTED]"
+    requested = [t["name"] for t in client.requests[0]["inspect_config"]["info_types"]]
+    assert requested == ["EMAIL_ADDRESS"]
+
+
+def test_prefilter_validates_structured_pii():
+    assert find_pii("Card 4532 0151 1283 0366") == {"CREDIT_CARD_NUMBER": ["4532 0151 1283 0366"]}
+    assert "CREDIT_CARD_NUMBER" not in find_pii("Order 4532 0151 1283 0367")   # Fails Luhn
+    assert "IBAN_CODE" in find_pii("GB82 WEST 1234 5698 7654 32")
+    assert "IBAN_CODE" not in find_pii("GB83 WEST 1234 5698 7654 32")         # Fails mod-97
+    assert "US_SOCIAL_SECURITY_NUMBER" in find_pii("SSN 123-45-6789")
+    assert "US_SOCIAL_SECURITY_NUMBER" not in find_pii("SSN 666-45-6789")     # Never issued
+    assert find_pii("Server 192.168.0.1")["IP_ADDRESS"] == ["192.168.0.1"]
+    assert "IP_ADDRESS" not in find_pii("Version 999.1.1.1")
+
+    assert pii_candidates("What is WCC?") == set()
+    assert "PERSON_NAME" in pii_candidates("Hi, I'm Sarah")
+
+
+class FakeAnalyzer:
+    """Presidio stand-in that finds capitalised names"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def analyze(self, text, language, **kwargs):
+        time.sleep(self.latency)
+        return [
+            SimpleNamespace(entity_type="PERSON", start=m.start(), end=m.end(), score=0.85)
+            for m in re.finditer(r"(?<=I'm )[A-Z][a-z]+", text)
+        ]
+
+
+class FakeAnonymizer:
+    def anonymize(self, text, analyzer_results):
+        for r in sorted(analyzer_results, key=lambda r: -r.start):
+            text = text[:r.start] + f"<{r.entity_type}>" + text[r.end:]
+        return SimpleNamespace(text=text)
+
+
+class FakeModeration:
+    """OpenAI client stand-in that flags messages containing "hate" """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.inputs = []
+        self.moderations = SimpleNamespace(create=self.create)
+
+    def create(self, input):
+        self.inputs.append(input)
+        time.sleep(self.latency)
+        flagged = "hate" in input
+        scores = {"harassment": 0.9 if flagged else 0.01}
+        result = SimpleNamespace(flagged=flagged, category_scores=SimpleNamespace(model_dump=lambda: scores))
+        return SimpleNamespace(results=[result])
+
+
+def full_pipeline(latency=0.0, moderation_latency=None, **options):
+    pipeline = make_pipeline(FakeDlpClient(latency), **options)
+    pipeline.use_presidio = pipeline.use_openai_moderation = True
+    pipeline.presidio_analyzer = FakeAnalyzer(latency)
+    pipeline.presidio_anonymizer = FakeAnonymizer()
+    pipeline.openai_client = FakeModeration(latency if moderation_latency is None else moderation_latency)
+    return pipeline
+
+
+@pytest.mark.parametrize("text", [
+    "What events are on this week?",
+    "Hi, I'm Sarah and I hate queues",
+    "Hi, I'm Sarah, mail me at sarah@example.com",
+    "I hate Mondays",
+])
+@pytest.mark.parametrize("block_on_pii", [True, False])
+def test_concurrent_layers_match_sequential(text, block_on_pii):
+    sequential = full_pipeline().validate_input(text, block_on_pii=block_on_pii)
+    pipeline = full_pipeline(concurrent_layers=True)
+    try:
+        assert pipeline.validate_input(text, block_on_pii=block_on_pii) == sequential
+    finally:
+        pipeline.close()
+
+
+def test_concurrent_layers_overlap_and_stop_early():
+    pipeline = full_pipeline(latency=0.1, concurrent_layers=True)
+    try:
+        # DLP and Presidio run together, then moderation: two calls' latency, not three
+        start = time.perf_counter()
+        is_safe, _, _ = pipeline.validate_input("I hate Mondays")
+        assert 0.2 <= time.perf_counter() - start < 0.3
+        assert not is_safe
+
+        # Presidio blocks: a slow moderation call never starts
+        pipeline.openai_client = FakeModeration(latency=1.0)
+        start = time.perf_counter()
+        is_safe, _, details = pipeline.validate_input("Hi, I'm Sarah and I hate queues")
+        assert time.perf_counter() - start < 0.5
+        assert pipeline.openai_client.inputs == []
+        assert not is_safe and details["redacted_text"] == "Hi, I'm <PERSON> and I hate queues"
+    finally:
+        pipeline.close()
+
+
+def test_moderation_never_sees_text_the_pii_layers_block():
+    pipeline = full_pipeline(latency=0.05, concurrent_layers=True)
+    try:
+        is_safe, processed, _ = pipeline.validate_input("Mail me at ana@example.com")
+        assert not is_safe and processed == "Mail me at [REDACTED]"
+        time.sleep(0.1)   # nothing left running in the background either
+        assert pipeline.openai_client.inputs == []
+
+        pipeline.validate_input("What events are on this week?")
+        assert pipeline.openai_client.inputs == ["What events are on this week?"]
+    finally:
+        pipeline.close()
+
+
+def test_verdict_cache_skips_repeat_checks_without_storing_text():
+    cache = VerdictCache(ttls={"presidio": 0})   # Presidio verdicts expire at once
+    pipeline = full_pipeline(verdict_cache=cache)
+    text = "Hi, I'm Sarah, mail me at sarah@example.com"
+
+    first = pipeline.validate_input(text)
+    second = pipeline.validate_input(text)
+
+    assert len(pipeline.dlp_client.requests) == 1
+    assert second[:2] == first[:2] == (False, "Hi, I'm Sarah, mail me at [REDACTED]")
+    assert second[2]["pii_findings"] == first[2]["pii_findings"]
+    assert second[2]["cached_layers"] == ["google_dlp"]
+
+    for message in ["Hi, I'm Sarah", "Hi, I'm Sarah", "What's on?", "What's on?"]:
+        pipeline.validate_input(message)
+    stats = cache.stats()
+    assert stats["google_dlp"] == {"hits": 3, "misses": 3, "hit_rate": 0.5}
+    assert stats["presidio"] == {"hits": 0, "misses": 4, "hit_rate": 0.0}
+    assert stats["openai_moderation"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    # Only hashes and text-free verdicts are kept
+    stored = repr(list(cache._entries.items()))
+    for secret in ["Sarah", "sarah@example.com", "What's on"]:
+        assert secret not in stored
+
+
+def test_verdict_cache_is_a_bounded_lru_keyed_by_config():
+    cache = VerdictCache(max_entries=2)
+    cache.put("google_dlp", "a", "config", [])
+    cache.put("google_dlp", "b", "config", [])
+    assert cache.get("google_dlp", "a", "config") == []
+    cache.put("google_dlp", "c", "config", [])   # Evicts "b", the least recently used
+
+    assert len(cache) == 2
+    assert cache.get("google_dlp", "b", "config") is None
+    assert cache.get("google_dlp", "a", "other config") is None
+    assert cache.get("presidio", "a", "config") is None
+
+
+def test_engines_are_created_lazily_once_per_process(monkeypatch):
+    created = []
+    fakes = {
+        "dlp": FakeDlpClient,
+        "presidio_analyzer": FakeAnalyzer,
+        "presidio_anonymizer": FakeAnonymizer,
+        "openai": lambda api_key: FakeModeration(),
+    }
+    for name, factory in fakes.items():
+        monkeypatch.setitem(
+            safety_engines.FACTORIES, name,
+            lambda *args, name=name, factory=factory: created.append(name) or factory(*args)
+        )
+    monkeypatch.setattr(safety_engines, "_engines", {})
+
+    first = ProductionSafetyPipeline(gcp_project_id="test-project", openai_api_key="key")
+    second = ProductionSafetyPipeline(gcp_project_id="test-project", openai_api_key="key")
+    assert created == []   # Nothing is built until it's needed
+
+    timings = first.warmup()
+    assert set(timings) == {"google_dlp", "presidio", "openai_moderation"}
+    assert sorted(created) == ["dlp", "openai", "presidio_analyzer", "presidio_anonymizer"]
+
+    # The second pipeline reuses the same engines
+    assert not second.validate_input("Hi, I'm Sarah")[0]
+    assert second.presidio_analyzer is first.presidio_analyzer
+    assert len(created) == 4
@@ -0,0 +1,47 @@
+import numpy as np
+
+from semantic_cache import HashingEmbedder, SemanticCache
+
+
+def test_semantic_cache():
+    cache = SemanticCache(threshold=0.7)
+    assert cache.lookup("How do I join WCC?") is None
+
+    cache.add("How do I join WCC?", "Sign up on our website")
+
+    # A close rewording is above the threshold and reuses the answer
+    match = cache.lookup("How can I join WCC?")
+    assert match.answer == "Sign up on our website"
+    assert match.question == "How do I join WCC?"
+    assert 0.7 <= match.similarity < 1
+
+    # An unrelated question is below the threshold
+    assert cache.lookup("What time does the meetup start?") is None
+
+    # The threshold decides: the same pair can hit or miss
+    similarity = match.similarity
+    strict = SemanticCache(threshold=min(1.0, similarity + 0.01))
+    strict.add("How do I join WCC?", "Sign up on our website")
+    assert strict.lookup("How can I join WCC?") is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2 and stats["entries"] == 1
+
+    # When full, the oldest question is replaced first
+    small = SemanticCache(threshold=0.99, max_entries=2)
+    for i, word in enumerate(["alpha", "bravo", "charlie"]):
+        small.add(f"question about {word}", f"answer {i}")
+    assert small.stats()["entries"] == 2
+    assert small.lookup("question about alpha") is None
+    assert small.lookup("question about charlie").answer == "answer 2"
+
+    # The offline embedder is deterministic and fixed-size
+    embed = HashingEmbedder(dimensions=64)
+    assert embed("Hello world").shape == (64,)
+    assert np.array_equal(embed("Hello world"), embed("hello  WORLD"))
+
+    print("✅ All tests passed!")
+
+
+if __name__ == "__main__":
+    test_semantic_cache()
@@ -0,0 +1,109 @@
+"""
+Safety Verdict Cache
+Remembers each safety layer's verdict for texts it has already checked,
+so repeated messages (greetings, canned questions, retries) don't go
+through DLP, Presidio and moderation again.
+
+- Keys are an HMAC of the layer, its configuration and the text, so a
+  change of config is a cache miss. The HMAC key is random per cache, so
+  short PII (an SSN, a phone number) can't be recovered by hashing guesses.
+- Values must be verdicts without any of the text in them (flags, scores,
+  finding types and offsets) - the cache never holds PII.
+- Each layer has its own time-to-live, and the whole cache is a bounded
+  LRU: the least recently used entry goes when it's full.
+
+    cache = VerdictCache(ttls={"openai_moderation": 3600})
+    verdict = cache.get("openai_moderation", text, config)
+    if verdict is None:
+        verdict = moderate(text)
+        cache.put("openai_moderation", text, config, verdict)
+    print(cache.stats())
+"""
+
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional
+
+DEFAULT_TTLS = {
+    "google_dlp": 24 * 3600,
+    "presidio": 24 * 3600,
+    "openai_moderation": 3600,   # Moderation models and policies change more often
+}
+
+
+class VerdictCache:
+    """Bounded LRU of layer verdicts, keyed by a hash of the text"""
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        ttls: Dict[str, float] = None,
+        default_ttl: float = 3600,
+        secret: bytes = None
+    ):
+        """
+        Args:
+            max_entries: Most verdicts kept (all layers together)
+            ttls: Seconds each layer's verdicts stay valid (merged over DEFAULT_TTLS)
+            default_ttl: Seconds for layers not in ttls
+            secret: HMAC key - only pass one to share keys between caches
+        """
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self._secret = secret or secrets.token_bytes(32)
+        self._entries = OrderedDict()   # key -> (expires_at, verdict)
+        self._hits = defaultdict(int)
+        self._misses = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def key(self, layer: str, text: str, config: Any = None) -> str:
+        message = f"{layer}\0{config!r}\0{text}".encode("utf-8")
+        return hmac.new(self._secret, message, hashlib.sha256).hexdigest()
+
+    def get(self, layer: str, text: str, config: Any = None) -> Optional[Any]:
+        """The cached verdict, or None if there isn't a fresh one"""
+        key = self.key(layer, text, config)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits[layer] += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            self._misses[layer] += 1
+            return None
+
+    def put(self, layer: str, text: str, config: Any, verdict: Any):
+        ttl = self.ttls.get(layer, self.default_ttl)
+        key = self.key(layer, text, config)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Hits, misses and hit rate for each layer"""
+        with self._lock:
+            layers = sorted(set(self._hits) | set(self._misses))
+            return {
+                layer: {
+                    "hits": self._hits[layer],
+                    "misses": self._misses[layer],
+                    "hit_rate": self._hits[layer] / (self._hits[layer] + self._misses[layer]),
+                }
+                for layer in layers
+            }